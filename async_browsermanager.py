@@ -0,0 +1,107 @@
+import os
+import logging
+
+from browsermanager import DEFAULT_VIEWPORT
+
+
+class AsyncBrowserManager:
+    def __init__(self, user_data_dir: str, headless: bool = False):
+        """
+        Initialize AsyncBrowserManager with Playwright and browser settings.
+
+        Args:
+            user_data_dir (str): Path to the user data directory for persistent context.
+            headless (bool): Whether to run the browser in headless mode (default: False).
+        """
+        self.playwright = None
+        self.browser = None
+        self.page = None
+        self.user_data_dir = user_data_dir
+        self.headless = headless
+        if self.headless:
+            self.screen_width, self.screen_height = DEFAULT_VIEWPORT["width"], DEFAULT_VIEWPORT["height"]
+        else:
+            from screeninfo import get_monitors  # To get screen size information (needs a display)
+            monitor = get_monitors()[0]
+            self.screen_width, self.screen_height = monitor.width, monitor.height
+
+    async def start_browser(self, url: str):
+        """
+        Start the browser using Playwright's async API and load the page with the given URL.
+
+        Args:
+            url (str): URL of the page to load.
+        """
+        try:
+            from playwright.async_api import async_playwright  # Asynchronous counterpart of browsermanager
+            self.playwright = await async_playwright().start()
+
+            # Create the user_data_dir if it doesn't exist
+            if not os.path.exists(self.user_data_dir):
+                os.makedirs(self.user_data_dir)
+
+            # Launch the browser with persistent context
+            self.browser = await self.playwright.chromium.launch_persistent_context(
+                user_data_dir=self.user_data_dir,
+                headless=self.headless,
+                viewport={"width": self.screen_width, "height": self.screen_height}
+            )
+
+            # Open a new page and navigate to the URL
+            if len(self.browser.pages) > 0:
+                self.page = self.browser.pages[0]
+            else:
+                self.page = await self.browser.new_page()
+            await self.page.goto(url)
+
+            logging.info(f"Browser started and navigated to {url}")
+
+        except Exception as e:
+            logging.error(f"Failed to start the browser and navigate to the page: {e}")
+            raise
+
+    async def new_page(self, url: str):
+        """
+        Open another page in the persistent context (sharing its login) and load `url`.
+
+        With the async API, pages of one context can be driven concurrently from
+        different tasks of the same event loop.
+
+        Args:
+            url (str): URL of the page to load.
+
+        Returns:
+            Page: The new page.
+        """
+        page = await self.browser.new_page()
+        await page.goto(url)
+        return page
+
+    async def stop_browser(self):
+        """
+        Stops the browser and closes Playwright.
+        """
+        try:
+            if self.browser:
+                await self.browser.close()
+            if self.playwright:
+                await self.playwright.stop()
+
+            logging.info("Browser stopped successfully.")
+
+        except Exception as e:
+            logging.error(f"Failed to stop the browser: {e}")
+
+    async def reload_page(self, page=None):
+        """
+        Reload a page in the browser (default: the main page).
+        """
+        page = page or self.page
+        try:
+            if page:
+                await page.reload()
+                logging.info("Page reloaded successfully.")
+            else:
+                logging.error("No page found to reload.")
+        except Exception as e:
+            logging.error(f"Failed to reload the page: {e}")
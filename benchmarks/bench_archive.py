@@ -0,0 +1,97 @@
+"""
+Compare the decoded METAR archive with re-parsing the raw CMSS dump.
+
+Builds a one-month dump for many stations, ingests it into a metar_archive.MetarArchive
+in poll-sized batches and times "all WADS reports of the month with gusts" and a
+six-hour window, both on the archive and by re-parsing the dump with
+nosig_reader.parse_many. Also reports the size on disk. Run from the repository root:
+
+    python -m benchmarks.bench_archive [--days N] [--station-copies N] [--batch N]
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime
+
+from benchmarks.corpus import STATIONS, generate_cmss_dump
+from cmss_stream import iter_report_views
+from metar_archive import MetarArchive
+import nosig_reader
+
+
+def directory_size(root):
+    return sum(os.path.getsize(os.path.join(path, name)) for path, _, names in os.walk(root) for name in names)
+
+
+def best_of(repeat, func):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def reparse(reports, station, start_minute, end_minute, gusts):
+    """Query by re-parsing every report, as done before the archive existed."""
+    matches = 0
+    for result in nosig_reader.parse_many(reports, records=True):
+        record = result.parsed
+        if result.error is not None or record.icao != station:
+            continue
+        minute = (record.day - 1) * 1440 + record.hour * 60 + record.minute
+        if start_minute <= minute < end_minute and (not gusts or (record.wind and record.wind.gust)):
+            matches += 1
+    return matches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--days', type=int, default=31)
+    parser.add_argument('--station-copies', type=int, default=4, help="repeat the station list (more partitions)")
+    parser.add_argument('--batch', type=int, default=256, help="reports per append, like one CMSS poll")
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    stations = [(f"{icao[:3]}{chr(ord('A') + copy)}" if copy else icao, header)
+                for copy in range(args.station_copies) for icao, header in STATIONS]
+    dump = generate_cmss_dump(days=args.days, stations=stations)
+    reports = [str(view, 'ascii') for view in iter_report_views(dump.encode())]
+    print(f"{len(reports)} reports of {len(stations)} stations, raw dump {len(dump) / 1e6:.1f} MB")
+
+    with tempfile.TemporaryDirectory() as root:
+        archive = MetarArchive(root)
+        start = time.perf_counter()
+        for offset in range(0, len(reports), args.batch):
+            archive.append(reports[offset:offset + args.batch], month=(2026, 3))
+        archive.close()
+        ingest = time.perf_counter() - start
+        parse_time, _ = best_of(1, lambda: sum(1 for _ in nosig_reader.parse_many(reports)))
+        print(f"ingest:   {len(reports) / ingest:9.0f} reports/s ({archive.stats['blocks_written']} blocks written, "
+              f"{archive.stats['compactions']} compactions); re-parse only: {len(reports) / parse_time:9.0f} reports/s")
+        print(f"on disk:  {directory_size(root) / 1e6:.2f} MB ({directory_size(root) / len(dump):.0%} of the raw dump)")
+        start = time.perf_counter()
+        for partition in archive.partitions():
+            archive.compact(*partition)
+        print(f"compacted in {time.perf_counter() - start:.2f} s: {directory_size(root) / 1e6:.2f} MB "
+              f"({directory_size(root) / len(dump):.0%} of the raw dump)")
+
+        month = (datetime(2026, 3, 1), datetime(2026, 3, 1 + args.days) if args.days < 31 else datetime(2026, 4, 1))
+        window = (datetime(2026, 3, 10, 6), datetime(2026, 3, 10, 12))
+        cases = [
+            ("WADS month with gusts", month, {'wind_gust': (0, None)}, True),
+            ("WADS 6-hour window", window, None, False),
+        ]
+        for name, (first, last), where, gusts in cases:
+            archive_time, rows = best_of(args.repeat, lambda: archive.query('WADS', first, last, where=where))
+            start_minute = (first.day - 1) * 1440 + first.hour * 60
+            end_minute = (last - datetime(2026, 3, 1)).total_seconds() // 60
+            reparse_time, expected = best_of(1, lambda: reparse(reports, 'WADS', start_minute, end_minute, gusts))
+            check = 'ok' if len(rows) == expected else f"MISMATCH (re-parse found {expected})"
+            print(f"{name:24s} archive {archive_time * 1e3:8.2f} ms  re-parse {reparse_time * 1e3:8.1f} ms  "
+                  f"{reparse_time / archive_time:7.0f}x  {len(rows)} rows {check}")
+
+
+if __name__ == "__main__":
+    main()
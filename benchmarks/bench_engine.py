@@ -0,0 +1,72 @@
+"""
+Compare the tokenizer-based readers with the old regex-rescan readers.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_engine [--reports N] [--repeat R]
+"""
+import argparse
+import platform
+import time
+import tracemalloc
+
+from benchmarks.corpus import generate_reports
+from benchmarks.legacy_readers import LegacyMetarReader, LegacyNosigReader
+import metarreader
+import nosig_reader
+
+
+def best_of(repeat, funcs, reports):
+    """Best time of each function over `repeat` rounds, run alternately so load drift hits all of them."""
+    best = [float('inf')] * len(funcs)
+    for _ in range(repeat):
+        for i, func in enumerate(funcs):
+            start = time.perf_counter()
+            for report in reports:
+                func(report)
+            best[i] = min(best[i], time.perf_counter() - start)
+    return best
+
+
+def retained_bytes(func, reports):
+    """Bytes still allocated after keeping the parse results of every report."""
+    tracemalloc.start()
+    kept = [func(report) for report in reports]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--reports', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    reports = generate_reports(args.reports)
+    cases = [
+        ('metarreader', lambda code: LegacyMetarReader(code).read(),
+         lambda code: metarreader.MetarReader(code).read()),
+        ('nosig_reader', lambda code: LegacyNosigReader(code).parse(),
+         lambda code: nosig_reader.MetarReader(code).parse()),
+    ]
+
+    print(f"{len(reports)} reports, best of {args.repeat} ({platform.python_implementation()} "
+          f"{platform.python_version()}, {platform.platform()})")
+    for name, legacy, current in cases:
+        legacy_time, current_time = best_of(args.repeat, [legacy, current], reports)
+        print(f"{name:14s} legacy {len(reports) / legacy_time:10.0f} reports/s   "
+              f"engine {len(reports) / current_time:10.0f} reports/s   "
+              f"speedup {legacy_time / current_time:.2f}x")
+
+    sample = reports[:5000]
+    for name, func in [
+        ('dict view', lambda code: nosig_reader.MetarReader(code).parse()),
+        ('ParsedMetar', lambda code: nosig_reader.MetarReader(code).parse_record()),
+    ]:
+        print(f"{name:14s} {retained_bytes(func, sample) / len(sample):8.0f} bytes/report retained")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+Compare full and incremental CMSS polling against a local stand-in server.
+
+The stand-in serves a growing `extract_cmss.pl` style dump and, like a static file
+server, supports ETag/Last-Modified validators and byte ranges (optionally ignoring
+If-Range, as some servers do). The last row replaces the dump by another day's
+bulletins half-way, like the CGI regenerating its output, and checks the index.
+Run from the repository root:
+
+    python -m benchmarks.bench_fetch [--days N] [--polls P]
+"""
+import argparse
+import contextlib
+import hashlib
+import io
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmarks.corpus import STATIONS, generate_cmss_dump
+from getmetar import CMSSMetarFetcher
+
+
+class DumpState:
+    """The dump text served by the stand-in, growing by a few bulletins per poll."""
+
+    def __init__(self, initial, pending, support_validators=True, support_ranges=True, support_if_range=True):
+        self.lock = threading.Lock()
+        self.body = initial.encode()
+        self.pending = pending
+        self.modified = time.time()
+        self.support_validators = support_validators
+        self.support_ranges = support_ranges
+        self.support_if_range = support_if_range
+
+    def grow(self, count):
+        with self.lock:
+            new, self.pending = self.pending[:count], self.pending[count:]
+            if new:
+                self.body += ('\n\n' + '\n\n'.join(new)).encode()
+                self.modified += 1
+
+    def replace(self, text):
+        """Serve other content, like extract_cmss.pl after the day rolled over."""
+        with self.lock:
+            self.body = text.encode()
+            self.modified += 1
+
+    def etag(self):
+        return '"' + hashlib.md5(self.body).hexdigest() + '"'
+
+
+def make_handler(state):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            with state.lock:
+                body, etag = state.body, state.etag()
+                last_modified = formatdate(state.modified, usegmt=True)
+            headers = {}
+            if state.support_validators:
+                headers = {'ETag': etag, 'Last-Modified': last_modified}
+                if self.headers.get('If-None-Match') == etag:
+                    self.send_response(304)
+                    for name, value in headers.items():
+                        self.send_header(name, value)
+                    self.end_headers()
+                    return
+
+            status = 200
+            range_header = self.headers.get('Range')
+            if_range = self.headers.get('If-Range')
+            if state.support_if_range and if_range and if_range not in (etag, last_modified):
+                range_header = None  # Dokumen sudah berubah: kirim seluruhnya
+            if state.support_ranges and range_header and range_header.startswith('bytes='):
+                start = int(range_header[6:].split('-')[0])
+                if start >= len(body):
+                    self.send_response(416)
+                    self.send_header('Content-Range', f"bytes */{len(body)}")
+                    self.end_headers()
+                    return
+                headers['Content-Range'] = f"bytes {start}-{len(body) - 1}/{len(body)}"
+                body, status = body[start:], 206
+
+            self.send_response(status)
+            if state.support_ranges:
+                self.send_header('Accept-Ranges', 'bytes')
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header('Content-Type', 'text/plain')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    return Handler
+
+
+def run(mode, initial, pending, polls, per_poll, server_features, rollover=None):
+    state = DumpState(initial, list(pending), *server_features)
+    server = ThreadingHTTPServer(('127.0.0.1', 0), make_handler(state))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        fetcher = CMSSMetarFetcher(f"http://127.0.0.1:{server.server_port}/cgi-bin/extract_cmss.pl")
+        fetcher.fetch_data()
+        first_bytes = fetcher.fetch_stats['bytes']
+        latencies = []
+        for poll in range(polls):
+            # Setiap polling kedua tidak ada bulletin baru
+            state.grow(per_poll if poll % 2 == 0 else 0)
+            if rollover is not None and poll == polls // 2:
+                state.replace(rollover)
+            start = time.perf_counter()
+            if mode == 'full':
+                fetcher.fetch_data()
+            else:
+                fetcher.fetch_incremental()
+            latencies.append(time.perf_counter() - start)
+        polled_bytes = fetcher.fetch_stats['bytes'] - first_bytes
+        expected = CMSSMetarFetcher(fetcher.url)
+        expected.data = state.body.decode().strip()
+        expected.build_index()
+        consistent = [b[:3] for b in fetcher.bulletins] == [b[:3] for b in expected.bulletins]
+        return polled_bytes / polls, sum(latencies) / polls, consistent
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--days', type=int, default=7)
+    parser.add_argument('--polls', type=int, default=20)
+    parser.add_argument('--per-poll', type=int, default=8, help="new bulletins per poll")
+    args = parser.parse_args()
+
+    bulletins = generate_cmss_dump(days=args.days, stations=STATIONS).split('\n\n')
+    new_count = args.polls * args.per_poll
+    initial, pending = '\n\n'.join(bulletins[:-new_count]), bulletins[-new_count:]
+    print(f"dump {len(initial) / 1e6:.2f} MB, {args.polls} polls, {args.per_poll} new bulletins every other poll")
+
+    # Isi lain yang lebih panjang dari dump awal (satu hari lebih, isi acak lain)
+    rollover = generate_cmss_dump(days=args.days + 1, stations=STATIONS, seed=2)
+    for label, mode, features, replacement in [
+        ('full fetch', 'full', (True, True, True), None),
+        ('incremental, ETag + Range', 'incremental', (True, True, True), None),
+        ('incremental, Range w/o If-Range', 'incremental', (True, True, False), None),
+        ('incremental, ETag only', 'incremental', (True, False, True), None),
+        ('incremental, no support', 'incremental', (False, False, True), None),
+        ('incremental, rollover', 'incremental', (True, True, False), rollover),
+    ]:
+        with contextlib.redirect_stdout(io.StringIO()):
+            bytes_per_poll, latency, consistent = run(mode, initial, pending, args.polls, args.per_poll, features,
+                                                      replacement)
+        print(f"{label:32s} {bytes_per_poll / 1e3:10.1f} kB/poll  {latency * 1e3:8.2f} ms/poll  "
+              f"index {'ok' if consistent else 'MISMATCH'}")
+
+
+if __name__ == "__main__":
+    main()
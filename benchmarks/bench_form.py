@@ -0,0 +1,73 @@
+"""
+Drive reports through the real BrowserManager / form-filling path against the mock form.
+
+Starts benchmarks.mock_form, opens it with BrowserManager (fast mode, throwaway
+profile) and submits N generated reports, either through the FormPlan path used
+by metar.run_process or through the plain fill_form + reload path. Reports
+reports per minute and the per-step latency breakdown from the tracing spans.
+Needs Playwright and its Chromium. Run from the repository root:
+
+    python -m benchmarks.bench_form [--reports N] [--mode plan|fill_form] [--latency MS] [--failure-rate F]
+"""
+import argparse
+import logging
+import tempfile
+import time
+
+from benchmarks.corpus import generate_reports
+from benchmarks.mock_form import start_server
+from browsermanager import BrowserManager
+import metar
+import nosig_reader
+import tracing
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--reports', type=int, default=50)
+    parser.add_argument('--mode', choices=['plan', 'fill_form'], default='plan')
+    parser.add_argument('--latency', type=float, default=50.0, help="mock server latency in ms")
+    parser.add_argument('--failure-rate', type=float, default=0.0, help="fraction of submits the mock rejects")
+    parser.add_argument('--headed', action='store_true')
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)  # Log per langkah form terlalu ramai untuk benchmark
+    server, state, url = start_server(args.latency / 1000, args.failure_rate)
+    # Hanya laporan yang punya lapisan awan yang bisa diisi oleh fill_form
+    results = [r for r in nosig_reader.parse_many(generate_reports(args.reports * 2))
+               if r.error is None and r.parsed.get('clouds') and r.parsed.get('trend')][:args.reports]
+
+    with tempfile.TemporaryDirectory() as profile:
+        manager = BrowserManager(user_data_dir=profile, headless=not args.headed, fast=True)
+        manager.start_browser(url, ready_selector="#vs2__combobox")
+        print(f"time to interactive form: {manager.startup_seconds:.2f} s")
+        tracing.enable()
+        try:
+            page = manager.page
+            submit = metar.submit_stage(manager, page)
+            start = time.perf_counter()
+            ok = 0
+            for result in results:
+                if args.mode == 'plan':
+                    ok += submit(result)
+                else:
+                    with tracing.span("form.report"):
+                        done = metar.fill_form(page, result.parsed)
+                    metar.reload_browser_page(manager, page)
+                    ok += done
+            elapsed = time.perf_counter() - start
+        finally:
+            manager.stop_browser()
+            server.shutdown()
+            server.server_close()
+
+    print(f"{args.mode}: {len(results)} reports in {elapsed:.1f} s = {len(results) / elapsed * 60:.1f} reports/min, "
+          f"{ok} confirmed, mock accepted {len(state.submissions)} and rejected {state.rejected}")
+    print(f"{'span':24s} {'n':>5s} {'p50 ms':>9s} {'p95 ms':>9s} {'p99 ms':>9s} {'total s':>9s}")
+    for name, stats in tracing.summary().items():
+        print(f"{name:24s} {stats['count']:5d} {stats['p50'] * 1e3:9.1f} {stats['p95'] * 1e3:9.1f} "
+              f"{stats['p99'] * 1e3:9.1f} {stats['total']:9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Measure how parallel_decode.decode_file scales with the number of workers.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_parallel [--days N] [--workers 1,2,4,8]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.corpus import STATIONS, generate_cmss_dump
+from parallel_decode import decode_file
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--days', type=int, default=28)
+    parser.add_argument('--copies', type=int, default=4, help="repeat the dump to grow the file")
+    parser.add_argument('--workers', default=','.join(str(n) for n in (1, 2, 4, 8) if n <= os.cpu_count()))
+    parser.add_argument('--chunk-size', type=int, default=1024 * 1024)
+    args = parser.parse_args()
+
+    dump = generate_cmss_dump(days=args.days, stations=STATIONS * 4)
+    with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False) as f:
+        for _ in range(args.copies):
+            f.write(dump + '\n\n')
+        path = f.name
+
+    try:
+        size_mb = os.path.getsize(path) / 1e6
+        print(f"archive {size_mb:.1f} MB, chunk size {args.chunk_size} bytes")
+        baseline = None
+        for workers in (int(n) for n in args.workers.split(',')):
+            failures = []
+            start = time.perf_counter()
+            count = sum(1 for _ in decode_file(path, workers=workers, chunk_size=args.chunk_size,
+                                               on_error=failures.append))
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            print(f"workers {workers:2d}: {count} reports ({len(failures)} failed) in {elapsed:6.2f}s  "
+                  f"{count / elapsed:9.0f} reports/s  speedup {baseline / elapsed:.2f}x")
+    finally:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Measure how long SPECI and current reports wait behind a bulk backfill.
+
+Feeds metar_pipeline.MetarPipeline a day of backfill for many stations, with SPECIs
+and current METARs arriving while the backfill is being submitted, and a fake submit
+that takes --submit-ms per report (like the browser form). Prints the latency from
+arrival to finished submission per priority class, in source order (FIFO) and with
+metar_priority ordering. Run from the repository root:
+
+    python -m benchmarks.bench_priority [--backfill N] [--urgent N] [--submit-ms MS]
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+from benchmarks.corpus import STATIONS, generate_report
+from metar_pipeline import MetarPipeline
+from metar_priority import BACKFILL, CURRENT, PRIORITY_NAMES, SPECI, classify_priority
+from nosig_reader import parse_many
+from tracing import Histogram
+
+
+def build_load(backfill, urgent, now, seed=1):
+    """Return (backfill reports, [(priority, report)] arriving later)."""
+    rng = random.Random(seed)
+    reports = []
+    for i in range(backfill):
+        icao, _ = STATIONS[i % len(STATIONS)]
+        observed = now - timedelta(hours=2, minutes=30 * (i // len(STATIONS)))
+        reports.append(generate_report(rng, icao, observed.day, observed.hour, observed.minute // 30 * 30))
+    late = []
+    for i in range(urgent):
+        icao, _ = STATIONS[i % len(STATIONS)]
+        priority = SPECI if i % 2 else CURRENT
+        observed = now - timedelta(minutes=rng.randint(0, 20))
+        late.append((priority, generate_report(rng, icao, observed.day, observed.hour, observed.minute,
+                                               'SPECI' if priority == SPECI else 'METAR')))
+    return reports, late
+
+
+def run(reports, late, interval, submit_seconds, prioritize):
+    arrived = {}
+    histograms = {priority: Histogram() for priority in range(len(PRIORITY_NAMES))}
+    classes = {report: BACKFILL for report in reports}
+    classes.update({report: priority for priority, report in late})
+
+    def source():
+        # Semua backfill sudah ada sejak awal; laporan mendesak datang menurut jadwal jam
+        start = time.perf_counter()
+        due = [(start + (i + 1) * interval, report) for i, (_, report) in enumerate(late)]
+        for report in reports:
+            arrived[report] = start
+            while due and due[0][0] <= time.perf_counter():
+                arrived[due[0][1]] = due[0][0]
+                yield due.pop(0)[1]
+            yield report
+        for at, report in due:
+            time.sleep(max(0.0, at - time.perf_counter()))
+            arrived[report] = at
+            yield report
+
+    def submit(result):
+        time.sleep(submit_seconds)
+        histograms[classes[result.raw]].add(time.perf_counter() - arrived[result.raw])
+        return True
+
+    start = time.perf_counter()
+    MetarPipeline(source(), submit, prioritize=prioritize).run()
+    return time.perf_counter() - start, histograms
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--backfill', type=int, default=600, help="backfill reports queued at the start")
+    parser.add_argument('--urgent', type=int, default=20, help="SPECI/current reports arriving during the load")
+    parser.add_argument('--interval', type=float, default=0.25, help="seconds between urgent arrivals")
+    parser.add_argument('--submit-ms', type=float, default=10, help="time of one fake submission")
+    args = parser.parse_args()
+
+    now = datetime.now(timezone.utc)
+    reports, late = build_load(args.backfill, args.urgent, now)
+    counts = [0] * len(PRIORITY_NAMES)  # Dihitung ulang dengan classify_priority sebagai pemeriksaan
+    for result in parse_many(report for _, report in late):
+        counts[classify_priority(result, now)] += 1
+    print(f"{len(reports)} backfill reports, {counts[SPECI]} SPECI and {counts[CURRENT]} current arriving "
+          f"every {args.interval:.2f} s, {args.submit_ms:.0f} ms per submission")
+    for name, prioritize in (("source order", None), ("priority", classify_priority)):
+        elapsed, histograms = run(reports, late, args.interval, args.submit_ms / 1000, prioritize)
+        print(f"{name} ({elapsed:.1f} s total):")
+        for priority, histogram in histograms.items():
+            if histogram.count:
+                stats = histogram.summary()
+                print(f"  {PRIORITY_NAMES[priority]:9s} {stats['count']:5d} reports  p50 {stats['p50']:6.2f} s  "
+                      f"p95 {stats['p95']:6.2f} s  max {stats['max']:6.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Measure direct API submission against a local stand-in for the form's backend.
+
+The stand-in checks the session cookie and bearer token, validates the payload
+fields and answers after a configurable processing delay. Run from the
+repository root:
+
+    python -m benchmarks.bench_submit [--reports N] [--server-delay MS]
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmarks.corpus import generate_reports
+from metar_api import REPORT_FIELDS, MetarApiClient
+import nosig_reader
+
+# Nama field milik stand-in ini saja; nama field API sungguhan harus dikonfigurasi
+FIELD_MAP = {f"{field}_value": field for field in REPORT_FIELDS}
+SESSION_COOKIE = {'name': 'session', 'value': 'stand-in', 'domain': '127.0.0.1', 'path': '/'}
+TOKEN = 'stand-in-token'
+REQUIRED_FIELDS = {'station_id', 'observer', 'observation_date', 'clouds'} | set(FIELD_MAP)
+
+
+def make_handler(accepted, delay):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'  # Keep-alive, seperti server sungguhan
+        disable_nagle_algorithm = True
+
+        def log_message(self, *args):
+            pass
+
+        def reply(self, status, body):
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_POST(self):
+            payload = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+            if self.headers.get('Authorization') != f"Bearer {TOKEN}" or \
+                    f"session={SESSION_COOKIE['value']}" not in self.headers.get('Cookie', ''):
+                return self.reply(401, {'error': 'unauthenticated'})
+            missing = REQUIRED_FIELDS - set(payload)
+            if missing:
+                return self.reply(422, {'error': f"missing {sorted(missing)}"})
+            time.sleep(delay)
+            accepted.append(payload)
+            self.reply(201, {'id': len(accepted)})
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--reports', type=int, default=200)
+    parser.add_argument('--server-delay', type=float, default=20.0, help="server processing time in ms")
+    args = parser.parse_args()
+
+    accepted = []
+    server = ThreadingHTTPServer(('127.0.0.1', 0), make_handler(accepted, args.server_delay / 1000))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        # Korpus hanya memakai hari 1-28, jadi tanggal pengamatan selalu ada di bulan ini atau bulan lalu
+        reports = [r for r in nosig_reader.parse_many(generate_reports(args.reports)) if r.error is None]
+        client = MetarApiClient(f"http://127.0.0.1:{server.server_port}/api/metarspeci", FIELD_MAP,
+                                station_id='97260', observer='stand-in', cookies=[SESSION_COOKIE], token=TOKEN)
+        latencies = []
+        for result in reports:
+            start = time.perf_counter()
+            if not client.submit(result.parsed):
+                raise SystemExit("stand-in rejected a submission")
+            latencies.append(time.perf_counter() - start)
+        latencies.sort()
+        print(f"{len(accepted)} reports accepted, server delay {args.server_delay:.0f} ms")
+        print(f"API submission   mean {sum(latencies) / len(latencies) * 1e3:8.1f} ms   "
+              f"p95 {latencies[int(len(latencies) * 0.95) - 1] * 1e3:8.1f} ms   "
+              f"max {latencies[-1] * 1e3:8.1f} ms")
+        # Jalur browser menunggu paling sedikit 2 x 3 detik (fill_form + reload_browser_page)
+        print(f"browser form     at least {6000:8.0f} ms of fixed waits per report")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
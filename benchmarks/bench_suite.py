@@ -0,0 +1,169 @@
+"""
+Parser and fetcher micro-benchmarks with a baseline regression gate.
+
+Times metarreader.MetarReader.read, nosig_reader.MetarReader.parse and
+CMSSMetarFetcher.find_metar / find_all_metar_today on a seeded synthetic corpus,
+and records throughput, per-call latency (p50/p95/p99) and peak memory. Results
+are compared with benchmarks/baseline.json; the run exits with status 1 when a
+case is slower than the baseline by more than the tolerance. Throughput is
+compared relative to a fixed calibration workload timed in chunks interleaved
+with each case, so a slower or busier machine does not look like a regression. Run from the
+repository root:
+
+    python -m benchmarks.bench_suite [--save-baseline] [--tolerance 0.15] [--trace]
+
+Baselines depend on the machine: regenerate with --save-baseline on the machine
+that runs the gate.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+from benchmarks.corpus import STATIONS, generate_cmss_dump, generate_reports
+from getmetar import CMSSMetarFetcher
+import metarreader
+import nosig_reader
+import tracing
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'baseline.json')
+
+
+def make_fetcher(days, stations):
+    fetcher = CMSSMetarFetcher("http://127.0.0.1/unused")
+    fetcher.data = generate_cmss_dump(days=days, stations=stations)
+    fetcher.build_index()
+    return fetcher
+
+
+def build_cases(reports, fetcher):
+    """Return [(name, callable taking one input, inputs)]."""
+    queries = [(station, header, metar_time) for header, station, metar_time, _, _ in fetcher.bulletins[::7]]
+    return [
+        ('metarreader.read', lambda code: metarreader.MetarReader(code).read(), reports),
+        ('nosig_reader.parse', lambda code: nosig_reader.MetarReader(code).parse(), reports),
+        ('fetcher.find_metar', lambda query: fetcher.find_metar(query[2], query[0], query[1]), queries),
+        ('fetcher.find_all_metar_today',
+         lambda pair: fetcher.find_all_metar_today(pair[0], pair[1]), [(s, h) for s, h in STATIONS] * 50),
+    ]
+
+
+def calibration_work(item):
+    """Fixed pure-Python workload used to normalize results for the speed of the machine."""
+    groups = item.split()
+    return sum(len(group) for group in groups if group.isalnum()), {group: i for i, group in enumerate(groups)}
+
+
+def measure(func, inputs, calibration_inputs, repeat, chunk=200):
+    """
+    Time `func` over `inputs` in chunks interleaved with the calibration workload.
+
+    Returns throughput and per-call latency percentiles of the best round, the median
+    ratio of case speed to calibration speed over all rounds, and the peak memory.
+    """
+    clock = time.perf_counter_ns
+    best_total, best_latencies, ratios = float('inf'), None, []
+    for _ in range(repeat):
+        latencies = []
+        append = latencies.append
+        case_total = calibration_total = 0
+        for offset in range(0, len(inputs), chunk):
+            start = clock()
+            for item in inputs[offset:offset + chunk]:
+                before = clock()
+                func(item)
+                append(clock() - before)
+            middle = clock()
+            first = offset % len(calibration_inputs)
+            for item in calibration_inputs[first:first + chunk]:
+                calibration_work(item)
+            case_total += middle - start
+            calibration_total += clock() - middle
+        ratios.append(calibration_total / case_total)
+        if case_total < best_total:
+            best_total, best_latencies = case_total, latencies
+    best_latencies.sort()
+
+    def pct(fraction):
+        return best_latencies[min(len(best_latencies) - 1, int(fraction * len(best_latencies)))] / 1e3
+
+    tracemalloc.start()
+    for item in inputs:
+        func(item)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        'per_second': len(inputs) / (best_total / 1e9),
+        'relative': statistics.median(ratios),
+        'p50_us': pct(0.50),
+        'p95_us': pct(0.95),
+        'p99_us': pct(0.99),
+        'peak_kb': peak / 1024,
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Return the names of the cases whose relative throughput fell below baseline * (1 - tolerance)."""
+    regressions = []
+    for name, result in results.items():
+        reference = baseline.get('cases', {}).get(name)
+        if reference is None:
+            print(f"{name:30s} (no baseline)")
+            continue
+        # Dibandingkan relatif terhadap beban kalibrasi yang diukur berselang-seling, agar
+        # perbedaan kecepatan mesin (atau CPU yang sedang sibuk) saling meniadakan
+        ratio = result['relative'] / reference['relative']
+        status = 'ok'
+        if ratio < 1 - tolerance:
+            status = 'REGRESSION'
+            regressions.append(name)
+        print(f"{name:30s} {ratio:6.2f}x baseline  {status}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--reports', type=int, default=5000)
+    parser.add_argument('--days', type=int, default=31, help="days in the generated CMSS dump")
+    parser.add_argument('--repeat', type=int, default=9)
+    parser.add_argument('--tolerance', type=float, default=0.15, help="allowed throughput drop (fraction)")
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--trace', action='store_true', help="measure with tracing enabled, to see its overhead")
+    args = parser.parse_args()
+
+    if args.trace:
+        tracing.enable()
+    reports = generate_reports(args.reports)
+    fetcher = make_fetcher(args.days, STATIONS)
+    print(f"{len(reports)} reports, CMSS dump of {len(fetcher.bulletins)} bulletins, best of {args.repeat}")
+
+    results = {}
+    for name, func, inputs in build_cases(reports, fetcher):
+        results[name] = result = measure(func, inputs, reports, args.repeat)
+        print(f"{name:30s} {result['per_second']:10.0f}/s  p50 {result['p50_us']:8.1f}us  "
+              f"p95 {result['p95_us']:8.1f}us  p99 {result['p99_us']:8.1f}us  peak {result['peak_kb']:8.0f} kB")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump({'machine': platform.platform(), 'python': platform.python_version(),
+                       'reports': args.reports, 'days': args.days, 'cases': results}, f, indent=2)
+            f.write('\n')
+        print(f"baseline written to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"no baseline at {args.baseline}; run with --save-baseline first")
+        return
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if compare(results, baseline, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
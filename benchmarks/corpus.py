@@ -0,0 +1,92 @@
+"""
+Synthetic but realistic METAR corpora for the benchmarks.
+
+Reports are generated with a seeded RNG so runs are comparable, and cover the
+groups the readers have to handle: gusts, variable wind, RVR, weather, several
+cloud layers, negative temperatures and TEMPO/BECMG/NOSIG trends.
+"""
+import random
+
+STATIONS = [
+    ('WADS', 'SAID35'), ('WADD', 'SAID31'), ('WAAA', 'SAID32'), ('WIII', 'SAID33'),
+    ('WARR', 'SAID34'), ('WADL', 'SAID36'), ('WIMM', 'SAID37'), ('WALL', 'SAID38'),
+]
+
+WEATHER = ['-RA', 'RA', '+TSRA', 'TSRA', 'VCSH', 'BR', 'HZ', '-SHRA', 'FG', '-DZ']
+CLOUD_TYPES = ['', '', '', 'CB', 'TCU']
+
+
+def generate_report(rng, icao, day, hour, minute, report_type='METAR'):
+    """Build one METAR/SPECI report string (without the CMSS bulletin header)."""
+    groups = [report_type, icao, f"{day:02d}{hour:02d}{minute:02d}Z"]
+
+    speed = rng.randint(0, 25)
+    wind = f"{rng.randrange(0, 360, 10):03d}{speed:02d}"
+    if speed > 12 and rng.random() < 0.5:
+        wind += f"G{speed + rng.randint(8, 15):02d}"
+    groups.append(wind + "KT")
+    if rng.random() < 0.15:
+        start = rng.randrange(0, 360, 10)
+        groups.append(f"{start:03d}V{(start + 60) % 360:03d}")
+
+    cavok = rng.random() < 0.2
+    if cavok:
+        groups.append("CAVOK")
+    else:
+        visibility = rng.choice([9999, 9999, 8000, 6000, 4000, 1500, 800])
+        groups.append(f"{visibility:04d}")
+        if visibility < 2000:
+            groups.append(f"R{rng.choice(['09', '27', '18L'])}/{rng.randint(5, 19) * 100:04d}{rng.choice('UDN')}")
+        if rng.random() < 0.5:
+            groups.append(rng.choice(WEATHER))
+        if rng.random() < 0.1:
+            groups.append("NSC")
+        else:
+            height = rng.randint(5, 25)
+            for cover in rng.sample(['FEW', 'SCT', 'BKN', 'OVC'], rng.randint(1, 3)):
+                groups.append(f"{cover}{height:03d}{rng.choice(CLOUD_TYPES)}")
+                height += rng.randint(5, 60)
+
+    temp = rng.randint(-8, 34)
+    dew = temp - rng.randint(0, 8)
+    groups.append(f"{'M' if temp < 0 else ''}{abs(temp):02d}/{'M' if dew < 0 else ''}{abs(dew):02d}")
+    groups.append(f"Q{rng.randint(995, 1025):04d}")
+
+    trend = rng.random()
+    if trend < 0.6:
+        groups.append("NOSIG")
+    elif trend < 0.8:
+        groups += ["TEMPO", f"TL{(hour + 2) % 24:02d}{minute:02d}", "3000", rng.choice(WEATHER)]
+    else:
+        groups += ["BECMG", f"FM{(hour + 1) % 24:02d}00", f"{rng.randrange(0, 360, 10):03d}10KT", "9999", "NSW"]
+
+    return ' '.join(groups) + '='
+
+
+def generate_reports(count, seed=1):
+    """Return `count` reports spread over the stations, half-hourly."""
+    rng = random.Random(seed)
+    reports = []
+    for i in range(count):
+        icao, _ = STATIONS[i % len(STATIONS)]
+        slot = i // len(STATIONS)
+        day, hour, minute = slot // 48 % 28 + 1, slot // 2 % 24, slot % 2 * 30
+        reports.append(generate_report(rng, icao, day, hour, minute))
+    return reports
+
+
+def generate_cmss_dump(days=3, stations=STATIONS, seed=1, speci_rate=0.05):
+    """Return the text of a CMSS `extract_cmss.pl` style dump covering `days` days."""
+    rng = random.Random(seed)
+    bulletins = []
+    for day in range(1, days + 1):
+        for slot in range(48):
+            hour, minute = slot // 2, slot % 2 * 30
+            for icao, header in stations:
+                bulletins.append(f"{header} {icao} {day:02d}{hour:02d}{minute:02d}\n"
+                                 + generate_report(rng, icao, day, hour, minute))
+                if rng.random() < speci_rate:
+                    speci_minute = minute + rng.randint(5, 25)
+                    bulletins.append(f"SPID{header[4:]} {icao} {day:02d}{hour:02d}{speci_minute:02d}\n"
+                                     + generate_report(rng, icao, day, hour, speci_minute, 'SPECI'))
+    return '\n\n'.join(bulletins)
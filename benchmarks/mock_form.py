@@ -0,0 +1,283 @@
+"""
+Local stand-in for the bmkgsatu METAR/SPECI entry form.
+
+Reproduces the controls metar.fill_form and FormPlan target (station and observer
+comboboxes, date picker, Jam/Menit selects, wind/visibility/temperature/QNH inputs,
+the cloud picker on the General tab, the Trend tab and the Preview/Submit buttons)
+as a plain HTML page. Loading the data for a selected time and submitting go
+through the server with a configurable latency and failure rate; Submit first fires
+an unrelated autosave POST, which the submit wait must not mistake for the submit
+response. Run on its own:
+
+    python -m benchmarks.mock_form [--port 8765] [--latency MS] [--failure-rate F]
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+FORM_PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>METAR/SPECI (mock)</title>
+<style>
+  .hidden { display: none; }
+  [role=option] { cursor: pointer; padding: 2px 6px; }
+</style></head>
+<body>
+<h1>Entry METAR/SPECI</h1>
+
+<div id="vs2__combobox" role="combobox">
+  <input id="station" aria-label="Loading..." readonly>
+  <ul id="station-options" role="listbox" class="hidden">
+    <li role="option">97260</li><li role="option">97230</li>
+  </ul>
+</div>
+<div id="vs3__combobox" role="combobox">
+  <input id="observer" aria-label="Loading..." readonly>
+  <ul id="observer-options" role="listbox" class="hidden">
+    <li role="option">Zulkifli Ramadhan</li><li role="option">Pengamat Lain</li>
+  </ul>
+</div>
+
+<div>
+  <input id="datepicker__value_" readonly placeholder="Tanggal">
+  <div id="calendar" class="hidden"></div>
+</div>
+
+<label for="jam">Jam</label><select id="jam"></select>
+<label for="menit">Menit</label><select id="menit"><option>00</option><option>30</option></select>
+
+<div role="tablist">
+  <button role="tab" id="tab-general" aria-selected="true">General</button>
+  <button role="tab" id="tab-trend" aria-selected="false">Trend</button>
+</div>
+
+<section id="panel-general" role="tabpanel" aria-label="General">
+  <div id="observation" class="hidden">
+    <label for="wind-dir">Arah Angin (derajat)</label><input id="wind-dir">
+    <label for="wind-speed">Kecepatan Angin (knot)</label><input id="wind-speed">
+    <input id="visibility" type="number" aria-label="Prevailling (m) Jarak pandang">
+    <select id="clouds-jumlah"><option></option><option>FEW</option><option>SCT</option>
+      <option>BKN</option><option>OVC</option></select>
+    <input id="cloud_height" type="number">
+    <table id="cloud-table"></table>
+    <label for="v-air-temp">Suhu</label><input id="v-air-temp">
+    <label for="v-dew-point">Titik embun</label><input id="v-dew-point">
+    <label for="qnh">TEKANAN UDARA (QNH)</label><input id="qnh">
+  </div>
+</section>
+<section id="panel-trend" role="tabpanel" aria-label="Trend" class="hidden">
+  <select id="input-type"><option></option><option>NOSIG</option><option>TEMPO</option>
+    <option>BECMG</option></select>
+</section>
+
+<button id="preview">Preview</button>
+<button id="submit" disabled>Submit</button>
+<pre id="preview-text"></pre>
+<p id="status"></p>
+
+<script>
+const $ = (id) => document.getElementById(id);
+const OKTAS = {FEW: "1-2 oktas", SCT: "3-4 oktas", BKN: "5-7 oktas", OVC: "8 oktas"};
+const form = {cloud: null};
+
+function combobox(inputId, listId) {
+  $(inputId).addEventListener("click", () => $(listId).classList.toggle("hidden"));
+  for (const option of $(listId).children) {
+    option.addEventListener("click", () => {
+      $(inputId).value = option.textContent;
+      $(inputId).setAttribute("aria-label", "Selected: " + option.textContent);
+      $(listId).classList.add("hidden");
+    });
+  }
+}
+combobox("station", "station-options");
+combobox("observer", "observer-options");
+
+for (let h = 0; h < 24; h++) {
+  const option = document.createElement("option");
+  option.textContent = String(h).padStart(2, "0");
+  $("jam").appendChild(option);
+}
+
+const today = new Date();
+let shown = new Date(today.getFullYear(), today.getMonth(), 1);  // Bulan yang sedang ditampilkan
+
+function navButton(label, delta) {
+  const button = document.createElement("button");
+  button.textContent = delta < 0 ? "<" : ">";
+  button.setAttribute("aria-label", label);
+  button.addEventListener("click", () => {
+    shown = new Date(shown.getFullYear(), shown.getMonth() + delta, 1);
+    renderCalendar();
+  });
+  return button;
+}
+
+function renderCalendar() {
+  const calendar = $("calendar");
+  calendar.innerHTML = "";
+  calendar.appendChild(navButton("Previous month", -1));
+  calendar.appendChild(navButton("Next month", 1));
+  const month = shown.getMonth() + 1, year = shown.getFullYear();
+  const days = new Date(year, month, 0).getDate();
+  for (let d = 1; d <= days; d++) {
+    const button = document.createElement("button");
+    button.textContent = d;
+    let label = `${month}/${d}/${year}`;
+    if (year === today.getFullYear() && month === today.getMonth() + 1 && d === today.getDate()) {
+      label += " (Today)";
+    }
+    button.setAttribute("aria-label", label);
+    button.addEventListener("click", () => {
+      $("datepicker__value_").value = `${year}-${month}-${d}`;
+      calendar.classList.add("hidden");
+    });
+    calendar.appendChild(button);
+  }
+}
+
+$("datepicker__value_").addEventListener("click", () => {
+  shown = new Date(today.getFullYear(), today.getMonth(), 1);
+  renderCalendar();
+  $("calendar").classList.remove("hidden");
+});
+
+// Memilih jam/menit memuat data pengamatan dari server, seperti aplikasi aslinya
+function loadObservation() {
+  $("observation").classList.add("hidden");
+  fetch(`/api/observation?jam=${$("jam").value}&menit=${$("menit").value}`)
+    .then(() => $("observation").classList.remove("hidden"));
+}
+$("jam").addEventListener("change", loadObservation);
+$("menit").addEventListener("change", loadObservation);
+
+for (const cover of Object.keys(OKTAS)) {
+  for (const type of ["-", "CB", "TCU"]) {
+    const row = $("cloud-table").insertRow();
+    row.insertCell().textContent = `${cover} (${OKTAS[cover]}) ${type}`;
+    const button = document.createElement("button");
+    button.textContent = "Pilih";
+    button.addEventListener("click", () => {
+      form.cloud = {amount: cover, type: type, height: $("cloud_height").value};
+    });
+    row.insertCell().appendChild(button);
+  }
+}
+
+function showTab(name) {
+  for (const tab of ["general", "trend"]) {
+    $("panel-" + tab).classList.toggle("hidden", tab !== name);
+    $("tab-" + tab).setAttribute("aria-selected", String(tab === name));
+  }
+}
+$("tab-general").addEventListener("click", () => showTab("general"));
+$("tab-trend").addEventListener("click", () => showTab("trend"));
+
+function values() {
+  return {
+    station: $("station").value, observer: $("observer").value, date: $("datepicker__value_").value,
+    hour: $("jam").value, minute: $("menit").value, wind_direction: $("wind-dir").value,
+    wind_speed: $("wind-speed").value, visibility: $("visibility").value, cloud: form.cloud,
+    temperature: $("v-air-temp").value, dew_point: $("v-dew-point").value, pressure: $("qnh").value,
+    trend: $("input-type").value,
+  };
+}
+$("preview").addEventListener("click", () => {
+  $("preview-text").textContent = JSON.stringify(values(), null, 1);
+  $("submit").disabled = false;
+});
+$("submit").addEventListener("click", () => {
+  $("submit").disabled = true;
+  // Autosave seperti aplikasi sungguhan: POST lain yang selesai sebelum submit
+  fetch("/api/autosave", {method: "POST", body: "{}"});
+  fetch("/api/meteorologi/metarspeci", {method: "POST", headers: {"Content-Type": "application/json"},
+                        body: JSON.stringify(values())})
+    .then((response) => { $("status").textContent = response.ok ? "Tersimpan" : "Gagal: " + response.status; });
+});
+</script>
+</body></html>
+"""
+
+
+class MockState:
+    """Configuration and the accepted submissions of the mock server."""
+
+    def __init__(self, latency=0.05, failure_rate=0.0, seed=1):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.submissions = []
+        self.rejected = 0
+
+
+def make_handler(state):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        disable_nagle_algorithm = True
+
+        def log_message(self, *args):
+            pass
+
+        def reply(self, status, body, content_type='application/json'):
+            data = body.encode() if isinstance(body, str) else json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path.startswith('/api/observation'):
+                time.sleep(state.latency)
+                return self.reply(200, {})
+            if self.path in ('/', '/meteorologi/metarspeci'):
+                return self.reply(200, FORM_PAGE, 'text/html; charset=utf-8')
+            self.reply(404, {'error': 'not found'})
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            if self.path == '/api/autosave':
+                return self.reply(200, {})
+            if self.path != '/api/meteorologi/metarspeci':
+                return self.reply(404, {'error': 'not found'})
+            time.sleep(state.latency)
+            with state.lock:
+                failed = state.rng.random() < state.failure_rate
+                if failed:
+                    state.rejected += 1
+                else:
+                    state.submissions.append(json.loads(body))
+            if failed:
+                return self.reply(500, {'error': 'simulated failure'})
+            self.reply(201, {'id': len(state.submissions)})
+
+    return Handler
+
+
+def start_server(latency=0.05, failure_rate=0.0, port=0):
+    """Start the mock in a background thread; returns (server, state, form URL)."""
+    state = MockState(latency, failure_rate)
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(state))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, state, f"http://127.0.0.1:{server.server_port}/meteorologi/metarspeci"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=50.0, help="server latency in ms")
+    parser.add_argument('--failure-rate', type=float, default=0.0, help="fraction of submits that fail")
+    args = parser.parse_args()
+    server, _, url = start_server(args.latency / 1000, args.failure_rate, args.port)
+    print(f"mock form at {url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
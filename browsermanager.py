@@ -1,55 +1,153 @@
 import os
 import logging
-from playwright.sync_api import sync_playwright  # Use synchronous Playwright API
-from screeninfo import get_monitors  # To get screen size information
+import queue
+import shutil
+import threading
+import time
+
+# Viewport untuk mode cepat/headless, tanpa menanyakan ukuran monitor
+DEFAULT_VIEWPORT = {"width": 1366, "height": 768}
+
+# Jenis resource yang tidak dibutuhkan untuk mengisi form
+BLOCKED_RESOURCE_TYPES = {"image", "media", "font"}
+BLOCKED_URL_PARTS = ("google-analytics.com", "googletagmanager.com", "doubleclick.net", "hotjar.com")
+
+# Cache profil yang boleh dihapus; cookie, local storage dan login tetap tersimpan
+PROFILE_CACHE_DIRS = [
+    "Default/Cache", "Default/Code Cache", "Default/GPUCache", "Default/DawnGraphiteCache",
+    "Default/DawnWebGPUCache", "Default/Service Worker/CacheStorage", "GrShaderCache", "GraphiteDawnCache",
+    "ShaderCache",
+]
+
+
+def trim_profile_caches(user_data_dir: str) -> int:
+    """
+    Delete the disposable cache directories of a browser profile.
+
+    Args:
+        user_data_dir (str): Path to the persistent profile (not in use by a browser).
+
+    Returns:
+        int: Number of bytes freed.
+    """
+    freed = 0
+    for name in PROFILE_CACHE_DIRS:
+        path = os.path.join(user_data_dir, name)
+        if not os.path.isdir(path):
+            continue
+        for root, _, files in os.walk(path):
+            for file in files:
+                try:
+                    freed += os.path.getsize(os.path.join(root, file))
+                except OSError:
+                    pass
+        shutil.rmtree(path, ignore_errors=True)
+    logging.info(f"Trimmed {freed / 1e6:.1f} MB of profile caches from {user_data_dir}")
+    return freed
+
+
+def block_non_essential(route):
+    """Route handler that aborts images, media, fonts and analytics requests."""
+    request = route.request
+    if request.resource_type in BLOCKED_RESOURCE_TYPES or any(part in request.url for part in BLOCKED_URL_PARTS):
+        route.abort()
+    else:
+        route.continue_()
+
+
+# File yang ditulis Chromium di profil berisi port --remote-debugging-port=0 yang dipilihnya
+DEVTOOLS_PORT_FILE = "DevToolsActivePort"
 
 
 class BrowserManager:
-    def __init__(self, user_data_dir: str, headless: bool = False):
+    def __init__(self, user_data_dir: str, headless: bool = None, fast: bool = False, cdp_url: str = None,
+                 remote_debugging: bool = False):
         """
         Initialize BrowserManager with Playwright and browser settings.
 
         Args:
             user_data_dir (str): Path to the user data directory for persistent context.
-            headless (bool): Whether to run the browser in headless mode (default: False).
+            headless (bool): Whether to run the browser in headless mode (default: False,
+                or True in fast mode).
+            fast (bool): Fast mode: headless by default, no monitor query, non-essential
+                resources blocked and profile caches trimmed before launch.
+            cdp_url (str): Attach over CDP to an already running browser (e.g.
+                'http://localhost:9222') instead of launching one.
+            remote_debugging (bool): Also open a CDP endpoint on a free local port, so a
+                PagePool can open its pages in this browser's persistent context.
         """
         self.playwright = None
         self.browser = None
         self.page = None
         self.user_data_dir = user_data_dir
-        self.headless = headless
-        self.screen_width, self.screen_height = get_monitors()[0].width, get_monitors()[0].height
+        self.fast = fast
+        self.cdp_url = cdp_url
+        self.remote_debugging = remote_debugging
+        self.cdp_endpoint = cdp_url  # Endpoint CDP yang dipakai PagePool, bila ada
+        self.headless = fast if headless is None else headless
+        self.startup_seconds = None  # Waktu sampai form pertama siap dipakai
+        if self.fast or self.headless:
+            self.screen_width, self.screen_height = DEFAULT_VIEWPORT["width"], DEFAULT_VIEWPORT["height"]
+        else:
+            from screeninfo import get_monitors  # To get screen size information (needs a display)
+            monitor = get_monitors()[0]
+            self.screen_width, self.screen_height = monitor.width, monitor.height
 
-    def start_browser(self, url: str):
+    def start_browser(self, url: str, ready_selector: str = None):
         """
         Start the browser using Playwright and load the page with the given URL.
 
         Args:
             url (str): URL of the page to load.
+            ready_selector (str): Optional element that marks the page as interactive;
+                the time until it is visible is logged and kept in `startup_seconds`.
         """
+        start = time.perf_counter()
         try:
-            # Start Playwright in synchronous mode
+            # Start Playwright in synchronous mode (imported here, so importing this module stays cheap)
+            from playwright.sync_api import sync_playwright
             self.playwright = sync_playwright().start()
 
-            # Create the user_data_dir if it doesn't exist
-            if not os.path.exists(self.user_data_dir):
-                os.makedirs(self.user_data_dir)
+            if self.cdp_url:
+                # Attach to the running browser and use its default (logged-in) context
+                remote = self.playwright.chromium.connect_over_cdp(self.cdp_url)
+                self.browser = remote.contexts[0] if remote.contexts else remote.new_context()
+            else:
+                # Create the user_data_dir if it doesn't exist
+                if not os.path.exists(self.user_data_dir):
+                    os.makedirs(self.user_data_dir)
+                elif self.fast:
+                    trim_profile_caches(self.user_data_dir)
+                port_file = os.path.join(self.user_data_dir, DEVTOOLS_PORT_FILE)
+                if self.remote_debugging and os.path.exists(port_file):
+                    os.remove(port_file)  # Sisa browser sebelumnya
 
-            # Launch the browser with persistent context
-            self.browser = self.playwright.chromium.launch_persistent_context(
-                user_data_dir=self.user_data_dir,
-                headless=self.headless,
-                viewport={"width": self.screen_width, "height": self.screen_height}
-            )
+                # Launch the browser with persistent context
+                self.browser = self.playwright.chromium.launch_persistent_context(
+                    user_data_dir=self.user_data_dir,
+                    headless=self.headless,
+                    viewport={"width": self.screen_width, "height": self.screen_height},
+                    args=["--remote-debugging-port=0"] if self.remote_debugging else None,
+                )
+                if self.remote_debugging:
+                    self.cdp_endpoint = f"http://127.0.0.1:{self._devtools_port(port_file)}"
 
             # Open a new page and navigate to the URL
             if len(self.browser.pages) > 0:
                 self.page = self.browser.pages[0]
             else:
                 self.page = self.browser.new_page()
+            if self.fast:
+                # Callback route sync Playwright hanya jalan di thread ini saat ia sedang memanggil
+                # Playwright. Halaman PagePool (lewat CDP) memasang route sendiri, jadi konteks yang
+                # bisa dipakai bersama tidak di-route dari sini
+                (self.page if self.cdp_endpoint else self.browser).route("**/*", block_non_essential)
             self.page.goto(url)
+            if ready_selector:
+                self.page.locator(ready_selector).wait_for(state="visible")
 
-            logging.info(f"Browser started and navigated to {url}")
+            self.startup_seconds = time.perf_counter() - start
+            logging.info(f"Browser started and navigated to {url} in {self.startup_seconds:.2f} s")
 
         except Exception as e:
             logging.error(f"Failed to start the browser and navigate to the page: {e}")
@@ -83,7 +181,8 @@ class BrowserManager:
         Stops the browser and closes Playwright.
         """
         try:
-            if self.browser:
+            # Browser yang di-attach lewat CDP milik proses lain: cukup putuskan koneksi
+            if self.browser and not self.cdp_url:
                 self.browser.close()
             if self.playwright:
                 self.playwright.stop()
@@ -106,3 +205,172 @@ class BrowserManager:
         except Exception as e:
             logging.error(f"Failed to reload the page: {e}")
 
+    @staticmethod
+    def _devtools_port(port_file, timeout=10.0):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            try:
+                with open(port_file) as f:
+                    port = f.readline().strip()
+                if port.isdigit():
+                    return int(port)
+            except OSError:
+                pass
+            time.sleep(0.05)
+        raise RuntimeError(f"Browser did not report its remote debugging port in {port_file}")
+
+    def storage_state(self) -> dict:
+        """
+        Return the cookies and local storage of the logged-in persistent profile.
+
+        Returns:
+            dict: Playwright storage state, usable as `new_context(storage_state=...)`.
+        """
+        return self.browser.storage_state()
+
+
+class PagePool:
+    """
+    Pool of browser pages for concurrent form submissions.
+
+    Playwright's sync API is bound to the thread that started it, so each page lives
+    in a worker thread with its own Playwright connection. Every worker connects over
+    CDP to the manager's browser and opens its page in the same persistent context,
+    so the pages share one browser process, the profile's cookies, local storage and
+    IndexedDB, and see a refreshed login at once. Work is handed to whichever page is
+    free; a page that fails is replaced by a fresh one without stopping the pool.
+    """
+
+    def __init__(self, manager: BrowserManager, url: str, size: int = 3):
+        """
+        Args:
+            manager (BrowserManager): Started browser whose context the pages share; it
+                must be started with `remote_debugging=True` or attached with `cdp_url`.
+            url (str): URL every page loads (the form page).
+            size (int): Number of pages (worker threads).
+        """
+        if not manager.cdp_endpoint:
+            raise ValueError("PagePool needs a BrowserManager started with remote_debugging=True or cdp_url")
+        self.url = url
+        self.size = size
+        self.cdp_endpoint = manager.cdp_endpoint
+        self.fast = manager.fast
+        self.jobs = queue.Queue(maxsize=size)
+        self.threads = []
+        self.stats = {'done': 0, 'failed': 0, 'recycled': 0}
+        self.alive = 0  # Worker yang masih berjalan
+        self.lock = threading.Lock()
+        self.discard = None
+
+    def start(self, handle, discard=None):
+        """
+        Start the worker pages.
+
+        Args:
+            handle (callable): Called as `handle(page, job, page_state)` on a worker thread;
+                returns True on success. `page_state` is a dict kept per page (and reset
+                when the page is recycled). Raising marks the page as broken.
+            discard (callable): Called as `discard(job, error)` for every job dropped
+                because no page is left, e.g. to fail a Future the submitter waits on.
+        """
+        self.discard = discard
+        self.alive = self.size
+        for number in range(self.size):
+            thread = threading.Thread(target=self._worker, args=(handle,), name=f"page-{number}", daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def submit(self, job):
+        """
+        Queue a job; blocks while every page is busy and the queue is full.
+
+        Raises:
+            RuntimeError: When every page worker has stopped.
+        """
+        if self.threads and self.alive == 0:
+            raise RuntimeError("No browser page left in the pool")
+        self.jobs.put(job)
+        if self.alive == 0:
+            self._drain()  # Worker terakhir berhenti saat job ini masuk antrean
+
+    def _drain(self):
+        # Tidak ada halaman tersisa: buang job yang antre agar submit()/join() dan
+        # pemanggil yang menunggu hasilnya tidak tertahan
+        error = RuntimeError("No browser page left in the pool")
+        while True:
+            try:
+                job = self.jobs.get_nowait()
+            except queue.Empty:
+                return
+            if job is None:
+                continue
+            self._count('failed')
+            if self.discard is not None:
+                self.discard(job, error)
+
+    def join(self):
+        """Wait for all queued jobs, stop the workers and return the counters."""
+        for _ in self.threads:
+            self.jobs.put(None)
+        for thread in self.threads:
+            thread.join()
+        self.threads = []
+        return self.stats
+
+    def _count(self, key):
+        with self.lock:
+            self.stats[key] += 1
+
+    def _open_page(self, context):
+        page = context.new_page()
+        if self.fast:
+            # Route per halaman lewat koneksi thread ini, agar callback-nya dijalankan worker ini
+            page.route("**/*", block_non_essential)
+        page.goto(self.url)
+        return page
+
+    def _worker(self, handle):
+        from playwright.sync_api import sync_playwright  # Dimuat saat dipakai, seperti di BrowserManager
+        playwright = sync_playwright().start()
+        page = None
+        try:
+            # Koneksi CDP milik thread ini ke browser yang sama; contexts[0] adalah konteks persisten
+            browser = playwright.chromium.connect_over_cdp(self.cdp_endpoint)
+            context = browser.contexts[0]
+            page = self._open_page(context)
+            page_state = {}
+            while True:
+                job = self.jobs.get()
+                if job is None:
+                    break
+                try:
+                    ok = handle(page, job, page_state)
+                except Exception as e:
+                    # Job ini dihitung gagal sebelum halaman diganti, juga bila penggantiannya gagal
+                    self._count('failed')
+                    logging.error(f"Page {threading.current_thread().name} failed on a job, recycling it: {e}")
+                    self._count('recycled')
+                    try:
+                        page.close()
+                    except Exception:
+                        pass
+                    page = None
+                    page = self._open_page(context)
+                    page_state = {}
+                    continue
+                self._count('done' if ok else 'failed')
+        except Exception as e:
+            logging.error(f"Page worker {threading.current_thread().name} stopped: {e}")
+            with self.lock:
+                self.alive -= 1
+                last = self.alive == 0
+            if last:
+                self._drain()
+        finally:
+            # Hanya halaman sendiri yang ditutup; browser dan konteksnya milik BrowserManager
+            if page is not None:
+                try:
+                    page.close()
+                except Exception:
+                    pass
+            playwright.stop()
@@ -0,0 +1,141 @@
+import logging
+import mmap
+import re
+from contextlib import contextmanager
+
+import nosig_reader
+
+# Header bulletin di awal laporan, mis. b'SAID35 WADS 120530'
+HEADER_REGEX = re.compile(rb'([A-Z]{4}\d{2}) ([A-Z]{4}) (\d{6})')
+
+_WHITESPACE = b' \t\r\n'
+# Halaman yang sudah dilewati dilepas setiap kali sebanyak ini di-scan
+RELEASE_EVERY = 64 * 1024 * 1024
+
+
+@contextmanager
+def open_archive(path):
+    """
+    Memory-map an archive file or CMSS dump read-only.
+
+    Views into the mapping (e.g. from `iter_report_views`) are meant to be used
+    inside the context only; copy a report with bytes(view) to keep it. If views are
+    still alive when the context exits, the mapping cannot be closed yet: it stays
+    open, and the views valid, and is unmapped once the views are gone.
+
+    Yields:
+        mmap.mmap: The mapped file, or b'' for an empty file.
+    """
+    with open(path, 'rb') as f:
+        if f.seek(0, 2) == 0:
+            yield b''
+            return
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if hasattr(mapped, 'madvise') and hasattr(mmap, 'MADV_SEQUENTIAL'):
+                mapped.madvise(mmap.MADV_SEQUENTIAL)
+            yield mapped
+        finally:
+            try:
+                mapped.close()
+            except BufferError:
+                # Pemanggil masih memegang memoryview; mmap ditutup saat view terakhir dilepas
+                logging.debug(f"{path}: mapping still has live views, leaving it to be closed with them")
+
+
+def _release(buffer, upto):
+    """Drop already-scanned pages of a mapping so resident memory stays flat."""
+    if isinstance(buffer, mmap.mmap) and hasattr(mmap, 'MADV_DONTNEED'):
+        length = upto - upto % mmap.PAGESIZE
+        if length > 0:
+            buffer.madvise(mmap.MADV_DONTNEED, 0, length)
+
+
+def iter_report_views(buffer, start=0, end=None):
+    """
+    Yield each report in a buffer as a zero-copy memoryview.
+
+    Reports are the '='-terminated spans between terminators, with surrounding
+    whitespace trimmed; a CMSS bulletin header line in front is kept. Nothing is decoded.
+    The views point into `buffer`: use them while it is open (see `open_archive`) and
+    copy with bytes(view) what must outlive it.
+
+    Args:
+        buffer: mmap, bytes or bytearray holding the archive.
+        start (int): Offset to start scanning from.
+        end (int): Offset to stop at (default: end of buffer).
+
+    Yields:
+        memoryview: One report including its '=' terminator.
+    """
+    end = len(buffer) if end is None else end
+    view = memoryview(buffer)
+    released = start
+    try:
+        position = start
+        while position < end:
+            terminator = buffer.find(b'=', position, end)
+            if terminator < 0:
+                break
+            first = position
+            while first < terminator and buffer[first] in _WHITESPACE:
+                first += 1
+            if first < terminator:
+                yield view[first:terminator + 1]
+            position = terminator + 1
+            if position - released >= RELEASE_EVERY:
+                _release(buffer, position)
+                released = position
+    finally:
+        view.release()
+
+
+def bulletin_header(report):
+    """
+    Return (header, station, ddhhmm) of a report that starts with a CMSS bulletin header.
+
+    Args:
+        report (bytes or memoryview): One report as yielded by `iter_report_views`.
+
+    Returns:
+        tuple: Decoded header fields, or None if there is no header line.
+    """
+    match = HEADER_REGEX.match(report)
+    if match is None:
+        return None
+    return tuple(group.decode('ascii') for group in match.groups())
+
+
+def iter_reports(path, encoding='ascii'):
+    """
+    Stream the reports of an archive file one at a time as strings.
+
+    Only one report is decoded at a time, so memory use does not depend on file size.
+
+    Args:
+        path (str): Path to the archive file or CMSS dump.
+        encoding (str): Text encoding of the file.
+
+    Yields:
+        str: One report, including any bulletin header and the '=' terminator.
+    """
+    with open_archive(path) as buffer:
+        for report in iter_report_views(buffer):
+            text = str(report, encoding, 'replace')
+            report.release()
+            yield text
+
+
+def parse_archive(path, parse_many=nosig_reader.parse_many, **kwargs):
+    """
+    Stream an archive file straight into a METAR parser.
+
+    Args:
+        path (str): Path to the archive file or CMSS dump.
+        parse_many (callable): Batch parser, e.g. `nosig_reader.parse_many`.
+        **kwargs: Passed on to `parse_many` (e.g. records=True, cache=...).
+
+    Yields:
+        ParseResult: One result per report.
+    """
+    return parse_many(iter_reports(path), **kwargs)
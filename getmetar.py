@@ -1,27 +1,217 @@
 import requests
 import re
+import time
+from bisect import bisect_left, bisect_right
 from datetime import datetime, timezone
 
+from metar_validation import resolve_observation
+from tracing import span
+
+# Satu bulletin CMSS: baris header (mis. 'SAID35 WADS 120530') lalu laporan sampai '='
+BULLETIN_REGEX = re.compile(r'^([A-Z]{4}\d{2}) ([A-Z]{4}) (\d{6})[^\n]*\n((?:METAR|SPECI)[^=]*=)', re.MULTILINE)
+
+# Byte terakhir yang diminta ulang pada request Range untuk memastikan respons 206
+# masih lanjutan dokumen yang sama (extract_cmss.pl adalah CGI; isinya bisa berganti)
+RANGE_OVERLAP = 256
+
 
 class CMSSMetarFetcher:
-    def __init__(self, url_cmss):
+    def __init__(self, url_cmss, header="SAID35", station="WADS", timeout=10):
         """Inisialisasi dengan URL CMSS untuk pengambilan data METAR."""
         self.url = url_cmss
+        self.header = header  # Header bulletin default, mis. SAID35
+        self.station = station  # Kode ICAO stasiun default
+        self.timeout = timeout  # Batas waktu setiap request (detik)
+        self.session = requests.Session()  # Koneksi dipakai ulang antar polling
         self.data = None  # Tempat menyimpan data dari server setelah diambil
+        self.bulletins = []  # (header, station, ddhhmm, start, end) sesuai urutan di data
+        self.index = {}  # (header, station, ddhhmm) -> posisi di self.bulletins
+        self.by_station = {}  # (header, station) -> ([kunci waktu terurut, lihat time_key], [posisi])
+        self._indexed_data = None
+        self._indexed_upto = 0  # Offset akhir bulletin terakhir yang sudah diindeks
+
+        # Status untuk fetch_incremental()
+        self.etag = None
+        self.last_modified = None
+        self.accept_ranges = False
+        self.raw_length = 0  # Jumlah byte respons yang sudah diterima dari server
+        self.raw_tail = b""  # RANGE_OVERLAP byte terakhir respons tersebut
+        self.fetch_stats = {'requests': 0, 'bytes': 0, 'not_modified': 0, 'partial': 0, 'full': 0,
+                            'last_latency': None}
+
+    def _get(self, headers=None):
+        start = time.perf_counter()
+        with span("cmss.fetch"):
+            response = self.session.get(self.url, headers=headers, timeout=self.timeout)
+        self.fetch_stats['requests'] += 1
+        self.fetch_stats['bytes'] += len(response.content)
+        self.fetch_stats['last_latency'] = time.perf_counter() - start
+        return response
+
+    def _remember_validators(self, response):
+        self.etag = response.headers.get('ETag', self.etag)
+        self.last_modified = response.headers.get('Last-Modified', self.last_modified)
+        if response.status_code == 200:
+            self.accept_ranges = response.headers.get('Accept-Ranges', '').lower() == 'bytes'
+
+    def _store_full(self, response):
+        self.data = response.text.strip()
+        self.raw_length = len(response.content)
+        self.raw_tail = response.content[-RANGE_OVERLAP:]
+        self.fetch_stats['full'] += 1
+        self._remember_validators(response)
+        self.build_index()
 
     def fetch_data(self):
         """Mengambil data dari URL dan menyimpannya dalam atribut 'data'."""
         try:
             # Mengambil data dari URL CMSS
-            response = requests.get(self.url)
+            response = self._get()
             if response.status_code == 200:
-                self.data = response.text.strip()
+                self._store_full(response)
                 print("Data METAR berhasil diambil.")
             else:
                 print(f"Error: Tidak dapat mengambil data METAR. Status code: {response.status_code}")
         except requests.exceptions.RequestException as e:
             print(f"Error: Gagal mengakses URL. Detail: {e}")
 
+    def fetch_incremental(self):
+        """
+        Mengambil hanya data baru sejak fetch sebelumnya.
+
+        Memakai ETag/Last-Modified (304 jika tidak ada perubahan) dan Range byte jika
+        server mendukungnya. Range dikirim dengan If-Range dan dimulai RANGE_OVERLAP byte
+        sebelum akhir data lama; respons 206 hanya dipakai jika Content-Range dimulai di
+        offset itu dan byte tumpang-tindihnya sama dengan data lama, selain itu seluruh
+        data diambil ulang. Jika server mengirim ulang seluruh data yang diawali data
+        lama, hanya bagian barunya yang ditambahkan dan diindeks.
+
+        Returns:
+            int: Jumlah bulletin baru yang ditambahkan ke indeks, atau None jika gagal.
+        """
+        if not self.data:
+            self.fetch_data()
+            return len(self.bulletins) if self.data else None
+
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        range_start = self.raw_length - len(self.raw_tail)
+        if self.accept_ranges and (self.etag or self.last_modified):
+            headers['Range'] = f"bytes={range_start}-"
+            # Dokumen berubah (bukan hanya bertambah): server mengirim 200 berisi seluruh data
+            headers['If-Range'] = self.etag or self.last_modified
+
+        try:
+            response = self._get(headers)
+            if response.status_code == 416:
+                # Tidak ada byte baru setelah offset terakhir, kecuali dump di server menyusut (dirotasi)
+                total = response.headers.get('Content-Range', '').rpartition('/')[2]
+                if total.isdigit() and int(total) < self.raw_length:
+                    self.fetch_data()
+                    return len(self.bulletins)
+                self.fetch_stats['not_modified'] += 1
+                return 0
+            if response.status_code == 304:
+                self.fetch_stats['not_modified'] += 1
+                return 0
+            if response.status_code == 206:
+                content_range = re.match(r'bytes (\d+)-', response.headers.get('Content-Range', ''))
+                if (content_range is None or int(content_range.group(1)) != range_start
+                        or not response.content.startswith(self.raw_tail)):
+                    # Bagian dari dokumen lain (CGI membuat ulang isinya): ambil ulang semuanya
+                    self.fetch_data()
+                    return len(self.bulletins) if self.data else None
+                self.fetch_stats['partial'] += 1
+                self._remember_validators(response)
+                new = response.content[len(self.raw_tail):]
+                self.raw_length += len(new)
+                self.raw_tail = (self.raw_tail + new)[-RANGE_OVERLAP:]
+                return self._append(new.decode(response.encoding or 'utf-8', errors='replace'))
+            if response.status_code == 200:
+                old_data = self.data
+                text = response.text
+                if text.lstrip().startswith(old_data):
+                    # Dump hanya bertambah: tambahkan bagian baru saja
+                    self._remember_validators(response)
+                    self.raw_length = len(response.content)
+                    self.raw_tail = response.content[-RANGE_OVERLAP:]
+                    self.fetch_stats['full'] += 1
+                    return self._append(text.lstrip()[len(old_data):].rstrip())
+                self._store_full(response)
+                return len(self.bulletins)
+            print(f"Error: Tidak dapat mengambil data METAR. Status code: {response.status_code}")
+        except requests.exceptions.RequestException as e:
+            print(f"Error: Gagal mengakses URL. Detail: {e}")
+        return None
+
+    def _append(self, new_text):
+        """Menambahkan teks baru ke data dan mengindeks bulletin barunya saja."""
+        if not new_text:
+            return 0
+        # Pemisah baris agar header bulletin pertama tetap berada di awal baris
+        self.data = self.data + "\n" + new_text
+        return self._index_from(self._indexed_upto)
+
+    def build_index(self):
+        """Membuat indeks bulletin (header, stasiun, ddhhmm) -> offset dalam satu kali scan data."""
+        self.bulletins = []
+        self.index = {}
+        self.by_station = {}
+        self._indexed_upto = 0
+        self._index_from(0)
+
+    @staticmethod
+    def time_key(metar_time, now=None):
+        """
+        Kunci urut 'YYYYMMddhhmm' untuk waktu ddhhmm, dengan bulan hasil resolve_observation (UTC).
+
+        Dump yang melewati akhir bulan jadi terurut benar: '01...' bulan ini setelah '31...' bulan lalu.
+        """
+        try:
+            observed = resolve_observation(int(metar_time[:2]), int(metar_time[2:4]), int(metar_time[4:6]), now)
+        except ValueError:
+            return "000000" + metar_time  # Tanggal yang tidak ada: dianggap paling lama
+        return f"{observed:%Y%m}{metar_time}"
+
+    def _index_from(self, offset):
+        with span("cmss.index"):
+            added = 0
+            now = datetime.now(timezone.utc)
+            keys = {}  # ddhhmm -> kunci waktu; banyak stasiun berbagi waktu yang sama
+            for match in BULLETIN_REGEX.finditer(self.data or "", offset):
+                header, station, metar_time = match.group(1, 2, 3)
+                position = len(self.bulletins)
+                self.bulletins.append((header, station, metar_time, match.start(), match.end()))
+                # Bulletin yang muncul belakangan (mis. koreksi) menggantikan yang lama
+                self.index[(header, station, metar_time)] = position
+
+                key = keys.get(metar_time)
+                if key is None:
+                    key = keys[metar_time] = self.time_key(metar_time, now)
+                times, positions = self.by_station.setdefault((header, station), ([], []))
+                slot = bisect_left(times, key)
+                if slot < len(times) and times[slot] == key:
+                    positions[slot] = position
+                else:
+                    times.insert(slot, key)
+                    positions.insert(slot, position)
+                self._indexed_upto = match.end()
+                added += 1
+            self._indexed_data = self.data
+        return added
+
+    def _ensure_index(self):
+        if self._indexed_data is not self.data:
+            self.build_index()
+
+    def bulletin_text(self, position):
+        """Mengembalikan teks bulletin (header + laporan) pada posisi indeks tertentu."""
+        _, _, _, start, end = self.bulletins[position]
+        return self.data[start:end]
+
     @staticmethod
     def get_metar_time_now():
         """Menghitung waktu METAR terdekat (jam penuh atau 30 menit) berdasarkan waktu sekarang."""
@@ -38,39 +228,80 @@ class CMSSMetarFetcher:
         current_date = now.strftime("%d")  # Tanggal saat ini
         return f"{current_date}{metar_time}"  # Menghasilkan waktu dalam format 'ddhhmm'
 
-    def find_metar(self, metar_time):
-        """Mencari METAR berdasarkan kode stasiun WADS dan waktu METAR."""
+    def find_metar(self, metar_time, station=None, header=None):
+        """Mencari METAR berdasarkan kode stasiun dan waktu METAR."""
         if not self.data:
             print("Data belum diambil. Gunakan 'fetch_data()' untuk mengambil data terlebih dahulu.")
             return None
+        self._ensure_index()
 
-        # Membuat pola pencarian berdasarkan waktu
-        pattern = rf"SAID35 WADS {metar_time}\nMETAR WADS {metar_time}Z.*?="
-        match = re.search(pattern, self.data)
-
-        if match:
-            return match.group(0)  # Mengembalikan hasil pencarian
+        station = station or self.station
+        position = self.index.get((header or self.header, station, metar_time))
+        if position is not None:
+            return self.bulletin_text(position)  # Mengembalikan hasil pencarian
         else:
-            print(f"Tidak ditemukan data METAR untuk WADS pada waktu {metar_time}")
+            print(f"Tidak ditemukan data METAR untuk {station} pada waktu {metar_time}")
             return None
 
-    def find_all_metar_today(self):
+    def find_metar_range(self, start_time, end_time, station=None, header=None):
+        """
+        Mengambil semua METAR dengan waktu ddhhmm di antara start_time dan end_time (inklusif).
+
+        Kedua batas di-resolve ke bulannya seperti bulletin (lihat time_key), jadi
+        rentang '310000'-'012359' pada tanggal 1 mencakup akhir bulan lalu.
+        """
+        if not self.data:
+            print("Data belum diambil. Gunakan 'fetch_data()' untuk mengambil data terlebih dahulu.")
+            return []
+        self._ensure_index()
+
+        now = datetime.now(timezone.utc)
+        return self._between(self.time_key(start_time, now), self.time_key(end_time, now), station, header)
+
+    def _between(self, first_key, last_key, station=None, header=None):
+        times, positions = self.by_station.get((header or self.header, station or self.station), ([], []))
+        first = bisect_left(times, first_key)
+        last = bisect_right(times, last_key)
+        return [self.bulletin_text(position) for position in positions[first:last]]
+
+    def find_station(self, station=None, header=None):
+        """Mengambil semua METAR satu stasiun, terurut berdasarkan waktu."""
+        if not self.data:
+            print("Data belum diambil. Gunakan 'fetch_data()' untuk mengambil data terlebih dahulu.")
+            return []
+        self._ensure_index()
+
+        _, positions = self.by_station.get((header or self.header, station or self.station), ([], []))
+        return [self.bulletin_text(position) for position in positions]
+
+    def find_latest(self, count=1, station=None, header=None):
+        """Mengambil `count` METAR terakhir satu stasiun, dari yang terbaru."""
+        if not self.data:
+            print("Data belum diambil. Gunakan 'fetch_data()' untuk mengambil data terlebih dahulu.")
+            return []
+        self._ensure_index()
+
+        _, positions = self.by_station.get((header or self.header, station or self.station), ([], []))
+        return [self.bulletin_text(position) for position in reversed(positions[-count:])] if count > 0 else []
+
+    def find_all_metar_today(self, station=None, header=None):
         """Mengambil semua data METAR pada hari ini berdasarkan tanggal saat ini."""
         if not self.data:
             print("Data belum diambil. Gunakan 'fetch_data()' untuk mengambil data terlebih dahulu.")
             return []
 
         now = datetime.now(timezone.utc)  # Mengambil waktu saat ini dalam UTC
-        current_date = now.strftime("%d")  # Tanggal saat ini dalam format 2 digit (dd)
+        today = now.strftime("%Y%m%d")  # Awal kunci waktu hari ini (lihat time_key)
+        current_date = today[6:]  # Tanggal saat ini dalam format 2 digit (dd)
 
-        # Mencari semua entri yang cocok dengan pola SAID35 WADS pada tanggal hari ini
-        pattern = rf"SAID35 WADS {current_date}\d{{4}}\nMETAR WADS {current_date}\d{{4}}Z.*?="
-        matches = re.findall(pattern, self.data)
+        # Mencari semua entri stasiun pada tanggal hari ini lewat indeks
+        self._ensure_index()
+        matches = self._between(today + "0000", today + "2359", station, header)
 
         if matches:
             return matches  # Mengembalikan semua data METAR yang ditemukan
         else:
-            print(f"Tidak ditemukan data METAR untuk WADS pada hari ini ({current_date})")
+            print(f"Tidak ditemukan data METAR untuk {station or self.station} pada hari ini ({current_date})")
             return []
 
     def get_latest_metar(self):
@@ -79,24 +310,25 @@ class CMSSMetarFetcher:
         return self.find_metar(metar_time)  # Cari dan kembalikan data METAR untuk waktu tersebut
 
 
-# Penggunaan class
-url = "http://172.19.1.1/cgi-bin/extract_cmss.pl"  # Ubah ini dengan URL yang valid
+if __name__ == "__main__":
+    # Penggunaan class
+    url = "http://172.19.1.1/cgi-bin/extract_cmss.pl"  # Ubah ini dengan URL yang valid
 
-# Inisialisasi objek fetcher
-cmss_fetcher = CMSSMetarFetcher(url)
+    # Inisialisasi objek fetcher
+    cmss_fetcher = CMSSMetarFetcher(url)
 
-# Mengambil data dari server
-cmss_fetcher.fetch_data()
+    # Mengambil data dari server
+    cmss_fetcher.fetch_data()
 
-# Mengambil data METAR terbaru (jam penuh atau 30 menit terdekat)
-latest_metar = cmss_fetcher.get_latest_metar()
-if latest_metar:
-    print(f"Data METAR terbaru:\n{latest_metar}")
+    # Mengambil data METAR terbaru (jam penuh atau 30 menit terdekat)
+    latest_metar = cmss_fetcher.get_latest_metar()
+    if latest_metar:
+        print(f"Data METAR terbaru:\n{latest_metar}")
 
-# Mengambil semua METAR pada hari ini
-all_metar_today = cmss_fetcher.find_all_metar_today()
-if all_metar_today:
-    print("\nSemua data METAR untuk hari ini:")
-    for metar in all_metar_today:
-        print(metar)
-        print("------------------------------------------------")
+    # Mengambil semua METAR pada hari ini
+    all_metar_today = cmss_fetcher.find_all_metar_today()
+    if all_metar_today:
+        print("\nSemua data METAR untuk hari ini:")
+        for metar in all_metar_today:
+            print(metar)
+            print("------------------------------------------------")
@@ -1,37 +1,67 @@
 import logging
+import re
+import time
 from datetime import datetime
-from browsermanager import BrowserManager
-from nosig_reader import MetarReader
+from browsermanager import BrowserManager, PagePool
+from metar_pipeline import MetarPipeline, lines_source
+from metar_priority import classify_priority
+from metar_validation import RejectList, ValidationError, resolve_observation, validating_parser
+from nosig_reader import parse_many
+from submission_ledger import SubmissionLedger, report_key
+import tracing
+from tracing import span
+
+# Stasiun (nomor WMO) dan pengamat yang dipilih di form bila tidak ditentukan lain
+DEFAULT_STATION_ID = "97260"
+DEFAULT_OBSERVER = "Zulkifli Ramadhan"
+
+# Batas waktu (ms) untuk menunggu sinyal dari halaman, pengganti jeda tetap 3 detik
+READY_TIMEOUT = 15000
+SUBMIT_TIMEOUT = 30000
+
+# URL request POST yang menyimpan laporan (bukan autosave, preview atau analytics). Nama
+# pastinya belum dicek di network log bmkgsatu; bila tidak cocok, submit gagal karena
+# timeout dan tidak pernah dianggap berhasil
+SUBMIT_ENDPOINT = re.compile(r"/metarspeci/?(\?|$)")
+
+
+def form_date(input_day: str, now=None):
+    """Resolve the day of a report to its UTC date (see metar_validation.resolve_observation)."""
+    if not input_day.isdigit() or not (1 <= int(input_day) <= 31):
+        raise ValueError("Invalid day. Please enter a number between 1 and 31.")
+    return resolve_observation(int(input_day), now=now).date()
 
-# Set up logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+def get_custom_date_selector(input_day: str, now=None) -> str:
+    observed = form_date(input_day, now)
+    custom_date_selector = f"{observed.month}/{observed.day}/{observed.year}"
+    # Penanda (Today) di date picker mengikuti jam lokal browser, bukan UTC
+    if observed == datetime.now().date():
+        custom_date_selector += " (Today)"
+    return custom_date_selector
 
-def get_custom_date_selector(input_day: str) -> str:
-    current_month = datetime.now().month
-    current_year = datetime.now().year
-    current_day = datetime.now().day
 
-    if not input_day.isdigit() or not (1 <= int(input_day) <= 31):
-        raise ValueError("Invalid day. Please enter a number between 1 and 31.")
+def date_picker_steps(input_day: str, now=None) -> int:
+    """Months the date picker must go back from the local current month to show the report's date."""
+    observed = form_date(input_day, now)
+    today = datetime.now().date()
+    return (today.year - observed.year) * 12 + today.month - observed.month
 
-    if int(input_day) == current_day:
-        custom_date_selector = f"/{input_day}/{current_year} (Today)"
-    else:
-        custom_date_selector = f"{current_month}/{input_day}/"
 
-    return custom_date_selector
+CLOUD_OKTAS = {
+    "FEW": "1-2 oktas",
+    "SCT": "3-4 oktas",
+    "BKN": "5-7 oktas",
+    "OVC": "8 oktas"
+}
 
+# Pilihan untuk laporan tanpa lapisan awan (NSC/NCD/CAVOK): opsi kosong #clouds-jumlah dan
+# tidak ada baris awan. Belum dicek di form bmkgsatu; ubah bila form punya opsi NSC sendiri
+NO_CLOUD_OPTION = ""
 
-def handle_cloud_selection(page, cloud_type: str, cloud_subtype: str, cloud_height=None):
-    cloud_oktas_mapping = {
-        "FEW": "1-2 oktas",
-        "SCT": "3-4 oktas",
-        "BKN": "5-7 oktas",
-        "OVC": "8 oktas"
-    }
 
-    okta_value = cloud_oktas_mapping.get(cloud_type)
+def handle_cloud_selection(page, cloud_type: str, cloud_subtype: str, cloud_height=None):
+    okta_value = CLOUD_OKTAS.get(cloud_type)
 
     if not okta_value:
         logging.error("Invalid cloud type provided.")
@@ -53,122 +83,497 @@ def handle_cloud_selection(page, cloud_type: str, cloud_subtype: str, cloud_heig
         logging.error(f"Error during cloud selection: {e}")
 
 
-def fill_form(page, user_input):
+def select_no_cloud(page):
+    """Selects the form's no-cloud option for a report without cloud layers (NSC/NCD/CAVOK)."""
+    try:
+        page.get_by_label("General").locator("#clouds-jumlah").select_option(NO_CLOUD_OPTION)
+        logging.info("No cloud layer selected.")
+    except Exception as e:
+        logging.error(f"Error during cloud selection: {e}")
+
+
+def cloud_key(clouds):
+    """What the cloud picker holds after `select_clouds`: the first layer, or NO_CLOUD_OPTION."""
+    if not clouds:
+        return NO_CLOUD_OPTION
+    return clouds[0]['cloud_type'], clouds[0]['cloud_height'], clouds[0]['cloud_subtype']
+
+
+def select_clouds(page, clouds):
+    """Selects the first cloud layer of a parsed report, or the no-cloud option when there is none."""
+    if clouds:
+        handle_cloud_selection(page, clouds[0]['cloud_type'], clouds[0]['cloud_subtype'], clouds[0]['cloud_height'])
+    else:
+        select_no_cloud(page)
+
+
+def fill_form(page, user_input, header_ready=False, station_id=DEFAULT_STATION_ID, observer=DEFAULT_OBSERVER):
+    """
+    Fills and submits the form for one parsed report under `station_id` and `observer`.
+
+    With `header_ready`, the station and observer chosen for the previous report are
+    still selected and steps 1-2 are skipped. FormPlan is the faster path for runs of
+    reports on one page.
+
+    Returns True when the server accepted the submission.
+    """
     try:
 
         # Extract data from parsed METAR
         input_day = user_input['day']
-        cloud_type = user_input['clouds'][0]['cloud_type']
-        cloud_height = user_input['clouds'][0]['cloud_height']
-        cloud_subtype = user_input['clouds'][0]['cloud_subtype']
+        clouds = user_input['clouds']  # Kosong untuk NSC/NCD/CAVOK
 
-        # Step 1: Kode stasiun
-        logging.info("Filling station code...")
-        page.wait_for_load_state("networkidle")
-        page.locator("#vs2__combobox").scroll_into_view_if_needed()
-        page.locator("#vs2__combobox").get_by_label("Loading...").click()
-        page.get_by_role("option", name="97260").click()
-        logging.info("Station code selected.")
-
-        # Step 2: Pengamat
-        logging.info("Selecting observer...")
-        page.wait_for_load_state("networkidle")
-        page.get_by_label("Loading...", exact=True).click()
-        page.get_by_role("option", name="Zulkifli Ramadhan").click()
-        logging.info("Observer selected.")
+        if not header_ready:
+            select_station_and_observer(page, station_id, observer)  # Step 1-2
 
         # Step 3: Tanggal (Date)
-        logging.info("Selecting date...")
-        custom_date_selector = get_custom_date_selector(input_day)
-        page.locator("#datepicker__value_").click()
-        page.get_by_label(custom_date_selector).click()
-        logging.info("Date selected.")
+        select_date(page, input_day)
 
         # Step 4: Waktu METAR (Time)
-        logging.info("Filling METAR time...")
-        page.get_by_label("Jam").select_option(user_input['hour'])
-        page.get_by_label("Menit").select_option(user_input['minute'])
-        logging.info("Time selected.")
-        page.wait_for_load_state("networkidle")
-        page.wait_for_timeout(3000)
+        with span("form.time"):
+            logging.info("Filling METAR time...")
+            page.get_by_label("Jam").select_option(user_input['hour'])
+            page.get_by_label("Menit").select_option(user_input['minute'])
+            logging.info("Time selected.")
+            # Tunggu data untuk jam terpilih dimuat dan isian angin siap, bukan jeda tetap
+            page.wait_for_load_state("networkidle")
+            page.get_by_label("Arah Angin (derajat)").wait_for(state="visible", timeout=READY_TIMEOUT)
 
         # Step 5: Arah dan kecepatan angin (Wind direction and speed)
-        logging.info("Filling wind direction and speed...")
-        page.get_by_label("Arah Angin (derajat)").click()
-        page.get_by_label("Arah Angin (derajat)").fill(user_input['wind_direction'])
-        page.get_by_label("Kecepatan Angin (knot)").click()
-        page.get_by_label("Kecepatan Angin (knot)").fill(user_input['wind_speed'])
-        logging.info("Wind direction and speed filled.")
+        with span("form.wind"):
+            logging.info("Filling wind direction and speed...")
+            page.get_by_label("Arah Angin (derajat)").click()
+            page.get_by_label("Arah Angin (derajat)").fill(user_input['wind_direction'])
+            page.get_by_label("Kecepatan Angin (knot)").click()
+            page.get_by_label("Kecepatan Angin (knot)").fill(user_input['wind_speed'])
+            logging.info("Wind direction and speed filled.")
 
         # Step 6: Visibility
-        logging.info("Filling visibility...")
-        page.get_by_role("spinbutton", name="Prevailling (m) Jarak pandang").click()
-        page.get_by_role("spinbutton", name="Prevailling (m) Jarak pandang").fill(user_input['visibility'])
-        logging.info("Visibility filled.")
+        with span("form.visibility"):
+            logging.info("Filling visibility...")
+            page.get_by_role("spinbutton", name="Prevailling (m) Jarak pandang").click()
+            page.get_by_role("spinbutton", name="Prevailling (m) Jarak pandang").fill(user_input['visibility'])
+            logging.info("Visibility filled.")
 
         # Step 7: Awan (Clouds)
-        logging.info("Selecting cloud type and subtype...")
-        handle_cloud_selection(page, cloud_type, cloud_subtype, cloud_height)
-        logging.info("Cloud selection completed.")
+        with span("form.clouds"):
+            logging.info("Selecting cloud type and subtype...")
+            select_clouds(page, clouds)
+            logging.info("Cloud selection completed.")
 
         # Step 8: Suhu dan kelembaban (Temperature and Dew Point)
-        logging.info("Filling temperature and dew point...")
-        page.locator("#v-air-temp").fill(user_input['temperature'])
-        page.locator("#v-dew-point").fill(user_input['dew_point'])
-        logging.info("Temperature and dew point filled.")
+        with span("form.temperature"):
+            logging.info("Filling temperature and dew point...")
+            page.locator("#v-air-temp").fill(user_input['temperature'])
+            page.locator("#v-dew-point").fill(user_input['dew_point'])
+            logging.info("Temperature and dew point filled.")
 
         # Step 9: Tekanan udara (Pressure)
-        logging.info("Filling air pressure...")
-        page.get_by_label("TEKANAN UDARA (QNH)").fill(user_input['pressure'])
-        logging.info("Air pressure filled.")
+        with span("form.pressure"):
+            logging.info("Filling air pressure...")
+            page.get_by_label("TEKANAN UDARA (QNH)").fill(user_input['pressure'])
+            logging.info("Air pressure filled.")
 
         # Step 10: Trend NOSIG
-        logging.info("Selecting trend NOSIG...")
-        page.get_by_role("tab", name="Trend").click()
-        page.get_by_label("Trend").locator("#input-type").select_option(user_input['trend'])
-        logging.info("Trend NOSIG selected.")
+        with span("form.trend"):
+            logging.info("Selecting trend NOSIG...")
+            page.get_by_role("tab", name="Trend").click()
+            page.get_by_label("Trend").locator("#input-type").select_option(user_input['trend'])
+            logging.info("Trend NOSIG selected.")
 
         # Step 11: Submit
-        logging.info("Clicking preview button...")
-        page.get_by_role("button", name="Preview").click()
-        logging.info("Form preview completed.")
-        page.get_by_role("button", name="Submit").click()
+        return submit_form(page)
 
     except Exception as e:
         logging.error(f"Error filling form: {e}")
+        return False
+
+
+def select_station_and_observer(page, station_id=DEFAULT_STATION_ID, observer=DEFAULT_OBSERVER):
+    # Step 1: Kode stasiun
+    with span("form.station"):
+        logging.info("Filling station code...")
+        page.wait_for_load_state("networkidle")
+        page.locator("#vs2__combobox").scroll_into_view_if_needed()
+        page.locator("#vs2__combobox").get_by_label("Loading...").click()
+        page.get_by_role("option", name=station_id).click()
+        logging.info("Station code selected.")
+
+    # Step 2: Pengamat
+    with span("form.observer"):
+        logging.info("Selecting observer...")
+        page.wait_for_load_state("networkidle")
+        page.get_by_label("Loading...", exact=True).click()
+        page.get_by_role("option", name=observer).click()
+        logging.info("Observer selected.")
+
+
+def select_date(page, input_day):
+    with span("form.date"):
+        logging.info("Selecting date...")
+        custom_date_selector = get_custom_date_selector(input_day)
+        steps = date_picker_steps(input_day)
+        page.locator("#datepicker__value_").click()
+        for _ in range(abs(steps)):
+            # Laporan akhir bulan lalu (atau 00Z UTC hari berikutnya) ada di bulan lain
+            page.get_by_label("Previous month" if steps > 0 else "Next month", exact=True).click()
+        page.get_by_label(custom_date_selector, exact=True).click()
+        logging.info("Date selected.")
+
+
+def is_submit_response(response, endpoint=SUBMIT_ENDPOINT):
+    """True for the response to the form's submit request: a POST whose URL matches `endpoint`."""
+    return response.request.method == "POST" and endpoint.search(response.url) is not None
 
 
-def process_metar_line(browser_page, metar_code):
-    """Processes a single METAR code, fills the form, and handles errors."""
-    if metar_code.strip():
+def submit_form(page):
+    """Previews and submits the form; returns True when the server accepted it."""
+    with span("form.preview"):
+        logging.info("Clicking preview button...")
+        page.get_by_role("button", name="Preview").click()
+        logging.info("Form preview completed.")
+    # Tunggu respons server atas submit, bukan sekadar klik
+    with span("form.submit"), page.expect_response(is_submit_response, timeout=SUBMIT_TIMEOUT) as response_info:
+        page.get_by_role("button", name="Submit").click()
+    response = response_info.value
+    if not response.ok:
+        logging.error(f"Submission rejected: HTTP {response.status}")
+        return False
+    logging.info("Form submitted.")
+    return True
+
+
+# Rencana pengisian form: (field hasil nosig_reader, jenis kontrol, locator) sesuai urutan fill_form
+TIME_PLAN = [
+    ('hour', 'select', lambda page: page.get_by_label("Jam")),
+    ('minute', 'select', lambda page: page.get_by_label("Menit")),
+]
+GENERAL_PLAN = [
+    ('wind_direction', 'fill', lambda page: page.get_by_label("Arah Angin (derajat)")),
+    ('wind_speed', 'fill', lambda page: page.get_by_label("Kecepatan Angin (knot)")),
+    ('visibility', 'fill', lambda page: page.get_by_role("spinbutton", name="Prevailling (m) Jarak pandang")),
+    ('temperature', 'fill', lambda page: page.locator("#v-air-temp")),
+    ('dew_point', 'fill', lambda page: page.locator("#v-dew-point")),
+    ('pressure', 'fill', lambda page: page.get_by_label("TEKANAN UDARA (QNH)")),
+]
+TREND_PLAN = [
+    ('trend', 'select', lambda page: page.get_by_label("Trend").locator("#input-type")),
+]
+
+# Baca/tulis banyak kontrol sekaligus dalam satu panggilan ke halaman. Nilai ditulis
+# lalu event input/change dikirim agar v-model aplikasi ikut berubah.
+_READ_VALUES = "ids => ids.map(id => { const el = document.getElementById(id); return el ? el.value : null; })"
+_WRITE_VALUES = """entries => entries.every(([id, value]) => {
+    const el = document.getElementById(id);
+    if (!el) return false;
+    el.value = value;
+    el.dispatchEvent(new Event('input', {bubbles: true}));
+    el.dispatchEvent(new Event('change', {bubbles: true}));
+    return el.value === value;
+})"""
+
+
+class FormPlan:
+    """
+    Fill plan for one page: form controls resolved once, and only changed fields updated.
+
+    The locators of the plan are resolved to element ids on first use. Before each
+    report the current values of all controls are read in one call, and only the
+    controls whose value differs are written (also in one call where possible).
+    The date picker and cloud picker cannot be read back, so they are only touched
+    when the value differs from the previous submit on this page. A cloud row cannot
+    be removed, so another first layer than the one on the page means a reload. The station and
+    observer are selected once per page (see `use_header`).
+    """
+
+    def __init__(self, page):
+        self.page = page
+        self.ids = None  # field -> element id (None: fall back to the Playwright locator)
+        self.locators = {field: (kind, locate(page)) for field, kind, locate in TIME_PLAN + GENERAL_PLAN + TREND_PLAN}
+        self.header = (DEFAULT_STATION_ID, DEFAULT_OBSERVER)
+        self.header_ready = False
+        self.last_day = None
+        self.last_cloud = None
+        self.stats = {'reports': 0, 'fields_written': 0, 'fields_skipped': 0}
+
+    def _resolve(self):
+        self.ids = {}
+        for field, (_, locator) in self.locators.items():
+            element_id = locator.get_attribute("id")
+            self.ids[field] = element_id or None
+
+    def _apply(self, plan, user_input):
+        """Write the fields of `plan` whose current value differs from the report."""
+        fields = [field for field, _, _ in plan if user_input.get(field) is not None]
+        by_id = [field for field in fields if self.ids[field]]
+        current = {}
+        if by_id:
+            current = dict(zip(by_id, self.page.evaluate(_READ_VALUES, [self.ids[f] for f in by_id])))
+        changed = [field for field in fields if field not in current or current[field] != user_input[field]]
+        self.stats['fields_written'] += len(changed)
+        self.stats['fields_skipped'] += len(fields) - len(changed)
+
+        batch = [[self.ids[field], user_input[field]] for field in changed if self.ids[field]]
+        if batch and not self.page.evaluate(_WRITE_VALUES, batch):
+            # Nilai tidak diterima (mis. opsi tidak ada): ulangi lewat Playwright
+            batch = []
+        written = {entry[0] for entry in batch}
+        for field in changed:
+            if self.ids[field] in written:
+                continue
+            kind, locator = self.locators[field]
+            if kind == 'select':
+                locator.select_option(user_input[field])
+            else:
+                locator.fill(user_input[field])
+        return changed
+
+    def fill(self, user_input):
+        """Fill and submit one parsed report; returns True when the server accepted it."""
         try:
-            # Parse the METAR code
-            parsed_metar = MetarReader(metar_code.strip()).parse()
-            # Fill the form with parsed METAR data
-            fill_form(browser_page, parsed_metar)
-            logging.info(f"Finished processing METAR code: {metar_code}")
+            clouds = user_input['clouds']
+            key = cloud_key(clouds)
+            if key != self.last_cloud and self.last_cloud not in (None, NO_CLOUD_OPTION):
+                # Baris awan laporan sebelumnya tidak bisa dihapus dari form: mulai dari halaman baru
+                with span("form.reload"):
+                    self.page.reload()
+                    self.page.locator("#vs2__combobox").wait_for(state="visible", timeout=READY_TIMEOUT)
+                self.invalidate()
+            if self.ids is None:
+                self._resolve()
+            self.page.get_by_role("tab", name="General").click()
+
+            if not self.header_ready:
+                select_station_and_observer(self.page, *self.header)
+                self.header_ready = True
+            if user_input['day'] != self.last_day:
+                select_date(self.page, user_input['day'])
+                self.last_day = user_input['day']
+
+            with span("form.time"):
+                if self._apply(TIME_PLAN, user_input):
+                    # Jam baru memuat data dari server; tunggu sebelum membandingkan isian lain
+                    self.page.wait_for_load_state("networkidle")
+                    self.locators['wind_direction'][1].wait_for(state="visible", timeout=READY_TIMEOUT)
+            with span("form.plan_fields"):
+                changed = self._apply(GENERAL_PLAN, user_input)
+
+            if key != self.last_cloud:
+                with span("form.clouds"):
+                    select_clouds(self.page, clouds)
+                self.last_cloud = key
+
+            with span("form.trend"):
+                self.page.get_by_role("tab", name="Trend").click()
+                changed += self._apply(TREND_PLAN, user_input)
+            logging.info(f"Fill plan updated {len(changed)} fields: {', '.join(changed) or '-'}")
+
+            self.stats['reports'] += 1
+            ok = submit_form(self.page)
         except Exception as e:
-            logging.error(f"Error processing METAR code '{metar_code}': {e}")
+            logging.error(f"Error filling form: {e}")
+            ok = False
+        if not ok:
+            self.invalidate()
+        return ok
+
+    def use_header(self, station_id, observer):
+        """
+        Submit the following reports under `station_id` and `observer`.
+
+        Returns True when another station or observer is already selected on the page;
+        the caller must then reload the page (and `invalidate`) before the next fill.
+        """
+        header = (station_id, observer)
+        if header == self.header:
+            return False
+        self.header = header
+        return self.header_ready
+
+    def invalidate(self):
+        """Forget everything known about the page (after a reload or failed submit)."""
+        self.ids = None
+        self.header_ready = False
+        self.last_day = None
+        self.last_cloud = None
+
+
+def process_metar_line(browser_page, result, plan=None):
+    """Fills the form for a single parsed METAR code (through `plan` if given) and handles errors."""
+    if result.error is not None:
+        if not isinstance(result.error, ValidationError):  # Penolakan validasi sudah dicatat
+            logging.error(f"Error parsing METAR code '{result.raw.strip()}': {result.error}")
+        return False
+    try:
+        # Fill the form with parsed METAR data
+        ok = plan.fill(result.parsed) if plan is not None else fill_form(browser_page, result.parsed)
+        if not ok:
+            return False
+        logging.info(f"Finished processing METAR code: {result.raw.strip()}")
+        return True
+    except Exception as e:
+        logging.error(f"Error processing METAR code '{result.raw.strip()}': {e}")
+        return False
 
 
 def reload_browser_page(manager, browser_page):
     """Reloads the browser page and ensures the page is fully loaded before continuing."""
     try:
-        # Reload the page
-        manager.reload_page()
-        # Wait for the page to fully load
-        browser_page.wait_for_load_state('networkidle')
-        logging.info("Page fully loaded after reload.")
-
-        # Add a short delay to ensure page stability
-        browser_page.wait_for_timeout(3000)  # Wait for 3 seconds
+        with span("form.reload"):
+            # Reload the page
+            manager.reload_page()
+            # Wait for the page to fully load
+            browser_page.wait_for_load_state('networkidle')
+            logging.info("Page fully loaded after reload.")
+
+            # Wait until the form itself is ready instead of a fixed delay
+            browser_page.locator("#vs2__combobox").wait_for(state="visible", timeout=READY_TIMEOUT)
         logging.info("Page reloaded successfully for the next METAR code.")
     except Exception as reload_error:
         logging.error(f"Error reloading page: {reload_error}")
 
 
-def handle_user_input(manager, browser_page):
-    """Handles the user input, processes multiple METAR codes, and reloads the page after each one."""
+def submit_on_page(page, result, page_state, reload):
+    """
+    Fills and submits one parsed report on `page` through the page's FormPlan.
+
+    `page_state` keeps the FormPlan of the page between reports. `reload` is called to
+    get a clean form after a failed submit.
+    """
+    start = time.perf_counter()
+    plan = page_state.get('plan')
+    if plan is None:
+        plan = page_state['plan'] = FormPlan(page)
+    with span("form.report"):
+        ok = process_metar_line(page, result, plan)  # Process each METAR line
+    if not ok:
+        plan.invalidate()
+        reload()  # Clean form after a failure
+    logging.info(f"METAR code handled in {time.perf_counter() - start:.2f} s")
+    return ok
+
+
+def already_submitted(ledger, result):
+    """Checks the ledger before any browser/HTTP work; returns (skip, key)."""
+    if ledger is None:
+        return False, None
+    key = report_key(result.raw)
+    if ledger.contains(key):
+        logging.info(f"Already submitted, skipping METAR code: {result.raw.strip()}")
+        return True, key
+    return False, key
+
+
+def submit_stage(manager, browser_page, api_client=None, ledger=None):
+    """
+    Returns the pipeline's submission stage: update the form through its FormPlan
+    and submit (reloading the page if the submit failed).
+
+    With an `api_client` (metar_api.MetarApiClient) reports are posted straight to the
+    form's API; the browser form is only used when that fails. With a `ledger`
+    (submission_ledger.SubmissionLedger) reports submitted before are skipped and
+    every successful submit is recorded.
+    """
+    page_state = {}
+    if api_client is not None:
+        from metar_api import SubmissionUnknown  # requests hanya dimuat bila API dipakai
+
+    def submit(result):
+        if result.error is not None:
+            return process_metar_line(browser_page, result)  # Only logs the parse error
+        skip, key = already_submitted(ledger, result)
+        if skip:
+            return True
+
+        backend = 'api'
+        try:
+            ok = api_client is not None and api_client.submit(result.parsed)
+        except SubmissionUnknown as e:
+            # Bisa jadi sudah tersimpan: jangan kirim lagi lewat form
+            logging.error(f"Not submitting '{result.raw.strip()}' through the browser form: {e}")
+            return False
+        if ok:
+            logging.info(f"Finished processing METAR code: {result.raw.strip()}")
+        else:
+            if api_client is not None:
+                logging.warning("Falling back to the browser form.")
+            backend = 'browser'
+            ok = submit_on_page(browser_page, result, page_state, lambda: reload_browser_page(manager, browser_page))
+        if ok and ledger is not None:
+            ledger.record(key, result.raw, backend)
+        return ok
+    return submit
+
+
+def pooled_submit(page, job, page_state, ledger=None, header=None):
+    """
+    PagePool handler for a (result, ledger key) job; a failed reload raises so the pool recycles the page.
+
+    With `header` (station_id, observer), the report is submitted for that station; the
+    page is reloaded first when another station is selected on it.
+    """
+    result, key = job
+
+    def reload():
+        with span("form.reload"):
+            page.reload()
+            page.locator("#vs2__combobox").wait_for(state="visible", timeout=READY_TIMEOUT)
+    if header is not None:
+        plan = page_state.get('plan')
+        if plan is None:
+            plan = page_state['plan'] = FormPlan(page)
+        if plan.use_header(*header):
+            reload()  # Stasiun/pengamat lain sudah terpilih di halaman ini
+            plan.invalidate()
+    ok = submit_on_page(page, result, page_state, reload)
+    if ok and ledger is not None:
+        ledger.record(key, result.raw, 'browser')
+    return ok
+
+
+def handle_source(manager, browser_page, source, api_client=None, ledger=None, rejects=None):
+    """
+    Runs one report source through the parse -> validate -> submit pipeline and returns its metrics.
+
+    Reports that fail to parse or validate are added to `rejects` (metar_validation.RejectList).
+    SPECIs and current reports are submitted before backfill, whatever their order in
+    `source` (see metar_priority).
+    """
+    # Parsing dan validasi berjalan di thread sendiri mendahului browser; laporan yang
+    # gagal parse atau ditolak validasi tidak sampai ke browser
+    return MetarPipeline(source, submit_stage(manager, browser_page, api_client, ledger),
+                         parse_many=validating_parser(parse_many, rejects), prioritize=classify_priority).run()
+
+
+def handle_source_pooled(manager, url, source, pages, ledger=None, rejects=None):
+    """
+    Like handle_source, but submits on a pool of `pages` browser pages in parallel.
+
+    The pages share the login of `manager`'s persistent profile; each parsed report
+    goes to whichever page is free.
+    """
+    pool = PagePool(manager, url, pages)
+    pool.start(lambda page, job, page_state: pooled_submit(page, job, page_state, ledger))
+
+    def dispatch(result):
+        if result.error is not None:
+            return process_metar_line(None, result)  # Only logs the parse error
+        skip, key = already_submitted(ledger, result)
+        if not skip:
+            pool.submit((result, key))
+        return True
+
+    try:
+        # Antrean PagePool hanya sebesar jumlah halaman, jadi urutan prioritas tetap berlaku
+        metrics = MetarPipeline(source, dispatch, parse_many=validating_parser(parse_many, rejects),
+                                prioritize=classify_priority).run()
+    finally:
+        logging.info(f"Page pool finished: {pool.join()}")
+    return metrics
+
+
+def handle_user_input(manager, browser_page, api_client=None, ledger=None, rejects=None):
+    """Handles the user input, and processes multiple METAR codes (SPECI and current reports first)."""
     while True:
         # Get METAR input from the user
         metar_input = input("Masukan beberapa baris METAR (or type 'exit' to quit): ")
@@ -177,31 +582,70 @@ def handle_user_input(manager, browser_page):
 
         # Split the input into multiple lines and process each one
         metar_lines = metar_input.strip().split("\n")
-
-        for metar_code in metar_lines:
-            process_metar_line(browser_page, metar_code)  # Process each METAR line
-            reload_browser_page(manager, browser_page)  # Reload the page after each METAR code
+        handle_source(manager, browser_page, lines_source(metar_lines), api_client, ledger, rejects)
 
         logging.info("Waiting for the next input...")
 
 
-def run_process():
-    """Main function to set up the browser and start the loop."""
+def run_process(source=None, api_config=None, pages=1, fast=False, cdp_url=None, ledger_path="./submissions.db",
+                trace=False, rejects_path="./rejects.jsonl"):
+    """
+    Main function to set up the browser and start the loop (or drain `source` if given).
+
+    With `api_config` (a JSON file, see metar_api.load_api_config), reports are submitted
+    through the form's HTTP API using the browser's login session, and the browser form
+    is only the fallback. With `pages` > 1, `source`
+    is submitted on that many browser pages in parallel (e.g. to backfill a day).
+    `fast` and `cdp_url` select BrowserManager's fast mode or attach to a running browser.
+    Reports recorded in the submission ledger at `ledger_path` are skipped (None disables it).
+    Reports that fail validation are appended to `rejects_path` (None keeps them in memory only).
+    With `trace`, per-step timings are written to trace.jsonl and summarized (p50/p95/p99)
+    in the log and in metar_trace.prom at exit.
+    """
+    if trace:
+        tracing.enable(jsonl_path="trace.jsonl")
     # Define user data directory and the target URL
     user_data_dir = "./user_data"
     url = "https://bmkgsatu.bmkg.go.id/meteorologi/metarspeci"
 
     # Start the browser
-    manager = BrowserManager(user_data_dir=user_data_dir, headless=False)
-    manager.start_browser(url)
+    # PagePool membuka halamannya di browser ini lewat endpoint CDP lokal
+    manager = BrowserManager(user_data_dir=user_data_dir, headless=None if fast else False, fast=fast,
+                             cdp_url=cdp_url, remote_debugging=source is not None and pages > 1)
+    manager.start_browser(url, ready_selector="#vs2__combobox")  # Logs the time to an interactive form
     browser_page = manager.page
+    api_client = None
+    if api_config:
+        from metar_api import MetarApiClient, load_api_config  # requests hanya dimuat bila dipakai
+        api_client = MetarApiClient.from_browser(manager, station_id=DEFAULT_STATION_ID, observer=DEFAULT_OBSERVER,
+                                                 **load_api_config(api_config))
+    ledger = SubmissionLedger(ledger_path) if ledger_path else None
+    rejects = RejectList(rejects_path)
 
     try:
-        handle_user_input(manager, browser_page)  # Main loop for handling user input
+        if source is not None and pages > 1:
+            handle_source_pooled(manager, url, source, pages, ledger, rejects)
+        elif source is not None:
+            # e.g. metar_pipeline.file_source(path)
+            handle_source(manager, browser_page, source, api_client, ledger, rejects)
+        else:
+            handle_user_input(manager, browser_page, api_client, ledger, rejects)  # Main loop for handling user input
     finally:
+        if len(rejects):
+            logging.warning(f"{len(rejects)} reports rejected before submission"
+                            + (f", see {rejects_path}" if rejects_path else ""))
+        if api_client is not None:
+            api_client.close()
+        if ledger is not None:
+            ledger.close()
         manager.stop_browser()  # Stop the browser when done
         logging.info("Browser stopped successfully.")
+        if trace:
+            tracing.log_summary()
+            tracing.write_prometheus("metar_trace.prom")
+            tracing.disable()
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
     run_process()
@@ -0,0 +1,250 @@
+import json
+import logging
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from metar_validation import resolve_observation
+from tracing import span
+
+# Kunci localStorage tempat aplikasi web menyimpan token login
+TOKEN_STORAGE_KEY = "token"
+
+# Field hasil nosig_reader yang diisi fill_form(); field_map di konfigurasi API harus
+# memetakan nama field payload ke masing-masing field ini
+REPORT_FIELDS = ('hour', 'minute', 'wind_direction', 'wind_speed', 'visibility', 'temperature', 'dew_point',
+                 'pressure', 'trend')
+
+class SubmissionUnknown(Exception):
+    """The API did not confirm the report and it cannot be checked whether it was stored."""
+
+
+def load_api_config(path):
+    """
+    Read the API settings from a JSON file.
+
+    The endpoint and payload field names of the bmkgsatu API are not documented, so
+    there are no built-in defaults: they must be taken from the browser's network log
+    and written down explicitly, e.g.
+
+        {"endpoint": "https://.../metarspeci",
+         "field_map": {"hour": "hour", "air_temperature": "temperature", ...},
+         "record_id": "data.id",
+         "lookup_endpoint": "https://.../metarspeci"}
+
+    `field_map` maps payload field -> nosig_reader field (see REPORT_FIELDS);
+    `record_id` is the (dotted) path of the id of the stored record in the JSON reply;
+    the optional `lookup_endpoint` answers a GET with the payload's station_id,
+    observation_date and time fields with the matching records (a JSON list, or an
+    object whose `data` is one).
+
+    Returns:
+        dict: Keyword arguments for MetarApiClient.
+    """
+    with open(path) as f:
+        config = json.load(f)
+    missing = [key for key in ('endpoint', 'field_map') if not config.get(key)]
+    if missing:
+        raise ValueError(f"API config {path} lacks {', '.join(missing)}")
+    unknown = set(config['field_map'].values()) - set(REPORT_FIELDS)
+    if unknown:
+        raise ValueError(f"API config {path} maps to unknown report fields {sorted(unknown)}")
+    return {key: config[key] for key in ('endpoint', 'field_map', 'record_id', 'lookup_endpoint') if key in config}
+
+
+def observation_date(input_day, now=None):
+    """
+    Return the ISO date of day `input_day` of a report, relative to `now` (UTC).
+
+    The day is resolved with metar_validation.resolve_observation: a day after today
+    belongs to the previous month, except just before midnight UTC when it may be tomorrow.
+    """
+    if not input_day.isdigit() or not (1 <= int(input_day) <= 31):
+        raise ValueError("Invalid day. Please enter a number between 1 and 31.")
+    return resolve_observation(int(input_day), now=now).strftime("%Y-%m-%d")
+
+
+def build_payload(user_input, station_id, observer, field_map, now=None):
+    """
+    Map a parsed report (nosig_reader output) onto the form's API payload.
+
+    Args:
+        user_input (dict): Parsed report as returned by `nosig_reader.MetarReader.parse()`.
+        station_id (str): WMO station number selected in the form, e.g. '97260'.
+        observer (str): Observer name selected in the form.
+        field_map (dict): Payload field -> nosig_reader field (see load_api_config).
+        now (datetime): Current UTC time the report's day is resolved against (default: now).
+
+    Returns:
+        dict: JSON payload for the submission endpoint.
+    """
+    payload = {'station_id': station_id, 'observer': observer,
+               'observation_date': observation_date(user_input['day'], now)}
+    for field, source in field_map.items():
+        payload[field] = user_input.get(source)  # Mis. tanpa trend atau suhu -> null
+    payload['clouds'] = [
+        {'amount': cloud['cloud_type'], 'height': cloud['cloud_height'], 'type': cloud['cloud_subtype'] or '-'}
+        for cloud in user_input.get('clouds', [])
+    ]
+    return payload
+
+
+class MetarApiClient:
+    """
+    Submit parsed reports straight to the form's HTTP API over a pooled session.
+
+    The login session is borrowed from the persistent browser profile (see
+    `from_browser`), so no separate credentials are needed. A report only counts as
+    submitted when the reply names the id of the stored record.
+    """
+
+    def __init__(self, endpoint, field_map, station_id=None, observer=None, record_id='id', lookup_endpoint=None,
+                 cookies=None, token=None, timeout=10, pool_size=4, retries=2):
+        """
+        Args:
+            endpoint (str): URL the form posts a report to.
+            field_map (dict): Payload field -> nosig_reader field (see load_api_config).
+            station_id (str): WMO station number to submit for, unless given per submit.
+            observer (str): Observer name to submit under, unless given per submit.
+            record_id (str): Dotted path of the stored record's id in the JSON reply.
+            lookup_endpoint (str): Optional URL to check after a timeout whether the
+                report was stored anyway (see load_api_config).
+            cookies (list): Cookies as returned by Playwright's `BrowserContext.cookies()`.
+            token (str): Bearer token of the logged-in user, if the API uses one.
+            timeout (float): Timeout in seconds for each request.
+            pool_size (int): Number of keep-alive connections to keep open.
+            retries (int): Retries for failed connections (not for HTTP errors).
+        """
+        self.endpoint = endpoint
+        self.field_map = field_map
+        self.record_id = record_id
+        self.lookup_endpoint = lookup_endpoint
+        self.station_id = station_id
+        self.observer = observer
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retries)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update({'Accept': 'application/json'})
+        if token:
+            self.session.headers['Authorization'] = f"Bearer {token}"
+        for cookie in cookies or []:
+            self.session.cookies.set(cookie['name'], cookie['value'], domain=cookie.get('domain', ''),
+                                     path=cookie.get('path', '/'))
+        self.stats = {'submitted': 0, 'failed': 0, 'unknown': 0, 'last_latency': None}
+        self.last_record = None  # Id record dari submit terakhir yang berhasil
+
+    @classmethod
+    def from_browser(cls, manager, **kwargs):
+        """
+        Create a client that reuses the login session of a started BrowserManager.
+
+        Args:
+            manager (BrowserManager): Browser started on the bmkgsatu site.
+            **kwargs: Passed on to the constructor (endpoint, field_map, station_id, ...),
+                e.g. from load_api_config.
+        """
+        cookies = manager.browser.cookies()
+        token = None
+        try:
+            token = manager.page.evaluate(f"() => window.localStorage.getItem('{TOKEN_STORAGE_KEY}')")
+        except Exception as e:
+            logging.warning(f"Could not read login token from the browser: {e}")
+        kwargs.setdefault('token', token)
+        return cls(cookies=cookies, **kwargs)
+
+    def _record_of(self, body):
+        value = body
+        for part in self.record_id.split('.'):
+            value = value.get(part) if isinstance(value, dict) else None
+        return value
+
+    def _find_stored(self, payload):
+        """Ask `lookup_endpoint` whether a report whose POST was not confirmed was stored after all."""
+        time_fields = [field for field, source in self.field_map.items() if source in ('hour', 'minute')]
+        params = {field: payload[field] for field in ['station_id', 'observation_date', *time_fields]}
+        response = self.session.get(self.lookup_endpoint, params=params, timeout=self.timeout)
+        response.raise_for_status()
+        records = response.json()
+        if isinstance(records, dict):
+            records = records.get('data') or []
+        return bool(records)
+
+    def submit(self, user_input, station_id=None, observer=None):
+        """
+        Submit one parsed report.
+
+        Args:
+            user_input (dict): Parsed report as returned by `nosig_reader.MetarReader.parse()`.
+            station_id (str): Submit for this station instead of the client's own.
+            observer (str): Submit under this observer instead of the client's own.
+
+        Returns:
+            bool: True if the server stored the report (its record id is in `last_record`),
+            False if it did not, so the browser form may be used instead.
+
+        Raises:
+            SubmissionUnknown: The POST timed out after it was sent, or the server accepted
+                it without naming a record id, and `lookup_endpoint` could not tell whether
+                it was stored; the report must not be submitted another way before that is
+                checked.
+        """
+        station_id, observer = station_id or self.station_id, observer or self.observer
+        try:
+            if not station_id or not observer:
+                raise ValueError("no station_id/observer configured for the API client")
+            payload = build_payload(user_input, station_id, observer, self.field_map)
+        except (ValueError, KeyError) as e:
+            self.stats['failed'] += 1
+            logging.error(f"API submission failed: {e}")
+            return False
+
+        start = time.perf_counter()
+        try:
+            with span("api.submit"):
+                response = self.session.post(self.endpoint, json=payload, timeout=self.timeout)
+            self.stats['last_latency'] = time.perf_counter() - start
+            response.raise_for_status()
+        except requests.exceptions.ReadTimeout:
+            # Request sudah terkirim: server mungkin sudah menyimpannya
+            return self._unconfirmed(payload, f"API submission timed out after {self.timeout} s")
+        except requests.RequestException as e:
+            self.stats['failed'] += 1
+            logging.error(f"API submission failed: {e}")
+            return False
+        try:
+            record = self._record_of(response.json())
+        except ValueError:
+            record = None
+        if record is None:
+            # Balasan 2xx tanpa id: laporan mungkin sudah tersimpan, jangan dikirim ulang lewat form
+            return self._unconfirmed(payload, f"API reply {response.status_code} has no record id "
+                                              f"({self.record_id}): {response.text[:200]}")
+        self.last_record = record
+        self.stats['submitted'] += 1
+        logging.info(f"Report submitted via API as record {record} in {self.stats['last_latency'] * 1000:.0f} ms")
+        return True
+
+    def _unconfirmed(self, payload, reason):
+        """Settle a submission the server may or may not have stored, through `lookup_endpoint` if there is one."""
+        if self.lookup_endpoint:
+            try:
+                stored = self._find_stored(payload)
+            except (requests.RequestException, ValueError) as e:
+                logging.error(f"API lookup after unconfirmed submission failed: {e}")
+            else:
+                if stored:
+                    self.last_record = None
+                    self.stats['submitted'] += 1
+                    logging.info(f"{reason}, but the report was stored")
+                    return True
+                self.stats['failed'] += 1
+                logging.warning(f"{reason} and the report was not stored")
+                return False
+        self.stats['unknown'] += 1
+        raise SubmissionUnknown(f"{reason}; check whether the report of {payload['observation_date']} was stored")
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,378 @@
+import hashlib
+import json
+import logging
+import os
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+from metar_columns import MEASUREMENTS, MetarColumns
+from metar_validation import resolve_observation
+from parse_cache import normalize_report
+
+# Kolom per laporan yang disimpan di setiap blok; stasiun dan bulan ada di path partisi
+BLOCK_COLUMNS = ('report_type',) + MEASUREMENTS + ('wind_variable', 'cavok', 'trend')
+CLOUD_COLUMNS = MetarColumns.CLOUD_COLUMNS
+MINUTES_PER_DAY = 24 * 60
+
+
+def month_of(day, hour, minute, now):
+    """Return (year, month) of a report observed at day/hour/minute, resolved in UTC (see resolve_observation)."""
+    observed = resolve_observation(day, hour, minute, now)
+    return observed.year, observed.month
+
+
+def report_digest(normalized):
+    """64-bit content hash of a normalized report, used to drop re-ingested copies."""
+    return int.from_bytes(hashlib.blake2b(normalized.encode(), digest_size=8).digest(), 'little', signed=True)
+
+
+def _concat_blocks(blocks):
+    """Concatenate block dicts, shifting the cloud and raw offsets, and sort the rows by time."""
+    merged = {}
+    for name in ('time',) + BLOCK_COLUMNS + CLOUD_COLUMNS + ('raw',):
+        merged[name] = np.concatenate([block[name] for block in blocks])
+    for offsets in ('cloud_offsets', 'raw_offsets'):
+        parts, base = [np.zeros(1, dtype=np.int64)], 0
+        for block in blocks:
+            parts.append(block[offsets][1:] + base)
+            base += block[offsets][-1]
+        merged[offsets] = np.concatenate(parts)
+    return _sorted_by_time(merged)
+
+
+def _take_rows(block, rows):
+    """Return the block restricted to `rows` (in that order), with ragged columns re-packed."""
+    taken = {name: block[name][rows] for name in ('time',) + BLOCK_COLUMNS}
+    for offsets, values in (('cloud_offsets', CLOUD_COLUMNS), ('raw_offsets', ('raw',))):
+        starts = block[offsets][rows]
+        counts = block[offsets][rows + 1] - starts
+        new_offsets = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum(counts, out=new_offsets[1:])
+        # Indeks elemen setiap baris: awal lama baris itu + posisi di dalam baris
+        index = np.repeat(starts - new_offsets[:-1], counts) + np.arange(new_offsets[-1])
+        taken[offsets] = new_offsets
+        for name in values:
+            taken[name] = block[name][index]
+    return taken
+
+
+def _sorted_by_time(block):
+    order = np.argsort(block['time'], kind='stable')
+    if np.all(order[:-1] < order[1:]):
+        return block
+    return _take_rows(block, order)
+
+
+class MetarArchive:
+    """
+    On-disk archive of decoded METAR/SPECI reports, partitioned by station and month.
+
+    Each partition (`root/<ICAO>/<YYYY-MM>/`) holds blocks of column arrays in NumPy
+    .npz files, sorted by observation time, and an `index.json` with the time range
+    and per-column min/max of every block. Queries use the index to skip blocks and
+    only load the columns they filter on or return, so no report text is re-parsed.
+    Reports are appended in batches by the ingestion path and flushed as new blocks;
+    a partition with more than `max_blocks` blocks is compacted into one. Not thread-safe.
+    """
+
+    def __init__(self, root, block_rows=4096, max_blocks=16, flush_interval=300.0):
+        """
+        Args:
+            root (str): Archive directory (created if missing).
+            block_rows (int): Buffered reports that trigger a flush.
+            max_blocks (int): Blocks per partition before it is compacted.
+            flush_interval (float): Seconds after which buffered reports are flushed
+                on the next append, even if fewer than `block_rows`.
+        """
+        self.root = root
+        self.block_rows = block_rows
+        self.max_blocks = max_blocks
+        self.flush_interval = flush_interval
+        self.pending = {}  # (stasiun, tahun, bulan) -> [dict blok]
+        self.pending_rows = 0
+        self.pending_since = None
+        self.digests = {}  # partisi -> set digest laporan yang sudah ada di disk atau buffer
+        self.stats = {'appended': 0, 'duplicates': 0, 'errors': 0, 'blocks_written': 0, 'compactions': 0}
+        os.makedirs(root, exist_ok=True)
+
+    # --- Penulisan ---
+
+    def append(self, reports, now=None, month=None):
+        """
+        Decode a batch of raw reports (CMSS bulletins or plain METAR lines) and buffer them.
+
+        Args:
+            reports (iterable): Raw reports; blank entries are skipped.
+            now (datetime): Time of ingestion, used to pick the month of each report.
+            month (tuple): (year, month) of all reports, e.g. when importing an old dump.
+
+        Returns:
+            int: Number of new reports buffered (duplicates and failures excluded).
+        """
+        now = now or datetime.now(timezone.utc)
+        columns = MetarColumns(len(reports) if hasattr(reports, '__len__') else 1024)
+        normalized = []
+        for raw in reports:
+            text = normalize_report(raw)
+            if not text:
+                continue
+            try:
+                columns.append(text)
+            except Exception as e:
+                self.stats['errors'] += 1
+                logging.warning(f"Not archived, cannot decode '{text}': {e}")
+                continue
+            normalized.append(text)
+        if not normalized:
+            return 0
+        columns.trim()
+
+        by_partition = {}
+        for row, (station, day, hour, minute) in enumerate(zip(columns.station, columns.day, columns.hour,
+                                                                columns.minute)):
+            try:
+                key = (str(station),) + (month or month_of(int(day), int(hour), int(minute), now))
+            except ValueError as e:
+                self.stats['errors'] += 1  # Mis. tanggal 31 yang tidak ada di bulan lalu
+                logging.warning(f"Not archived, no month for '{normalized[row]}': {e}")
+                continue
+            by_partition.setdefault(key, []).append(row)
+
+        batch = self._batch_block(columns, normalized)
+        added = 0
+        for key, rows in by_partition.items():
+            seen = self._digests(key)
+            keep = []
+            for row in rows:
+                digest = report_digest(normalized[row])
+                if digest in seen:
+                    self.stats['duplicates'] += 1
+                    continue
+                seen.add(digest)
+                keep.append(row)
+            if keep:
+                self.pending.setdefault(key, []).append(_take_rows(batch, np.array(keep, dtype=np.int64)))
+                added += len(keep)
+
+        self.stats['appended'] += added
+        self.pending_rows += added
+        if added and self.pending_since is None:
+            self.pending_since = time.monotonic()
+        if self.pending_rows >= self.block_rows or (
+                self.pending_since is not None and time.monotonic() - self.pending_since >= self.flush_interval):
+            self.flush()
+        return added
+
+    @staticmethod
+    def _batch_block(columns, normalized):
+        """Turn decoded columns and their report texts into one block (not yet split by partition)."""
+        block = {name: getattr(columns, name) for name in BLOCK_COLUMNS + CLOUD_COLUMNS}
+        block['cloud_offsets'] = columns.cloud_offsets
+        block['time'] = ((columns.day.astype(np.int32) - 1) * MINUTES_PER_DAY
+                         + columns.hour.astype(np.int32) * 60 + columns.minute)
+        encoded = [text.encode('ascii', 'replace') for text in normalized]
+        block['raw'] = np.frombuffer(b''.join(encoded), dtype=np.uint8)
+        block['raw_offsets'] = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(text) for text in encoded], out=block['raw_offsets'][1:])
+        return block
+
+    def flush(self):
+        """Write every buffered partition as a new block (compacting partitions with too many blocks)."""
+        for key, blocks in self.pending.items():
+            directory = self._partition_dir(*key)
+            os.makedirs(directory, exist_ok=True)
+            index = self._read_index(directory)
+            name = self._write_block(directory, index, _concat_blocks(blocks))
+            logging.debug(f"Archived {index['blocks'][-1]['rows']} reports of {key[0]} to {name}")
+            if len(index['blocks']) > self.max_blocks:
+                self._compact(directory, index)
+            self._write_index(directory, index)
+        self.pending = {}
+        self.pending_rows = 0
+        self.pending_since = None
+
+    def close(self):
+        self.flush()
+
+    def compact(self, station, year, month):
+        """Merge all blocks of one partition into a single block."""
+        directory = self._partition_dir(station, year, month)
+        index = self._read_index(directory)
+        if len(index['blocks']) > 1:
+            self._compact(directory, index)
+            self._write_index(directory, index)
+
+    def _compact(self, directory, index):
+        old = index['blocks']
+        merged = _concat_blocks([self._load_block(directory, entry) for entry in old])
+        index['blocks'] = []
+        self._write_block(directory, index, merged)
+        for entry in old:
+            os.remove(os.path.join(directory, entry['file']))
+        self.stats['compactions'] += 1
+
+    def _write_block(self, directory, index, block):
+        number = index.get('next', 1)  # Nomor blok tidak dipakai ulang setelah compaction
+        name = f"{number:06d}.npz"
+        temp_path = os.path.join(directory, f"{name}.tmp.npz")
+        np.savez_compressed(temp_path, **block)
+        os.replace(temp_path, os.path.join(directory, name))
+        index['next'] = number + 1
+        stats = {}
+        for column in MEASUREMENTS:
+            values = block[column][~np.isnan(block[column])]
+            stats[column] = [float(values.min()), float(values.max())] if len(values) else None
+        index['blocks'].append({'file': name, 'rows': int(len(block['time'])), 'time_min': int(block['time'][0]),
+                                'time_max': int(block['time'][-1]), 'stats': stats})
+        self.stats['blocks_written'] += 1
+        return name
+
+    # --- Indeks dan partisi ---
+
+    def _partition_dir(self, station, year, month):
+        return os.path.join(self.root, station, f"{year:04d}-{month:02d}")
+
+    @staticmethod
+    def _read_index(directory):
+        try:
+            with open(os.path.join(directory, 'index.json')) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {'blocks': []}
+
+    @staticmethod
+    def _write_index(directory, index):
+        temp_path = os.path.join(directory, 'index.json.tmp')
+        with open(temp_path, 'w') as f:
+            json.dump(index, f)
+        os.replace(temp_path, os.path.join(directory, 'index.json'))
+
+    @staticmethod
+    def _load_block(directory, entry):
+        with np.load(os.path.join(directory, entry['file'])) as data:
+            return {name: data[name] for name in data.files}
+
+    def _digests(self, key):
+        seen = self.digests.get(key)
+        if seen is None:
+            directory = self._partition_dir(*key)
+            seen = set()
+            for entry in self._read_index(directory)['blocks']:
+                with np.load(os.path.join(directory, entry['file'])) as data:
+                    # Digest tidak disimpan (tidak bisa dikompresi); dihitung ulang dari teks laporan
+                    offsets, text = data['raw_offsets'], data['raw'].tobytes()
+                    seen.update(report_digest(text[offsets[row]:offsets[row + 1]].decode())
+                                for row in range(len(offsets) - 1))
+            self.digests[key] = seen
+        return seen
+
+    def partitions(self, station=None):
+        """Return the (station, year, month) partitions on disk, sorted."""
+        found = []
+        for name in sorted(os.listdir(self.root)) if station is None else [station]:
+            station_dir = os.path.join(self.root, name)
+            if not os.path.isdir(station_dir):
+                continue
+            for month_name in sorted(os.listdir(station_dir)):
+                year, _, month = month_name.partition('-')
+                if year.isdigit() and month.isdigit():
+                    found.append((name, int(year), int(month)))
+        return found
+
+    # --- Query ---
+
+    def query(self, station, start, end, where=None, columns=None, raw=False):
+        """
+        Return the archived reports of `station` observed in [start, end).
+
+        Only blocks whose time range overlaps the query and whose column min/max can
+        satisfy `where` are opened, and of those only the needed columns are read.
+
+        Args:
+            station (str): ICAO code.
+            start (datetime): First observation time (inclusive); naive values are UTC.
+            end (datetime): Last observation time (exclusive); naive values are UTC.
+            where (dict): Column -> (low, high) inclusive range a report must match; a
+                bound of None is open and NaN never matches, e.g. {'wind_gust': (0, None)}
+                for all reports with gusts.
+            columns (tuple): Columns to return (default: all of BLOCK_COLUMNS).
+            raw (bool): Also return the normalized report text.
+
+        Returns:
+            numpy.ndarray: Structured array with an 'observed' datetime64[m] field, the
+                requested columns and, with `raw`, a 'raw' text field; sorted by time.
+        """
+        where = where or {}
+        columns = tuple(columns or BLOCK_COLUMNS)
+        start, end = self._naive_utc(start), self._naive_utc(end)
+        parts = []
+        for year, month in self._months(start, end):
+            directory = self._partition_dir(station, year, month)
+            month_start = np.datetime64(f"{year:04d}-{month:02d}", 'm')
+            low_time = int((np.datetime64(start, 'm') - month_start).astype(int))
+            high_time = int((np.datetime64(end, 'm') - month_start).astype(int))
+            for entry in self._read_index(directory)['blocks']:
+                if entry['time_max'] < low_time or entry['time_min'] >= high_time:
+                    continue
+                if not self._may_match(entry, where):
+                    continue
+                with np.load(os.path.join(directory, entry['file'])) as data:
+                    times = data['time']
+                    mask = (times >= low_time) & (times < high_time)
+                    for column, (low, high) in where.items():
+                        values = data[column]
+                        if values.dtype.kind == 'f':
+                            mask &= ~np.isnan(values)
+                        if low is not None:
+                            mask &= values >= low
+                        if high is not None:
+                            mask &= values <= high
+                    rows = np.flatnonzero(mask)
+                    if not len(rows):
+                        continue
+                    part = {'observed': month_start + times[rows].astype('timedelta64[m]')}
+                    for column in columns:
+                        part[column] = data[column][rows]
+                    if raw:
+                        offsets, text = data['raw_offsets'], data['raw']
+                        part['raw'] = np.array([text[offsets[row]:offsets[row + 1]].tobytes().decode()
+                                                for row in rows], dtype=object)
+                    parts.append(part)
+
+        names = ('observed',) + columns + (('raw',) if raw else ())
+        if not parts:
+            dtypes = {'observed': 'M8[m]', 'raw': object, 'report_type': 'U5', 'trend': 'U5',
+                      'wind_variable': bool, 'cavok': bool}
+            return np.empty(0, dtype=[(name, dtypes.get(name, np.float32)) for name in names])
+        result = np.empty(sum(len(part['observed']) for part in parts),
+                          dtype=[(name, parts[0][name].dtype) for name in names])
+        for name in names:
+            result[name] = np.concatenate([part[name] for part in parts])
+        # Blok disusun menurut urutan masuk, bukan waktu: laporan susulan bisa ada di blok belakang
+        return result[np.argsort(result['observed'], kind='stable')]
+
+    @staticmethod
+    def _may_match(entry, where):
+        for column, (low, high) in where.items():
+            if column not in entry['stats']:
+                continue  # Tidak ada statistik (mis. kolom teks): blok harus dibaca
+            stats = entry['stats'][column]
+            if stats is None:
+                return False  # Semua NaN di blok ini
+            if (low is not None and stats[1] < low) or (high is not None and stats[0] > high):
+                return False
+        return True
+
+    @staticmethod
+    def _naive_utc(value):
+        """A datetime with an offset as naive UTC; naive values are taken as UTC already."""
+        return value.astimezone(timezone.utc).replace(tzinfo=None) if value.tzinfo is not None else value
+
+    @staticmethod
+    def _months(start, end):
+        year, month = start.year, start.month
+        while (year, month) <= (end.year, end.month):
+            yield year, month
+            year, month = (year, month + 1) if month < 12 else (year + 1, 1)
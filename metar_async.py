@@ -0,0 +1,313 @@
+import asyncio
+import logging
+import time
+
+from async_browsermanager import AsyncBrowserManager
+from getmetar import CMSSMetarFetcher
+from metar import (CLOUD_OKTAS, DEFAULT_OBSERVER, DEFAULT_STATION_ID, NO_CLOUD_OPTION, READY_TIMEOUT,
+                   SUBMIT_TIMEOUT, cloud_key, date_picker_steps, get_custom_date_selector, is_submit_response)
+from metar_daemon import MetarPoller
+from metar_validation import ValidationError, validate_results
+from nosig_reader import parse_many
+from submission_ledger import SubmissionLedger, report_key
+import tracing
+from tracing import span
+
+# Jeda awal dan maksimum (detik) sebelum membuka halaman form lagi setelah gagal
+RETRY_DELAY = 1.0
+MAX_RETRY_DELAY = 60.0
+
+
+async def handle_cloud_selection(page, cloud_type: str, cloud_subtype: str, cloud_height=None):
+    okta_value = CLOUD_OKTAS.get(cloud_type)
+
+    if not okta_value:
+        logging.error("Invalid cloud type provided.")
+        return
+    if not cloud_subtype:
+        cloud_subtype = "-"
+
+    try:
+        await page.get_by_label("General").locator("#clouds-jumlah").select_option(cloud_type)
+        await page.get_by_label("General").locator("#cloud_height").click()
+        await page.get_by_label("General").locator("#cloud_height").fill(str(cloud_height))
+
+        cloud_name = f"{cloud_type} ({okta_value}) {cloud_subtype}"
+        await page.get_by_role("row", name=cloud_name).get_by_role("button").click()
+
+        logging.info(f"Cloud selection successful: {cloud_name}")
+
+    except Exception as e:
+        logging.error(f"Error during cloud selection: {e}")
+
+
+async def fill_form(page, user_input, header_ready=False, station_id=DEFAULT_STATION_ID, observer=DEFAULT_OBSERVER,
+                    clouds_ready=False):
+    """
+    Async counterpart of metar.fill_form: fills and submits the form for one parsed report.
+
+    `station_id` and `observer` are selected unless `header_ready` says the page still
+    has them selected; the clouds are selected unless `clouds_ready` says the page
+    already holds the report's cloud selection. Returns True when the server accepted
+    the submission.
+    """
+    try:
+        # Extract data from parsed METAR
+        input_day = user_input['day']
+        clouds = user_input['clouds']  # Kosong untuk NSC/NCD/CAVOK
+
+        if not header_ready:
+            # Step 1: Kode stasiun
+            with span("form.station"):
+                await page.wait_for_load_state("networkidle")
+                await page.locator("#vs2__combobox").scroll_into_view_if_needed()
+                await page.locator("#vs2__combobox").get_by_label("Loading...").click()
+                await page.get_by_role("option", name=station_id).click()
+
+            # Step 2: Pengamat
+            with span("form.observer"):
+                await page.wait_for_load_state("networkidle")
+                await page.get_by_label("Loading...", exact=True).click()
+                await page.get_by_role("option", name=observer).click()
+            logging.info("Station code and observer selected.")
+
+        # Step 3: Tanggal (Date)
+        with span("form.date"):
+            steps = date_picker_steps(input_day)
+            await page.locator("#datepicker__value_").click()
+            for _ in range(abs(steps)):
+                await page.get_by_label("Previous month" if steps > 0 else "Next month", exact=True).click()
+            await page.get_by_label(get_custom_date_selector(input_day), exact=True).click()
+
+        # Step 4: Waktu METAR (Time)
+        with span("form.time"):
+            await page.get_by_label("Jam").select_option(user_input['hour'])
+            await page.get_by_label("Menit").select_option(user_input['minute'])
+            await page.wait_for_load_state("networkidle")
+            await page.get_by_label("Arah Angin (derajat)").wait_for(state="visible", timeout=READY_TIMEOUT)
+        logging.info("Date and time selected.")
+
+        # Step 5: Arah dan kecepatan angin (Wind direction and speed)
+        with span("form.wind"):
+            await page.get_by_label("Arah Angin (derajat)").fill(user_input['wind_direction'])
+            await page.get_by_label("Kecepatan Angin (knot)").fill(user_input['wind_speed'])
+
+        # Step 6: Visibility
+        with span("form.visibility"):
+            await page.get_by_role("spinbutton", name="Prevailling (m) Jarak pandang").fill(user_input['visibility'])
+
+        # Step 7: Awan (Clouds)
+        if not clouds_ready:
+            with span("form.clouds"):
+                if clouds:
+                    await handle_cloud_selection(page, clouds[0]['cloud_type'], clouds[0]['cloud_subtype'],
+                                                 clouds[0]['cloud_height'])
+                else:
+                    await page.get_by_label("General").locator("#clouds-jumlah").select_option(NO_CLOUD_OPTION)
+
+        # Step 8: Suhu dan kelembaban (Temperature and Dew Point)
+        with span("form.temperature"):
+            await page.locator("#v-air-temp").fill(user_input['temperature'])
+            await page.locator("#v-dew-point").fill(user_input['dew_point'])
+
+        # Step 9: Tekanan udara (Pressure)
+        with span("form.pressure"):
+            await page.get_by_label("TEKANAN UDARA (QNH)").fill(user_input['pressure'])
+
+        # Step 10: Trend NOSIG
+        with span("form.trend"):
+            await page.get_by_role("tab", name="Trend").click()
+            await page.get_by_label("Trend").locator("#input-type").select_option(user_input['trend'])
+        logging.info("Report fields filled.")
+
+        # Step 11: Submit
+        with span("form.preview"):
+            await page.get_by_role("button", name="Preview").click()
+        with span("form.submit"):
+            async with page.expect_response(is_submit_response, timeout=SUBMIT_TIMEOUT) as response_info:
+                await page.get_by_role("button", name="Submit").click()
+            response = await response_info.value
+        if not response.ok:
+            logging.error(f"Submission rejected: HTTP {response.status}")
+            return False
+        logging.info("Form submitted.")
+        return True
+
+    except Exception as e:
+        logging.error(f"Error filling form: {e}")
+        return False
+
+
+async def reset_form(page):
+    """
+    Clear the report fields so the next report can be entered without reloading the page.
+
+    The station and observer stay selected. The sync path does not clear anything: it
+    rewrites only the changed fields through metar.FormPlan.
+    """
+    await page.get_by_role("tab", name="General").click()
+    for field in [
+        page.get_by_label("Arah Angin (derajat)"),
+        page.get_by_label("Kecepatan Angin (knot)"),
+        page.get_by_role("spinbutton", name="Prevailling (m) Jarak pandang"),
+        page.get_by_label("General").locator("#cloud_height"),
+        page.locator("#v-air-temp"),
+        page.locator("#v-dew-point"),
+        page.get_by_label("TEKANAN UDARA (QNH)"),
+    ]:
+        await field.fill("")
+    await page.get_by_label("Arah Angin (derajat)").wait_for(state="visible", timeout=READY_TIMEOUT)
+
+
+async def submit_on_page(page, result, page_state):
+    """
+    Fills and submits one parsed report, then resets the form in place.
+
+    A failed reload raises, so the caller can replace the page.
+    """
+    start = time.perf_counter()
+    with span("form.report"):
+        key = cloud_key(result.parsed['clouds'])
+        current = page_state.get('cloud')
+        if key != current and current not in (None, NO_CLOUD_OPTION):
+            # Baris awan laporan sebelumnya tidak ikut terhapus oleh reset: mulai dari halaman baru
+            await reload_form(page)
+            page_state['header_ready'] = False
+        ok = await fill_form(page, result.parsed, page_state.get('header_ready', False),
+                             clouds_ready=key == current)
+    page_state['header_ready'] = False
+    page_state['cloud'] = key
+    if ok:
+        try:
+            await reset_form(page)
+            page_state['header_ready'] = True
+        except Exception as e:
+            logging.warning(f"In-place form reset failed, reloading instead: {e}")
+    if not page_state['header_ready']:
+        await reload_form(page)
+        page_state['cloud'] = None
+    logging.info(f"METAR code {result.raw.strip()!r} handled in {time.perf_counter() - start:.2f} s")
+    return ok
+
+
+async def reload_form(page):
+    with span("form.reload"):
+        await page.reload()
+        await page.locator("#vs2__combobox").wait_for(state="visible", timeout=READY_TIMEOUT)
+
+
+async def open_page(manager, url):
+    """Open a form page of the persistent context, retrying with a growing delay until it works."""
+    delay = RETRY_DELAY
+    while True:
+        try:
+            return await manager.new_page(url)
+        except Exception as e:
+            logging.error(f"Could not open a form page, retrying in {delay:.0f} s: {e}")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, MAX_RETRY_DELAY)
+
+
+async def close_page(page):
+    try:
+        await page.close()
+    except Exception as e:
+        logging.warning(f"Closing a form page failed: {e}")
+
+
+async def page_worker(manager, url, jobs, stats, ledger=None):
+    """
+    Submit (result, ledger key) jobs from `jobs` on one page of the persistent context until cancelled.
+
+    Successful submissions are recorded in `ledger` (submission_ledger.SubmissionLedger) if given.
+    """
+    page = await open_page(manager, url)
+    page_state = {}
+    try:
+        while True:
+            result, key = await jobs.get()
+            try:
+                ok = await submit_on_page(page, result, page_state)
+            except Exception as e:
+                ok = False
+                logging.error(f"Page failed, opening a new one: {e}")
+                stats['recycled'] += 1
+                # Halaman yang rusak tidak boleh menghentikan worker (dan seluruh layanan)
+                await close_page(page)
+                page = await open_page(manager, url)
+                page_state = {}
+            if ok and ledger is not None:
+                ledger.record(key, result.raw, 'browser')
+            stats['done' if ok else 'failed'] += 1
+            jobs.task_done()
+    finally:
+        await close_page(page)
+
+
+async def parse_reports(reports, jobs, ledger=None, stats=None):
+    """
+    Parse NewReports from the poller's queue and hand the valid ones to the page workers.
+
+    Reports already recorded in `ledger` are skipped before they reach a page.
+    """
+    while True:
+        report = await reports.get()
+        for result in validate_results(parse_many([report.text])):
+            if isinstance(result.error, ValidationError):
+                continue  # Sudah dicatat oleh tahap validasi
+            if result.error is not None:
+                logging.error(f"Error parsing METAR code '{result.raw.strip()}': {result.error}")
+                continue
+            key = None
+            if ledger is not None:
+                key = report_key(result.raw)
+                # Satu lookup primary key di SQLite: cukup singkat untuk dijalankan di event loop
+                if ledger.contains(key):
+                    logging.info(f"Already submitted, skipping METAR code: {result.raw.strip()}")
+                    if stats is not None:
+                        stats['skipped'] += 1
+                    continue
+            await jobs.put((result, key))
+
+
+async def run_async(cmss_url, form_url, user_data_dir="./user_data", pages=2, headless=False,
+                    ledger_path="./submissions.db", trace=False):
+    """
+    Poll CMSS, parse and submit new reports in one event loop.
+
+    Polling (metar_daemon.MetarPoller), parsing and `pages` concurrent form pages all
+    run as tasks of the same loop, so page waits and network polls overlap. Reports
+    recorded in the submission ledger at `ledger_path` are skipped (None disables it).
+    With `trace`, per-step timings are written as in metar.run_process.
+    """
+    if trace:
+        tracing.enable(jsonl_path="trace.jsonl")
+    manager = AsyncBrowserManager(user_data_dir=user_data_dir, headless=headless)
+    await manager.start_browser(form_url)
+    poller = MetarPoller(CMSSMetarFetcher(cmss_url))
+    jobs = asyncio.Queue(maxsize=pages * 2)
+    ledger = SubmissionLedger(ledger_path) if ledger_path else None
+    stats = {'done': 0, 'failed': 0, 'recycled': 0, 'skipped': 0}
+    tasks = [asyncio.create_task(poller.run()), asyncio.create_task(parse_reports(poller.queue, jobs, ledger, stats))]
+    tasks += [asyncio.create_task(page_worker(manager, form_url, jobs, stats, ledger)) for _ in range(pages)]
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        poller.stop()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        logging.info(f"Submissions: {stats}")
+        await manager.stop_browser()
+        if ledger is not None:
+            ledger.close()
+        if trace:
+            tracing.log_summary()
+            tracing.write_prometheus("metar_trace.prom")
+            tracing.disable()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    asyncio.run(run_async("http://172.19.1.1/cgi-bin/extract_cmss.pl",  # Ubah ini dengan URL yang valid
+                          "https://bmkgsatu.bmkg.go.id/meteorologi/metarspeci"))
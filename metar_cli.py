@@ -0,0 +1,207 @@
+import argparse
+import json
+import logging
+import sys
+
+# Modul berat (Playwright, requests, sqlite) hanya di-import di dalam subcommand yang
+# membutuhkannya, agar `parse` di cron/worker mulai secepat interpreter Python itu sendiri.
+
+DEFAULT_CMSS_URL = "http://172.19.1.1/cgi-bin/extract_cmss.pl"  # Ubah ini dengan URL yang valid
+
+
+def read_reports(paths):
+    """Yield reports from archive files/CMSS dumps, or one per line from stdin when no path is given."""
+    if not paths:
+        for line in sys.stdin:
+            if line.strip():
+                yield line
+        return
+    from cmss_stream import iter_reports
+    for path in paths:
+        yield from iter_reports(path)
+
+
+def command_parse(args):
+    """Parse reports and print one JSON object per report; returns 1 if any report failed."""
+    from nosig_reader import parse_many
+
+    failed = 0
+    write = sys.stdout.write
+    results = parse_many(read_reports(args.files))
+    if args.validate:
+        from metar_validation import validate_results
+        results = validate_results(results)
+    for result in results:
+        if result.error is not None:
+            failed += 1
+            print(f"report {result.index}: {result.error}: {result.raw.strip()}", file=sys.stderr)
+            continue
+        write(json.dumps({'raw': result.raw.strip(), **result.parsed} if args.raw else result.parsed) + '\n')
+    return 1 if failed else 0
+
+
+def make_fetcher(args):
+    from getmetar import CMSSMetarFetcher
+
+    return CMSSMetarFetcher(args.url, header=args.header, station=args.station, timeout=args.timeout)
+
+
+def command_fetch(args):
+    """Print the latest (or all of today's) METAR of a station from CMSS."""
+    fetcher = make_fetcher(args)
+    fetcher.fetch_data()
+    reports = fetcher.find_all_metar_today() if args.today else [fetcher.get_latest_metar()]
+    reports = [report for report in reports if report]
+    for report in reports:
+        print(report)
+    return 0 if reports else 1
+
+
+def submit_options(args):
+    return dict(api_config=args.api, fast=args.fast, cdp_url=args.cdp_url,
+                ledger_path=None if args.no_ledger else args.ledger, trace=args.trace, rejects_path=args.rejects)
+
+
+def command_submit(args):
+    """Submit reports from files (or interactively from the prompt when no file is given)."""
+    from metar import run_process
+
+    source = None
+    if args.files:
+        source = read_reports(args.files)
+    elif not sys.stdin.isatty():
+        from metar_pipeline import stdin_source
+        source = stdin_source()
+    run_process(source=source, pages=args.pages, **submit_options(args))
+    return 0
+
+
+def command_backfill(args):
+    """Submit all of today's reports of a station from CMSS; reports already in the ledger are skipped."""
+    from metar import run_process
+    from metar_pipeline import cmss_source
+
+    run_process(source=cmss_source(make_fetcher(args)), pages=args.pages, **submit_options(args))
+    return 0
+
+
+def command_schedule(args):
+    """Keep every configured station current from one CMSS dump until interrupted."""
+    from datetime import timedelta
+    from metar_scheduler import DEFAULT_STATIONS, load_stations, run_schedule
+
+    stations = load_stations(args.stations) if args.stations else DEFAULT_STATIONS
+    run_schedule(stations, args.url, pages=args.pages, api_config=args.api, fast=args.fast, cdp_url=args.cdp_url,
+                 ledger_path=None if args.no_ledger else args.ledger, rejects_path=args.rejects,
+                 archive_path=args.archive, trace=args.trace, max_age=timedelta(minutes=args.max_age))
+    return 0
+
+
+def command_archive(args):
+    """Import archive files or CMSS dumps into the decoded archive."""
+    from cmss_stream import iter_reports
+    from metar_archive import MetarArchive
+
+    month = tuple(int(part) for part in args.month.split('-')) if args.month else None
+    archive = MetarArchive(args.root)
+    for path in args.files:
+        batch = []
+        for report in iter_reports(path):
+            batch.append(report)
+            if len(batch) == 1024:
+                archive.append(batch, month=month)
+                batch = []
+        archive.append(batch, month=month)
+    archive.close()
+    logging.info(f"Archive {args.root}: {archive.stats}")
+    return 0
+
+
+def command_query(args):
+    """Print the archived reports of a station in a time range as JSON lines."""
+    from datetime import datetime
+    from metar_archive import MetarArchive
+
+    where = {'wind_gust': (0, None)} if args.gusts else None
+    rows = MetarArchive(args.root).query(args.station, datetime.fromisoformat(args.start),
+                                         datetime.fromisoformat(args.end), where=where, raw=args.raw)
+    names = rows.dtype.names
+    columns = [[str(value) for value in rows[name]] if name == 'observed' else rows[name].tolist() for name in names]
+    write = sys.stdout.write
+    for values in zip(*columns):
+        # NaN (nilai tidak dilaporkan) ditulis sebagai null
+        write(json.dumps({name: None if value != value else value for name, value in zip(names, values)}) + '\n')
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="metar", description="Parse, fetch and submit METAR/SPECI reports.")
+    parser.add_argument('-v', '--verbose', action='store_true', help="log debug messages")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    parse = commands.add_parser('parse', help="parse reports to JSON lines")
+    parse.add_argument('files', nargs='*', help="archive files or CMSS dumps (default: one report per line on stdin)")
+    parse.add_argument('--raw', action='store_true', help="include the raw report in the output")
+    parse.add_argument('--validate', action='store_true', help="also reject reports the entry form cannot take")
+    parse.set_defaults(handler=command_parse)
+
+    cmss = argparse.ArgumentParser(add_help=False)
+    cmss.add_argument('--url', default=DEFAULT_CMSS_URL, help="CMSS extract URL")
+    cmss.add_argument('--station', default="WADS")
+    cmss.add_argument('--header', default="SAID35")
+    cmss.add_argument('--timeout', type=float, default=10)
+
+    fetch = commands.add_parser('fetch', parents=[cmss], help="print the latest METAR from CMSS")
+    fetch.add_argument('--today', action='store_true', help="print all of today's reports")
+    fetch.set_defaults(handler=command_fetch)
+
+    submit = argparse.ArgumentParser(add_help=False)
+    submit.add_argument('--api', metavar='CONFIG', help="submit through the form's HTTP API (JSON endpoint/field map)")
+    submit.add_argument('--fast', action='store_true', help="headless browser without images/fonts")
+    submit.add_argument('--cdp-url', help="attach to a running browser, e.g. http://localhost:9222")
+    submit.add_argument('--pages', type=int, default=1, help="browser pages submitting in parallel")
+    submit.add_argument('--ledger', default="./submissions.db", help="submission ledger (SQLite)")
+    submit.add_argument('--no-ledger', action='store_true', help="do not skip reports submitted before")
+    submit.add_argument('--rejects', default="./rejects.jsonl", help="file collecting reports that fail validation")
+    submit.add_argument('--trace', action='store_true', help="write per-step timings (trace.jsonl, metar_trace.prom)")
+
+    submit_command = commands.add_parser('submit', parents=[submit], help="submit reports to the entry form")
+    submit_command.add_argument('files', nargs='*', help="archive files (default: stdin, or the prompt on a terminal)")
+    submit_command.set_defaults(handler=command_submit)
+
+    backfill = commands.add_parser('backfill', parents=[cmss, submit], help="submit today's reports from CMSS")
+    backfill.set_defaults(handler=command_backfill)
+
+    schedule = commands.add_parser('schedule', parents=[submit], help="keep many stations current from CMSS")
+    schedule.add_argument('--stations', help="JSON list of {icao, wmo_id, header, observer} (default: WADS only)")
+    schedule.add_argument('--url', default=DEFAULT_CMSS_URL, help="CMSS extract URL")
+    schedule.add_argument('--max-age', type=float, default=180, help="minutes after which a report is not submitted")
+    schedule.add_argument('--archive', default="./archive", help="decoded report archive")
+    schedule.set_defaults(handler=command_schedule, pages=2)
+
+    archive = commands.add_parser('archive', help="import archive files or CMSS dumps into the decoded archive")
+    archive.add_argument('files', nargs='+')
+    archive.add_argument('--root', default="./archive")
+    archive.add_argument('--month', help="YYYY-MM of all reports (default: the current or previous month)")
+    archive.set_defaults(handler=command_archive)
+
+    query = commands.add_parser('query', help="print archived reports of a station as JSON lines")
+    query.add_argument('--root', default="./archive")
+    query.add_argument('--station', default="WADS")
+    query.add_argument('--start', required=True, help="first observation time, e.g. 2026-03-01")
+    query.add_argument('--end', required=True, help="end of the range (exclusive), e.g. 2026-04-01")
+    query.add_argument('--gusts', action='store_true', help="only reports with gusts")
+    query.add_argument('--raw', action='store_true', help="include the report text")
+    query.set_defaults(handler=command_query)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO,
+                        format='%(asctime)s - %(levelname)s - %(message)s')
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,196 @@
+import numpy as np
+
+from metar_engine import scan
+
+# Kolom numerik per laporan; nilai yang tidak ada diisi NaN
+MEASUREMENTS = ('wind_direction', 'wind_speed', 'wind_gust', 'visibility', 'temperature', 'dew_point', 'pressure')
+
+KNOTS_PER_MPS = 1.94384
+
+
+class MetarColumns:
+    """
+    Column arrays for a batch of decoded METAR/SPECI reports.
+
+    Units: wind in knots (MPS groups are converted), visibility in meters as reported
+    (9999 stays 9999), temperatures in °C, pressure in hPa and cloud heights in feet.
+    Missing measurements are NaN. Cloud layers are ragged: the layers of row `i` are
+    `cloud_*[cloud_offsets[i]:cloud_offsets[i + 1]]`.
+    """
+
+    # Nama kolom per laporan, dipakai untuk grow/trim/as_structured
+    ROW_COLUMNS = ('station', 'report_type', 'day', 'hour', 'minute') + MEASUREMENTS + (
+        'wind_variable', 'cavok', 'trend')
+    CLOUD_COLUMNS = ('cloud_cover', 'cloud_height', 'cloud_type')
+
+    def __init__(self, capacity=1024, cloud_capacity=None):
+        """
+        Preallocate the arrays.
+
+        Args:
+            capacity (int): Expected number of reports; arrays grow if it is exceeded.
+            cloud_capacity (int): Expected number of cloud layers (default: 3 per report).
+        """
+        capacity = max(int(capacity), 1)
+        self.size = 0
+        self.station = np.empty(capacity, dtype='U4')
+        self.report_type = np.empty(capacity, dtype='U5')
+        self.day = np.zeros(capacity, dtype=np.int8)
+        self.hour = np.zeros(capacity, dtype=np.int8)
+        self.minute = np.zeros(capacity, dtype=np.int8)
+        for name in MEASUREMENTS:
+            setattr(self, name, np.full(capacity, np.nan, dtype=np.float32))
+        self.wind_variable = np.zeros(capacity, dtype=bool)
+        self.cavok = np.zeros(capacity, dtype=bool)
+        self.trend = np.empty(capacity, dtype='U5')
+
+        cloud_capacity = max(int(cloud_capacity or capacity * 3), 1)
+        self.cloud_count = 0
+        self.cloud_offsets = np.zeros(capacity + 1, dtype=np.int64)
+        self.cloud_cover = np.empty(cloud_capacity, dtype='U3')
+        self.cloud_height = np.full(cloud_capacity, np.nan, dtype=np.float32)
+        self.cloud_type = np.empty(cloud_capacity, dtype='U3')
+
+        self.errors = []  # (index, raw, exception) untuk laporan yang gagal dibaca
+
+    def __len__(self):
+        return self.size
+
+    @staticmethod
+    def _grown(array, new_length):
+        grown = np.full(new_length, np.nan, dtype=array.dtype) if array.dtype.kind == 'f' \
+            else np.zeros(new_length, dtype=array.dtype)
+        grown[:len(array)] = array
+        return grown
+
+    def _grow_rows(self):
+        new_capacity = max(len(self.day) * 2, 16)
+        for name in self.ROW_COLUMNS:
+            setattr(self, name, self._grown(getattr(self, name), new_capacity))
+        self.cloud_offsets = self._grown(self.cloud_offsets, new_capacity + 1)
+
+    def _grow_clouds(self):
+        new_capacity = max(len(self.cloud_height) * 2, 16)
+        for name in self.CLOUD_COLUMNS:
+            setattr(self, name, self._grown(getattr(self, name), new_capacity))
+
+    def _clear_row(self, row):
+        for name in MEASUREMENTS:
+            getattr(self, name)[row] = np.nan
+        self.wind_variable[row] = False
+        self.cavok[row] = False
+        self.trend[row] = ''
+
+    def append(self, metar_code):
+        """
+        Decode one report straight into the next row.
+
+        The report is read with metar_engine.scan; only the main section goes into the
+        columns, and of the trends only the first trend type is kept. No intermediate
+        dict is built.
+
+        Raises:
+            ValueError: If the report has no observation time group. The row is left empty.
+        """
+        row = self.size
+        if row == len(self.day):
+            self._grow_rows()
+        first_cloud = self.cloud_count
+        try:
+            self._decode_into(row, metar_code)
+        except Exception:
+            self.cloud_height[first_cloud:self.cloud_count] = np.nan
+            self.cloud_count = first_cloud
+            self._clear_row(row)
+            raise
+        self.size = row + 1
+        self.cloud_offsets[self.size] = self.cloud_count
+
+    def _decode_into(self, row, metar_code):
+        # Dibaca dengan metar_engine.scan, agar aturan grup (mis. suhu pertama yang menang)
+        # sama persis dengan reader lain
+        record = scan(metar_code)
+        if record.day is None:
+            raise ValueError("No observation time group (ddhhmmZ) found")
+
+        for cloud in record.clouds:
+            if self.cloud_count == len(self.cloud_height):
+                self._grow_clouds()
+            self.cloud_cover[self.cloud_count] = cloud.cover
+            if cloud.height is not None:
+                self.cloud_height[self.cloud_count] = cloud.height
+            self.cloud_type[self.cloud_count] = cloud.cloud_type or ''
+            self.cloud_count += 1
+
+        wind = record.wind
+        if wind is not None:
+            factor = KNOTS_PER_MPS if wind.unit == 'MPS' else 1
+            if wind.direction is None:
+                self.wind_variable[row] = True
+            else:
+                self.wind_direction[row] = wind.direction
+            self.wind_speed[row] = wind.speed * factor
+            if wind.gust:
+                self.wind_gust[row] = wind.gust * factor
+        if record.visibility is not None:
+            self.visibility[row] = record.visibility
+        self.cavok[row] = record.cavok
+        if record.temperature is not None:
+            self.temperature[row] = record.temperature
+        if record.dew_point is not None:
+            self.dew_point[row] = record.dew_point
+        if record.pressure is not None:
+            self.pressure[row] = record.pressure
+        if record.trends:
+            self.trend[row] = record.trends[0].trend_type
+
+        self.station[row] = record.icao or ''
+        self.report_type[row] = record.report_type or ''
+        self.day[row], self.hour[row], self.minute[row] = record.day, record.hour, record.minute
+
+    def trim(self):
+        """Shrink every array to the number of decoded rows and cloud layers."""
+        for name in self.ROW_COLUMNS:
+            setattr(self, name, getattr(self, name)[:self.size].copy())
+        self.cloud_offsets = self.cloud_offsets[:self.size + 1].copy()
+        for name in self.CLOUD_COLUMNS:
+            setattr(self, name, getattr(self, name)[:self.cloud_count].copy())
+        return self
+
+    def clouds(self, row):
+        """Return the (cover, height, type) arrays of one report's cloud layers."""
+        start, end = self.cloud_offsets[row], self.cloud_offsets[row + 1]
+        return self.cloud_cover[start:end], self.cloud_height[start:end], self.cloud_type[start:end]
+
+    def as_structured(self):
+        """Return the per-report columns as one NumPy structured array (clouds excluded)."""
+        dtype = [(name, getattr(self, name).dtype) for name in self.ROW_COLUMNS]
+        records = np.empty(self.size, dtype=dtype)
+        for name in self.ROW_COLUMNS:
+            records[name] = getattr(self, name)[:self.size]
+        return records
+
+
+def decode_columns(reports, capacity=None):
+    """
+    Decode a batch of raw reports into MetarColumns.
+
+    Args:
+        reports (iterable): Raw METAR/SPECI reports; blank entries are skipped.
+        capacity (int): Rows to preallocate (default: len(reports) when available).
+
+    Returns:
+        MetarColumns: Trimmed columns; failed reports are listed in `errors`.
+    """
+    if capacity is None:
+        capacity = len(reports) if hasattr(reports, '__len__') else 1024
+    columns = MetarColumns(capacity)
+    for index, raw in enumerate(reports):
+        metar_code = raw.strip()
+        if not metar_code:
+            continue
+        try:
+            columns.append(metar_code)
+        except Exception as e:
+            columns.errors.append((index, raw, e))
+    return columns.trim()
@@ -0,0 +1,165 @@
+import asyncio
+import logging
+import random
+from collections import namedtuple
+from datetime import datetime, timedelta, timezone
+
+from getmetar import CMSSMetarFetcher
+
+# Laporan baru yang dimasukkan ke antrean untuk konsumen di hilir
+NewReport = namedtuple('NewReport', ['header', 'station', 'metar_time', 'text'])
+
+
+def observation_time(now):
+    """Return the most recent scheduled observation time (:00 or :30) at or before `now`."""
+    return now.replace(minute=0 if now.minute < 30 else 30, second=0, microsecond=0)
+
+
+class MetarPoller:
+    """
+    asyncio ingestion service on top of CMSSMetarFetcher.
+
+    Around every :00/:30 observation it polls with a short, jittered, growing backoff
+    until the report for every watched station has arrived (or the window closes).
+    Between observations it keeps polling at a slower interval to pick up SPECIs.
+    Each new bulletin of a watched station is put on `queue` as a NewReport.
+    """
+
+    def __init__(self, fetcher, stations=None, queue=None, min_backoff=5.0, max_backoff=60.0, jitter=0.3,
+                 window=20 * 60, speci_interval=60.0, request_timeout=15.0, backlog=False):
+        """
+        Args:
+            fetcher (CMSSMetarFetcher): Fetcher to poll; `fetch_incremental` is used.
+            stations (list): (header, station) pairs to watch (default: the fetcher's own).
+            queue (asyncio.Queue): Queue for new reports (default: a new unbounded queue).
+            min_backoff (float): First retry delay in seconds when a report is not out yet.
+            max_backoff (float): Upper limit for the retry delay.
+            jitter (float): Random +/- fraction applied to every delay.
+            window (float): Seconds after an observation time during which to poll eagerly.
+            speci_interval (float): Poll interval in seconds outside the observation window.
+            request_timeout (float): Timeout in seconds for each fetch.
+            backlog (bool): Also queue the reports already in the dump at the first poll.
+        """
+        self.fetcher = fetcher
+        self.stations = stations or [(fetcher.header, fetcher.station)]
+        self.queue = queue if queue is not None else asyncio.Queue()
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.window = window
+        self.speci_interval = speci_interval
+        self.request_timeout = request_timeout
+        self.backlog = backlog
+        self.seen = 0  # Jumlah bulletin di fetcher.bulletins yang sudah diperiksa
+        self.queued = set()  # (header, station, ddhhmm, teks) yang sudah masuk antrean
+        self._bulletins = None  # List bulletin fetcher saat terakhir diperiksa
+        self.stats = {'polls': 0, 'timeouts': 0, 'errors': 0, 'reports': 0, 'busy': 0}
+        self._stopped = asyncio.Event()
+        self._fetch = None  # Fetch yang sedang berjalan di thread; timeout tidak menghentikan thread-nya
+
+    def stop(self):
+        self._stopped.set()
+
+    async def _sleep(self, seconds):
+        """Sleep with jitter; returns early when stop() is called."""
+        seconds = max(0.0, seconds * (1 + random.uniform(-self.jitter, self.jitter)))
+        try:
+            await asyncio.wait_for(self._stopped.wait(), timeout=seconds)
+        except asyncio.TimeoutError:
+            pass
+
+    async def poll_once(self):
+        """Fetch new data once and queue any new bulletins of the watched stations."""
+        if self._fetch is not None and not self._fetch.done():
+            # Fetch sebelumnya (yang timeout) masih mengubah data fetcher: jangan mulai fetch kedua
+            self.stats['busy'] += 1
+            logging.warning("Previous CMSS poll still running, skipping this poll")
+            return 0
+        self.stats['polls'] += 1
+        self._fetch = asyncio.ensure_future(asyncio.to_thread(self.fetcher.fetch_incremental))
+        try:
+            await asyncio.wait_for(asyncio.shield(self._fetch), self.request_timeout)
+        except asyncio.TimeoutError:
+            self._fetch.add_done_callback(self._late_fetch_done)
+            self.stats['timeouts'] += 1
+            logging.warning("CMSS poll timed out")
+            return 0
+        except Exception as e:
+            self.stats['errors'] += 1
+            logging.error(f"CMSS poll failed: {e}")
+            return 0
+
+        bulletins = self.fetcher.bulletins
+        if bulletins is not self._bulletins:
+            # Indeks dibangun ulang (fetch pertama atau dump diganti): periksa semua dari awal
+            first_poll = self._bulletins is None
+            self._bulletins = bulletins
+            self.seen = 0
+            if first_poll and not self.backlog:
+                self.seen = len(bulletins)
+                self.queued = {self._key(position) for position in range(len(bulletins))}
+            else:
+                self.queued &= {self._key(position) for position in range(len(bulletins))}
+
+        watched = set(self.stations)
+        queued = 0
+        for position in range(self.seen, len(bulletins)):
+            key = self._key(position)
+            if key[:2] in watched and key not in self.queued:
+                self.queued.add(key)
+                await self.queue.put(NewReport(*key))
+                queued += 1
+        self.seen = len(bulletins)
+        self.stats['reports'] += queued
+        return queued
+
+    def _late_fetch_done(self, fetch):
+        if not fetch.cancelled() and fetch.exception() is not None:
+            self.stats['errors'] += 1
+            logging.error(f"CMSS poll failed after timing out: {fetch.exception()}")
+
+    def _key(self, position):
+        header, station, metar_time, _, _ = self.fetcher.bulletins[position]
+        return header, station, metar_time, self.fetcher.bulletin_text(position)
+
+    def has_observation(self, obs_time):
+        """True when the report for `obs_time` has arrived for every watched station."""
+        metar_time = obs_time.strftime("%d%H%M")
+        return all((header, station, metar_time) in self.fetcher.index for header, station in self.stations)
+
+    async def run(self):
+        """Poll until stop() is called."""
+        backoff = self.min_backoff
+        while not self._stopped.is_set():
+            now = datetime.now(timezone.utc)
+            obs_time = observation_time(now)
+            next_obs = obs_time + timedelta(minutes=30)
+            until_next = (next_obs - now).total_seconds()
+
+            await self.poll_once()
+            in_window = (now - obs_time).total_seconds() < self.window
+            if in_window and not self.has_observation(obs_time):
+                # Laporan terjadwal belum keluar: coba lagi dengan backoff yang makin panjang
+                await self._sleep(min(backoff, until_next))
+                backoff = min(backoff * 2, self.max_backoff)
+            else:
+                backoff = self.min_backoff
+                await self._sleep(min(self.speci_interval, until_next))
+
+
+async def main():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    url = "http://172.19.1.1/cgi-bin/extract_cmss.pl"  # Ubah ini dengan URL yang valid
+    poller = MetarPoller(CMSSMetarFetcher(url))
+    task = asyncio.create_task(poller.run())
+    try:
+        while True:
+            report = await poller.queue.get()
+            logging.info(f"New report {report.station} {report.metar_time}:\n{report.text}")
+    finally:
+        poller.stop()
+        await task
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,250 @@
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+from metar_records import CloudLayer, ParsedMetar, RunwayRange, TrendGroup, Wind, add_group
+
+# Pola untuk bentuk grup METAR yang tidak bisa dibaca dengan slicing biasa,
+# dikompilasi sekali saat import.
+PATTERNS = {
+    'wind': re.compile(r'(\d{3}|VRB)(P?\d{2,3})(?:G(\d{2,3}))?(KT|MPS)'),
+    'wind_variation': re.compile(r'(\d{3})V(\d{3})'),
+    'visibility': re.compile(r'(\d{4})(?:NDV|[NSEW]{1,2})?'),
+    'rvr': re.compile(r'R(\d{2}[LRC]?)/[PM]?(\d{4})(?:V[PM]?\d{4})?([UDN])?'),
+    'cloud': re.compile(r'(FEW|SCT|BKN|OVC|VV)(\d{3}|///)(CB|TCU|///)?'),
+    'temperature': re.compile(r'(M?\d{2})/(M?\d{2}|//)'),
+    'trend_time': re.compile(r'(FM|TL|AT)(\d{2})(\d{2})'),
+}
+
+# Grup dengan teks tetap dikenali lewat lookup dict, tanpa regex sama sekali.
+KEYWORDS = {
+    'METAR': 'type', 'SPECI': 'type',
+    'COR': 'modifier', 'AUTO': 'modifier',
+    'CAVOK': 'cavok',
+    'NSC': 'sky_clear', 'NCD': 'sky_clear', 'SKC': 'sky_clear', 'CLR': 'sky_clear',
+    'NSW': 'nsw',
+    'TEMPO': 'trend', 'BECMG': 'trend', 'NOSIG': 'trend',
+    'RMK': 'remark',
+}
+
+WEATHER_DESCRIPTORS = {'MI', 'PR', 'BC', 'DR', 'BL', 'SH', 'TS', 'FZ'}
+WEATHER_PHENOMENA = {'DZ', 'RA', 'SN', 'SG', 'IC', 'PE', 'GR', 'GS', 'BR', 'FG', 'FU', 'VA', 'DU', 'SA', 'HZ',
+                     'PO', 'SQ', 'FC', 'SS', 'DS'}
+
+# Hasil per laporan dari parse_many(); `error` berisi exception jika laporan gagal dibaca
+ParseResult = namedtuple('ParseResult', ['index', 'raw', 'parsed', 'error'])
+
+_CLOUD_PREFIXES = {'FEW', 'SCT', 'BKN', 'OVC'}
+_TREND_TIME_PREFIXES = {'FM', 'TL', 'AT'}
+_TREND_TIME_ATTRIBUTES = {'FM': 'from_time', 'TL': 'till_time', 'AT': 'at_time'}
+
+
+def _temperature(value):
+    """'M05' -> -5, '28' -> 28, '//' -> None"""
+    if value.startswith('/'):
+        return None
+    return -int(value[1:]) if value[0] == 'M' else int(value)
+
+
+# Konversi grup hasil regex menjadi nilai numerik
+_CONVERTERS = {
+    'wind': lambda direction, speed, gust, unit: (
+        None if direction == 'VRB' else int(direction), int(speed.lstrip('P')), int(gust) if gust else None, unit),
+    'wind_variation': lambda start, end: (int(start), int(end)),
+    'visibility': lambda visibility: int(visibility),
+    'rvr': lambda runway, range_, trend: (runway, int(range_), trend),
+    'cloud': lambda cover, height, cloud_type: (
+        cover, int(height) * 100 if height.isdigit() else None, cloud_type if cloud_type != '///' else None),
+    'temperature': lambda temp, dew_point: (_temperature(temp), _temperature(dew_point)),
+    'trend_time': lambda trend_kind, hour, minute: (trend_kind, int(hour), int(minute)),
+}
+
+
+@lru_cache(maxsize=16384)
+def classify(text):
+    """
+    Classify and split a single METAR group by its shape.
+
+    The common fixed-width groups (time, visibility, pressure, simple cloud layers)
+    are sliced directly; the remaining shapes are picked by cheap string checks so
+    that each group costs at most one `fullmatch` against its own pattern. The set of
+    distinct groups in an archive is small (9999, NOSIG, Q1010, FEW020, ...), so the
+    results are memoized and most groups cost a single cache lookup.
+
+    Args:
+        text (str): One whitespace-separated group of the report.
+
+    Returns:
+        tuple: (kind, value). `value` is the group text for keywords and unknown
+            groups, and an int or a tuple of ints/codes for the decoded groups, e.g.
+            ('wind', (90, 15, 25, 'KT')) or ('cloud', ('FEW', 1500, 'CB')).
+    """
+    kind = KEYWORDS.get(text)
+    if kind is not None:
+        return kind, text
+
+    length = len(text)
+    first = text[0]
+    if first.isdigit():
+        last = text[-1]
+        if last == 'Z':
+            if length == 7 and text[:6].isdigit():
+                return 'time', (int(text[0:2]), int(text[2:4]), int(text[4:6]))
+            return 'unknown', text
+        if length == 4 and text.isdigit():
+            return 'visibility', int(text)
+        if last == 'T' or last == 'S':
+            kind = 'wind'
+        elif '/' in text:
+            kind = 'temperature'
+        elif 'V' in text:
+            kind = 'wind_variation'
+        else:
+            kind = 'visibility'
+    elif first == 'Q':
+        if length == 5 and text[1:].isdigit():
+            return 'pressure', int(text[1:])
+        return 'unknown', text
+    elif text[:3] in _CLOUD_PREFIXES:
+        if length == 6 and text[3:].isdigit():
+            return 'cloud', (text[:3], int(text[3:]) * 100, None)
+        kind = 'cloud'
+    elif '/' in text:
+        kind = 'rvr' if first == 'R' else 'temperature'
+    elif text[:2] == 'VV':
+        kind = 'cloud'
+    elif text[:2] in _TREND_TIME_PREFIXES and text[2:].isdigit():
+        kind = 'trend_time'
+    elif text[:3] == 'VRB':
+        kind = 'wind'
+    else:
+        return _classify_weather(text)
+
+    match = PATTERNS[kind].fullmatch(text)
+    if match is None:
+        # ICAO atau grup yang tidak dikenal; diputuskan oleh scan() berdasarkan posisi
+        return 'unknown', text
+    return kind, _CONVERTERS[kind](*match.groups())
+
+
+def _classify_weather(text):
+    """Split a present-weather group such as '-TSRA' into intensity, descriptor and phenomena."""
+    intensity = None
+    rest = text
+    if text[0] == '-' or text[0] == '+':
+        intensity, rest = text[0], text[1:]
+    elif text[:2] == 'VC':
+        intensity, rest = 'VC', text[2:]
+
+    descriptor = None
+    if rest[:2] in WEATHER_DESCRIPTORS:
+        descriptor, rest = rest[:2], rest[2:]
+
+    phenomena = tuple(rest[i:i + 2] for i in range(0, len(rest), 2))
+    if (not descriptor and not phenomena) or len(rest) % 2 or not WEATHER_PHENOMENA.issuperset(phenomena):
+        return 'unknown', text
+    return 'weather', (intensity, descriptor, phenomena)
+
+
+def tokenize(metar_code):
+    """
+    Split a METAR/SPECI report into groups and classify each one.
+
+    Args:
+        metar_code (str): Raw report, optionally preceded by a CMSS bulletin header
+            and terminated by '='.
+
+    Returns:
+        list: (kind, value) tuples in report order, as returned by `classify`.
+    """
+    return [classify(text) for text in metar_code.replace('=', ' ').split()]
+
+
+def scan(metar_code):
+    """
+    Decode a report in a single left-to-right pass over its groups.
+
+    Everything after a trend keyword (TEMPO, BECMG, NOSIG) is collected into its own
+    TrendGroup, and everything after RMK is ignored.
+
+    Args:
+        metar_code (str): Raw METAR/SPECI report.
+
+    Returns:
+        ParsedMetar: Decoded report with numeric values.
+    """
+    record = ParsedMetar()
+    section = record
+
+    for text in metar_code.replace('=', ' ').split():
+        kind, value = classify(text)
+        if kind == 'cloud':
+            add_group(section, 'clouds', CloudLayer(*value))
+        elif kind == 'visibility':
+            # Grup pertama yang menang, misalnya visibility utama sebelum visibility minimum
+            if section.visibility is None:
+                section.visibility = value
+        elif kind == 'wind':
+            if section.wind is None:
+                section.wind = Wind(*value)
+        elif kind == 'weather':
+            add_group(section, 'weather', value)
+        elif kind == 'time':
+            if record.day is None:
+                record.day, record.hour, record.minute = value
+        elif kind == 'temperature':
+            if record.temperature is None:
+                record.temperature, record.dew_point = value
+        elif kind == 'pressure':
+            if record.pressure is None:
+                record.pressure = value
+        elif kind == 'trend':
+            section = TrendGroup(value)
+            add_group(record, 'trends', section)
+        elif kind == 'type':
+            record.report_type = value
+        elif kind == 'unknown':
+            # Kode ICAO adalah grup 4 huruf pertama sebelum grup waktu
+            if record.icao is None and record.day is None and len(text) == 4 and text.isalpha():
+                record.icao = text
+        elif kind == 'rvr':
+            add_group(section, 'rvr', RunwayRange(*value))
+        elif kind == 'wind_variation':
+            if section.wind is not None:
+                section.wind.variable_from, section.wind.variable_to = value
+        elif kind == 'cavok':
+            section.cavok = True
+            section.visibility = 9999
+        elif kind == 'sky_clear':
+            section.sky_condition = text
+        elif kind == 'trend_time' and section is not record:
+            trend_kind, hour, minute = value
+            setattr(section, _TREND_TIME_ATTRIBUTES[trend_kind], (hour, minute))
+        elif kind == 'remark':
+            break
+
+    return record
+
+
+def parse_stream(reports, parse):
+    """
+    Lazily run `parse` over an iterable of raw reports.
+
+    Blank entries are skipped; every other entry yields exactly one ParseResult, with
+    the exception in `error` instead of raising, so one bad line does not stop a batch.
+
+    Args:
+        reports (iterable): Raw reports, e.g. pasted lines or CMSS bulletin matches.
+        parse (callable): Function turning one stripped report into a parsed record.
+
+    Yields:
+        ParseResult: (index, raw, parsed, error) for each non-blank report.
+    """
+    for index, raw in enumerate(reports):
+        metar_code = raw.strip()
+        if not metar_code:
+            continue
+        try:
+            yield ParseResult(index, raw, parse(metar_code), None)
+        except Exception as e:
+            yield ParseResult(index, raw, None, e)
@@ -0,0 +1,259 @@
+import logging
+import queue
+import sys
+import threading
+import time
+
+import cmss_stream
+from metar_priority import PriorityReportQueue
+from nosig_reader import parse_many
+from tracing import span
+
+# Penanda akhir aliran di antrean antar-stage
+_DONE = object()
+
+
+class StageMetrics:
+    """Throughput and queue-depth counters of one pipeline stage."""
+
+    def __init__(self, name):
+        self.name = name
+        self.items = 0
+        self.errors = 0
+        self.busy = 0.0  # Detik yang dipakai stage untuk bekerja (bukan menunggu)
+        self.depth_total = 0  # Jumlah kedalaman antrean masuk yang terlihat, untuk rata-rata
+        self.depth_max = 0
+        self.started = None
+        self.finished = None
+
+    def record(self, busy, depth, error=False):
+        self.items += 1
+        self.errors += error
+        self.busy += busy
+        self.depth_total += depth
+        self.depth_max = max(self.depth_max, depth)
+
+    def as_dict(self):
+        elapsed = ((self.finished or time.perf_counter()) - self.started) if self.started else 0.0
+        return {
+            'items': self.items,
+            'errors': self.errors,
+            'per_second': self.items / elapsed if elapsed else 0.0,
+            'busy_seconds': self.busy,
+            'avg_queue_depth': self.depth_total / self.items if self.items else 0.0,
+            'max_queue_depth': self.depth_max,
+        }
+
+
+def lines_source(lines):
+    """Report source for already-collected lines; blank lines are skipped downstream."""
+    return iter(lines)
+
+
+def stdin_source(stream=None):
+    """Report source reading one report per line until EOF or a line 'exit'."""
+    for line in stream or sys.stdin:
+        if line.strip().lower() == 'exit':
+            break
+        yield line
+
+
+def file_source(path):
+    """Report source streaming an archive file or CMSS dump (see cmss_stream.iter_reports)."""
+    return cmss_stream.iter_reports(path)
+
+
+def cmss_source(fetcher, station=None, header=None):
+    """Report source yielding today's bulletins of one station from a CMSSMetarFetcher."""
+    fetcher.fetch_data()
+    return iter(fetcher.find_all_metar_today(station, header))
+
+
+class MetarPipeline:
+    """
+    Three-stage pipeline: report source -> parser -> submission.
+
+    The source and the parser each run on their own thread and hand work on through
+    bounded queues, so parsing runs ahead of the (slow) submission stage without
+    reading an unbounded backlog into memory. The submission stage runs on the
+    calling thread, because Playwright's sync API must stay on the thread that
+    started the browser.
+
+    With `prioritize`, parsed reports reach the submission stage by priority class
+    instead of in source order (see metar_priority), e.g. a SPECI pasted behind a
+    day of backfill is submitted next.
+    """
+
+    def __init__(self, source, submit, parse_many=parse_many, queue_size=32, prioritize=None, backlog=10000):
+        """
+        Args:
+            source (iterable): Raw report strings (see the *_source functions).
+            submit (callable): Called with each ParseResult; returns True on success.
+            parse_many (callable): Batch parser producing ParseResults (default: nosig_reader's).
+            queue_size (int): Capacity of each queue between stages.
+            prioritize (callable): Optional priority class of a ParseResult, e.g.
+                metar_priority.classify_priority.
+            backlog (int): Capacity of the parsed queue when prioritizing.
+        """
+        self.source = source
+        self.submit = submit
+        self.parse_many = parse_many
+        self.raw_queue = queue.Queue(maxsize=queue_size)
+        if prioritize is None:
+            self.parsed_queue = queue.Queue(maxsize=queue_size)
+            self.latency = None
+        else:
+            # Parser membaca jauh ke depan, agar laporan mendesak di belakang backfill terlihat
+            self.parsed_queue = PriorityReportQueue(prioritize, final=_DONE, maxsize=backlog)
+            self.latency = self.parsed_queue.latency
+        self.metrics = {name: StageMetrics(name) for name in ('source', 'parse', 'submit')}
+        self._stopped = threading.Event()
+        self._failure = None
+
+    def stop(self):
+        """Ask the source and parser threads to stop after their current item."""
+        self._stopped.set()
+
+    def _put(self, target, item):
+        """Put with a timeout loop so a stopped pipeline never blocks on a full queue."""
+        while not self._stopped.is_set():
+            try:
+                target.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _finish(self, target):
+        # Selama pipeline berjalan, tunggu sampai ada tempat: laporan yang sudah antre
+        # tetap dikirim walaupun tahap berikutnya lambat
+        while not self._stopped.is_set():
+            try:
+                target.put(_DONE, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+        # Pipeline dihentikan: sisa antrean dibuang agar penanda akhir pasti sampai
+        while True:
+            try:
+                target.put_nowait(_DONE)
+                return
+            except queue.Full:
+                try:
+                    target.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def _run_source(self):
+        metrics = self.metrics['source']
+        metrics.started = time.perf_counter()
+        try:
+            iterator = iter(self.source)
+            while not self._stopped.is_set():
+                start = time.perf_counter()
+                try:
+                    report = next(iterator)
+                except StopIteration:
+                    break
+                metrics.record(time.perf_counter() - start, self.raw_queue.qsize())
+                if not self._put(self.raw_queue, report):
+                    break
+        except Exception as e:
+            self._failure = e
+            logging.error(f"Report source failed: {e}")
+        finally:
+            metrics.finished = time.perf_counter()
+            self._finish(self.raw_queue)
+
+    def _raw_reports(self):
+        while True:
+            report = self.raw_queue.get()
+            if report is _DONE:
+                return
+            yield report
+
+    def _run_parser(self):
+        metrics = self.metrics['parse']
+        metrics.started = time.perf_counter()
+        try:
+            results = self.parse_many(self._raw_reports())
+            while not self._stopped.is_set():
+                depth = self.raw_queue.qsize()
+                start = time.perf_counter()
+                with span("pipeline.parse"):
+                    result = next(results, _DONE)
+                if result is _DONE:
+                    break
+                metrics.record(time.perf_counter() - start, depth, result.error is not None)
+                if not self._put(self.parsed_queue, result):
+                    break
+        except Exception as e:
+            self._failure = e
+            logging.error(f"Parser stage failed: {e}")
+        finally:
+            metrics.finished = time.perf_counter()
+            self._drain_raw()
+            self._finish(self.parsed_queue)
+
+    def _drain_raw(self):
+        # Parser berhenti lebih awal: kosongkan antrean agar thread sumber tidak tertahan
+        if self._stopped.is_set() or self._failure is not None:
+            self._stopped.set()
+            while True:
+                try:
+                    self.raw_queue.get_nowait()
+                except queue.Empty:
+                    break
+
+    def run(self):
+        """
+        Run the pipeline until the source is exhausted or stop() is called.
+
+        Returns:
+            dict: Per-stage metrics (see `StageMetrics.as_dict`).
+        """
+        threads = [
+            threading.Thread(target=self._run_source, name='metar-source', daemon=True),
+            threading.Thread(target=self._run_parser, name='metar-parse', daemon=True),
+        ]
+        for thread in threads:
+            thread.start()
+
+        metrics = self.metrics['submit']
+        metrics.started = time.perf_counter()
+        try:
+            while True:
+                depth = self.parsed_queue.qsize()
+                result = self.parsed_queue.get()
+                if result is _DONE:
+                    break
+                if self._stopped.is_set():
+                    continue  # Kosongkan antrean sampai penanda akhir
+                start = time.perf_counter()
+                try:
+                    with span("pipeline.submit"):
+                        ok = self.submit(result)
+                except Exception as e:
+                    logging.error(f"Submission failed for '{result.raw.strip()}': {e}")
+                    ok = False
+                self.parsed_queue.task_done()
+                metrics.record(time.perf_counter() - start, depth, not ok)
+        finally:
+            metrics.finished = time.perf_counter()
+            self.stop()
+            for thread in threads:
+                # Sumber stdin bisa tertahan di readline; thread daemon, jadi jangan tunggu lama
+                thread.join(timeout=1.0)
+        self.log_metrics()
+        return self.stats()
+
+    def stats(self):
+        return {name: metrics.as_dict() for name, metrics in self.metrics.items()}
+
+    def log_metrics(self):
+        for name, stats in self.stats().items():
+            logging.info(f"Stage {name}: {stats['items']} items, {stats['errors']} errors, "
+                         f"{stats['per_second']:.1f}/s, queue depth avg {stats['avg_queue_depth']:.1f} "
+                         f"max {stats['max_queue_depth']}")
+        if self.latency is not None:
+            self.latency.log()
@@ -0,0 +1,213 @@
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta, timezone
+
+from metar_validation import MAX_AHEAD, observation_datetime
+from parse_cache import normalize_report
+from tracing import Histogram
+
+# Kelas prioritas; angka kecil dilayani lebih dulu
+SPECI, CURRENT, BACKFILL = 0, 1, 2
+PRIORITY_NAMES = ('speci', 'current', 'backfill')
+
+# Laporan yang diamati dalam jendela ini masih laporan terkini (METAR tiap 30 menit)
+CURRENT_WINDOW = timedelta(minutes=60)
+
+# Paling banyak sekian laporan kelas lebih tinggi dilayani berturut-turut selama kelas
+# yang lebih rendah menunggu; backfill tetap jalan walaupun SPECI terus berdatangan
+STARVATION_LIMIT = 4
+
+
+def classify_priority(result, now=None, window=CURRENT_WINDOW):
+    """
+    Return the priority class (SPECI, CURRENT or BACKFILL) of a ParseResult.
+
+    A report observed within `window` before `now` is SPECI or CURRENT by its report
+    type; anything older (a pasted day, a CMSS backlog) is BACKFILL, old SPECIs
+    included. Results with an error are only logged by the submit stage, so they
+    cost nothing and go out as CURRENT.
+
+    Args:
+        result (ParseResult): Parsed (and validated) report.
+        now (datetime): Current UTC time (default: now).
+        window (timedelta): How long after observation a report counts as current.
+
+    Returns:
+        int: The priority class.
+    """
+    if result.error is not None:
+        return CURRENT
+    now = now or datetime.now(timezone.utc)
+    try:
+        observed = observation_datetime(result.parsed, now)
+    except (KeyError, TypeError, ValueError):
+        return BACKFILL
+    # Hari setelah hari ini sudah diarahkan ke bulan lalu; yang masih di depan jam berarti salah
+    if observed > now + MAX_AHEAD or now - observed > window:
+        return BACKFILL
+    return SPECI if normalize_report(result.raw).startswith('SPECI') else CURRENT
+
+
+class PriorityBuckets:
+    """
+    Queued items by priority class; FIFO per key within a class, keys served round-robin.
+
+    The highest waiting class goes first, but a lower class is not starved: once
+    `starvation_limit` items of higher classes were served in a row while it waited,
+    its next item goes before them. Not thread-safe; PriorityReportQueue and
+    metar_scheduler.FairQueue wrap it for threads and asyncio.
+    """
+
+    def __init__(self, starvation_limit=STARVATION_LIMIT):
+        self.starvation_limit = starvation_limit
+        self.levels = [({}, deque()) for _ in PRIORITY_NAMES]  # Per kelas: (kunci -> deque, giliran kunci)
+        self.counts = [0] * len(PRIORITY_NAMES)
+        self.passed = [0] * len(PRIORITY_NAMES)  # Berapa kali kelas ini dilewati sejak terakhir dilayani
+
+    def push(self, priority, item, key=None):
+        queues, ring = self.levels[priority]
+        entries = queues.setdefault(key, deque())
+        if not entries:
+            ring.append(key)
+        entries.append((time.monotonic(), item))
+        self.counts[priority] += 1
+
+    def pop(self):
+        """
+        Remove the next item.
+
+        Returns:
+            tuple: (priority, enqueued, item), `enqueued` being the time.monotonic() of push.
+
+        Raises:
+            IndexError: When no item is queued.
+        """
+        waiting = [priority for priority, count in enumerate(self.counts) if count]
+        if not waiting:
+            raise IndexError("pop from empty PriorityBuckets")
+        chosen = next((priority for priority in waiting[1:] if self.passed[priority] >= self.starvation_limit),
+                      waiting[0])
+        self.passed = [self.passed[priority] + 1 if count and priority > chosen else 0
+                       for priority, count in enumerate(self.counts)]
+
+        queues, ring = self.levels[chosen]
+        key = ring.popleft()
+        entries = queues[key]
+        enqueued, item = entries.popleft()
+        if entries:
+            ring.append(key)  # Kembali ke belakang antrean giliran
+        else:
+            del queues[key]
+        self.counts[chosen] -= 1
+        return chosen, enqueued, item
+
+    def depths(self):
+        """Return the number of queued items per class name."""
+        return dict(zip(PRIORITY_NAMES, self.counts))
+
+    def key_depths(self):
+        """Return the number of queued items per key, over all classes."""
+        depths = {}
+        for queues, _ in self.levels:
+            for key, entries in queues.items():
+                depths[key] = depths.get(key, 0) + len(entries)
+        return depths
+
+    def __len__(self):
+        return sum(self.counts)
+
+
+class PriorityLatency:
+    """Per-class latency from queueing a report until its submission finished."""
+
+    def __init__(self):
+        self.histograms = [Histogram() for _ in PRIORITY_NAMES]
+
+    def record(self, priority, seconds):
+        self.histograms[priority].add(seconds)
+
+    def summary(self):
+        """Return count/total/p50/p95/p99/max (seconds) per class name that saw reports."""
+        return {name: histogram.summary() for name, histogram in zip(PRIORITY_NAMES, self.histograms)
+                if histogram.count}
+
+    def log(self):
+        for name, stats in self.summary().items():
+            logging.info(f"Priority {name}: {stats['count']} reports, latency p50 {stats['p50']:.2f} s "
+                         f"p95 {stats['p95']:.2f} s max {stats['max']:.2f} s")
+
+
+class PriorityReportQueue:
+    """
+    Thread-safe queue handing ParseResults to one consumer in priority order.
+
+    Offers the part of queue.Queue that MetarPipeline uses (put with a timeout,
+    put_nowait, get, get_nowait, qsize, task_done). The `final` sentinel is handed out only after every
+    queued item. The consumer calls task_done() when it finished the item it got last,
+    which records that item's latency in `latency`.
+    """
+
+    def __init__(self, classify=classify_priority, final=None, maxsize=10000, starvation_limit=STARVATION_LIMIT):
+        """
+        Args:
+            classify (callable): Returns the priority class of an item (default: classify_priority).
+            final (object): End-of-stream sentinel, queued behind everything else.
+            maxsize (int): Items queued before put() blocks. Large, so the producer reads
+                far enough ahead to find urgent reports behind a bulk load.
+            starvation_limit (int): See PriorityBuckets.
+        """
+        self.classify = classify
+        self.final = final
+        self.maxsize = maxsize
+        self.buckets = PriorityBuckets(starvation_limit)
+        self.latency = PriorityLatency()
+        self.condition = threading.Condition()
+        self.finished = False
+        self.current = None  # (kelas, waktu masuk) item yang terakhir diambil konsumen
+
+    def put(self, item, timeout=None):
+        """Queue `item`; raises queue.Full if no room became free within `timeout` seconds."""
+        if item is self.final:
+            with self.condition:
+                self.finished = True
+                self.condition.notify_all()
+            return
+        priority = self.classify(item)
+        with self.condition:
+            if not self.condition.wait_for(lambda: len(self.buckets) < self.maxsize, timeout):
+                raise queue.Full
+            self.buckets.push(priority, item)
+            self.condition.notify_all()
+
+    def get(self, block=True):
+        """Return the next item by priority, or `final` once the queue is drained after it was put."""
+        with self.condition:
+            while not len(self.buckets):
+                if self.finished:
+                    return self.final
+                if not block:
+                    raise queue.Empty
+                self.condition.wait()
+            priority, enqueued, item = self.buckets.pop()
+            self.condition.notify_all()
+        self.current = (priority, enqueued)
+        return item
+
+    def put_nowait(self, item):
+        self.put(item, timeout=0)
+
+    def get_nowait(self):
+        return self.get(block=False)
+
+    def task_done(self):
+        if self.current is not None:
+            priority, enqueued = self.current
+            self.latency.record(priority, time.monotonic() - enqueued)
+            self.current = None
+
+    def qsize(self):
+        with self.condition:
+            return len(self.buckets)
@@ -0,0 +1,129 @@
+class _Record:
+    """Base for the slotted METAR record types: field-wise repr and equality."""
+    __slots__ = ()
+    _fields = ()
+
+    def __repr__(self):
+        fields = ', '.join(f"{name}={getattr(self, name)!r}" for name in self._fields)
+        return f"{type(self).__name__}({fields})"
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self._fields)
+
+
+class Wind(_Record):
+    """Surface wind; `direction` is None for VRB. Speeds are in `unit` (KT or MPS)."""
+    __slots__ = _fields = ('direction', 'speed', 'gust', 'unit', 'variable_from', 'variable_to')
+
+    def __init__(self, direction, speed, gust=None, unit='KT', variable_from=None, variable_to=None):
+        self.direction = direction
+        self.speed = speed
+        self.gust = gust
+        self.unit = unit
+        self.variable_from = variable_from
+        self.variable_to = variable_to
+
+    @property
+    def is_variable(self):
+        return self.direction is None
+
+    def direction_text(self):
+        """Direction as reported, e.g. '090' or 'VRB'."""
+        return 'VRB' if self.direction is None else f"{self.direction:03d}"
+
+    def speed_text(self, value=None):
+        """Speed (or `value`, e.g. the gust) with its unit, e.g. '05 KT'."""
+        return f"{self.speed if value is None else value:02d} {self.unit}"
+
+
+class CloudLayer(_Record):
+    """One cloud layer; `height` is in feet, None when reported as ///."""
+    __slots__ = _fields = ('cover', 'height', 'cloud_type')
+
+    def __init__(self, cover, height, cloud_type=None):
+        self.cover = cover
+        self.height = height
+        self.cloud_type = cloud_type
+
+
+class RunwayRange(_Record):
+    """Runway visual range in meters, with the optional U/D/N tendency."""
+    __slots__ = _fields = ('runway', 'range', 'trend')
+
+    def __init__(self, runway, range_, trend=None):
+        self.runway = runway
+        self.range = range_
+        self.trend = trend
+
+
+class _Section(_Record):
+    """
+    Fields shared by the main body of a report and each of its trend groups.
+
+    The repeating fields start out as an empty tuple and only become a list when the
+    first group is added, so reports without RVR, weather or clouds carry no lists.
+    """
+    __slots__ = _fields = ('wind', 'visibility', 'cavok', 'rvr', 'weather', 'clouds', 'sky_condition')
+
+    def __init__(self):
+        self.wind = None
+        self.visibility = None  # meters, 9999 as reported
+        self.cavok = False
+        self.rvr = ()
+        self.weather = ()  # (intensity, descriptor, phenomena) code tuples
+        self.clouds = ()
+        self.sky_condition = None  # NSC/NCD/SKC/CLR as reported, when there is no cloud layer
+
+
+class TrendGroup(_Section):
+    """A TEMPO/BECMG/NOSIG trend; FM/TL/AT times are (hour, minute) tuples."""
+    __slots__ = ('trend_type', 'from_time', 'till_time', 'at_time')
+    _fields = ('trend_type', 'from_time', 'till_time', 'at_time') + _Section.__slots__
+
+    def __init__(self, trend_type):
+        super().__init__()
+        self.trend_type = trend_type
+        self.from_time = None
+        self.till_time = None
+        self.at_time = None
+
+
+class ParsedMetar(_Section):
+    """A decoded METAR/SPECI report with numeric values; temperatures in °C, QNH in hPa."""
+    __slots__ = ('report_type', 'icao', 'day', 'hour', 'minute', 'temperature', 'dew_point', 'pressure',
+                 'trends')
+    _fields = ('report_type', 'icao', 'day', 'hour', 'minute') + _Section.__slots__ + (
+        'temperature', 'dew_point', 'pressure', 'trends')
+
+    def __init__(self):
+        super().__init__()
+        self.report_type = None
+        self.icao = None
+        self.day = None
+        self.hour = None
+        self.minute = None
+        self.temperature = None
+        self.dew_point = None
+        self.pressure = None
+        self.trends = ()
+
+
+def add_group(record, field, value):
+    """Append `value` to a repeating field, creating the list on first use."""
+    values = getattr(record, field)
+    if values:
+        values.append(value)
+    else:
+        setattr(record, field, [value])
+
+
+def format_two_digits(value):
+    """Format a temperature the way METAR does, keeping the sign: 5 -> '05', -3 -> '-03'."""
+    return f"{value:03d}" if value < 0 else f"{value:02d}"
+
+
+def format_time(hour, minute):
+    """Format an hour and minute as 'hh:mm UTC'."""
+    return f"{hour:02d}:{minute:02d} UTC"
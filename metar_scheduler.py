@@ -0,0 +1,283 @@
+import asyncio
+import json
+import logging
+import time
+from collections import namedtuple
+from concurrent.futures import Future
+from datetime import datetime, timedelta, timezone
+
+from metar import pooled_submit
+from metar_daemon import MetarPoller
+from metar_priority import CURRENT, STARVATION_LIMIT, PriorityBuckets, PriorityLatency, classify_priority
+from metar_validation import MAX_AHEAD, observation_datetime, validate_results
+from nosig_reader import parse_many
+from submission_ledger import report_key
+import tracing
+
+# Satu stasiun yang dijadwalkan: kode ICAO dan header bulletin di CMSS, nomor WMO dan
+# pengamat yang dipilih di form
+StationConfig = namedtuple('StationConfig', ['icao', 'wmo_id', 'header', 'observer'])
+
+DEFAULT_STATIONS = [StationConfig('WADS', '97260', 'SAID35', 'Zulkifli Ramadhan')]
+
+
+def load_stations(path):
+    """
+    Read the station configuration from a JSON file.
+
+    The file holds a list of objects with the keys of StationConfig, e.g.
+    `[{"icao": "WADS", "wmo_id": "97260", "header": "SAID35", "observer": "..."}]`.
+
+    Returns:
+        list: StationConfig per station.
+    """
+    with open(path) as f:
+        entries = json.load(f)
+    return [StationConfig(**{field: str(entry[field]) for field in StationConfig._fields}) for entry in entries]
+
+
+class FairQueue:
+    """
+    Per-station FIFO queues served round-robin, by priority class.
+
+    SPECIs go before current reports and both before backfill (see
+    metar_priority.PriorityBuckets, which also keeps backfill from starving). Within a
+    class a station with a long backlog (e.g. after an outage) gets one turn per round
+    like every other station, so it cannot delay the reports of the others.
+    """
+
+    def __init__(self, starvation_limit=STARVATION_LIMIT):
+        self.buckets = PriorityBuckets(starvation_limit)
+        self.ready = asyncio.Event()
+
+    def put(self, station, item, priority=CURRENT):
+        self.buckets.push(priority, item, station)
+        self.ready.set()
+
+    async def get(self):
+        """
+        Wait for an item and return the next one by priority and station turn.
+
+        Returns:
+            tuple: (priority, enqueued, item); see PriorityBuckets.pop.
+        """
+        while not len(self.buckets):
+            self.ready.clear()
+            await self.ready.wait()
+        return self.buckets.pop()
+
+    def depths(self):
+        return self.buckets.key_depths()
+
+    def __len__(self):
+        return len(self.buckets)
+
+
+class MetarScheduler:
+    """
+    Keeps many stations current from one CMSS dump.
+
+    One MetarPoller watches the bulletins of every configured station. New reports
+    are parsed, validated and checked against the submission ledger, then queued per
+    station and priority class in a FairQueue. `workers` dispatcher tasks take SPECIs
+    first, then current reports, then backlog, round-robin over the stations, and hand
+    them to `submit` on a thread, so submissions of different stations share the same
+    browser pages or HTTP session.
+    """
+
+    def __init__(self, fetcher, stations, submit, workers=2, ledger=None, rejects=None,
+                 max_age=timedelta(hours=3), archive=None, **poller_options):
+        """
+        Args:
+            fetcher (CMSSMetarFetcher): Fetcher of the CMSS dump holding all stations.
+            stations (list): StationConfig per station.
+            submit (callable): Called as `submit(station, result, key)` on a worker thread;
+                returns True when the report was accepted (and recorded in the ledger).
+            workers (int): Submissions in flight at once (e.g. the number of pages).
+            ledger (SubmissionLedger): Reports recorded here are not queued again.
+            rejects (RejectList): Collects reports that fail validation.
+            max_age (timedelta): Reports observed longer ago than this are not submitted.
+            archive (MetarArchive): Every new report (also stale ones) is archived here.
+            **poller_options: Passed on to MetarPoller (min_backoff, speci_interval, ...).
+        """
+        self.stations = {(station.header, station.icao): station for station in stations}
+        self.poller = MetarPoller(fetcher, list(self.stations), backlog=True, **poller_options)
+        self.submit = submit
+        self.workers = workers
+        self.ledger = ledger
+        self.rejects = rejects
+        self.max_age = max_age
+        self.archive = archive
+        self.queue = FairQueue()
+        self.latency = PriorityLatency()
+        self.stats = {station.icao: {'queued': 0, 'submitted': 0, 'failed': 0, 'rejected': 0, 'skipped': 0,
+                                     'stale': 0, 'max_lag': 0.0} for station in stations}
+        self._tasks = []
+
+    def _is_stale(self, report, now):
+        try:
+            observed = observation_datetime(
+                {'day': report.metar_time[:2], 'hour': report.metar_time[2:4], 'minute': report.metar_time[4:]}, now)
+        except ValueError:
+            return True  # Hari yang tidak ada di bulan lalu: laporan rusak atau sangat lama
+        return observed > now + MAX_AHEAD or now - observed > self.max_age
+
+    async def _ingest(self):
+        while True:
+            report = await self.poller.queue.get()
+            station = self.stations[(report.header, report.station)]
+            stats = self.stats[station.icao]
+            if self.archive is not None:
+                self.archive.append([report.text])
+            # Dump CMSS bisa berisi laporan berhari-hari; hanya yang masih baru yang dikirim
+            if self._is_stale(report, datetime.now(timezone.utc)):
+                stats['stale'] += 1
+                continue
+            for result in validate_results(parse_many([report.text]), self.rejects):
+                if result.error is not None:
+                    stats['rejected'] += 1
+                    continue
+                key = report_key(result.raw)
+                if self.ledger is not None and self.ledger.contains(key):
+                    stats['skipped'] += 1
+                    continue
+                stats['queued'] += 1
+                self.queue.put(station.icao, (station, result, key), classify_priority(result))
+
+    async def _dispatch(self):
+        while True:
+            priority, enqueued, (station, result, key) = await self.queue.get()
+            stats = self.stats[station.icao]
+            try:
+                ok = await asyncio.to_thread(self.submit, station, result, key)
+            except Exception as e:
+                logging.error(f"Submission for {station.icao} failed: {e}")
+                ok = False
+            if not ok:
+                stats['failed'] += 1
+                continue
+            stats['submitted'] += 1
+            self.latency.record(priority, time.monotonic() - enqueued)
+            now = datetime.now(timezone.utc)
+            lag = (now - observation_datetime(result.parsed, now)).total_seconds()
+            stats['max_lag'] = max(stats['max_lag'], lag)
+            logging.info(f"{station.icao} {result.parsed['day']}{result.parsed['hour']}{result.parsed['minute']}Z "
+                         f"submitted {lag / 60:.1f} min after observation ({len(self.queue)} queued)")
+
+    async def run(self):
+        """Poll, queue and submit until stop() is called (or the task is cancelled)."""
+        self._tasks = [asyncio.create_task(self.poller.run()), asyncio.create_task(self._ingest())]
+        self._tasks += [asyncio.create_task(self._dispatch()) for _ in range(self.workers)]
+        try:
+            await asyncio.gather(*self._tasks)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self.poller.stop()
+            for task in self._tasks:
+                task.cancel()
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+            if self.archive is not None:
+                self.archive.flush()
+            self.log_stats()
+
+    def stop(self):
+        for task in self._tasks:
+            task.cancel()
+
+    def log_stats(self):
+        for icao, stats in self.stats.items():
+            logging.info(f"{icao}: {stats}")
+        self.latency.log()
+
+
+def make_submit(pool=None, api_client=None, ledger=None):
+    """
+    Build the scheduler's `submit` callable.
+
+    Reports go to the form's HTTP API first when `api_client` is given, and to the
+    PagePool otherwise (or when the API fails). A pool submission waits on the
+    calling worker thread until a page has handled it; the pool must be started with
+    `discard=discard_job` so the wait ends when no page is left.
+    """
+    def submit(station, result, key):
+        # SubmissionUnknown diteruskan ke dispatcher: laporan itu tidak dikirim lewat form
+        if api_client is not None and api_client.submit(result.parsed, station.wmo_id, station.observer):
+            if ledger is not None:
+                ledger.record(key, result.raw, 'api')
+            return True
+        if pool is None:
+            return False
+        done = Future()
+        pool.submit((station, result, key, done))
+        return done.result()
+    return submit
+
+
+def discard_job(job, error):
+    """PagePool discard callback: fail the Future of a job no page will handle."""
+    job[3].set_exception(error)
+
+
+def scheduled_submit(page, job, page_state, ledger=None):
+    """PagePool handler for the scheduler's (station, result, key, future) jobs."""
+    station, result, key, done = job
+    try:
+        ok = pooled_submit(page, (result, key), page_state, ledger, (station.wmo_id, station.observer))
+    except BaseException:
+        done.set_result(False)
+        raise  # PagePool mengganti halaman yang rusak
+    done.set_result(ok)
+    return ok
+
+
+def run_schedule(stations, cmss_url, pages=2, api_config=None, fast=False, cdp_url=None,
+                 ledger_path="./submissions.db", rejects_path="./rejects.jsonl", archive_path="./archive", trace=False,
+                 **scheduler_options):
+    """
+    Start the browser and keep `stations` current until interrupted.
+
+    The browser's login is shared by a pool of `pages` form pages (and by the HTTP
+    API client with `api_config`); all stations are served from one CMSS dump and every
+    new report is kept in the decoded archive at `archive_path` (None disables it).
+    The other options are those of metar.run_process.
+    """
+    from browsermanager import BrowserManager, PagePool
+    from getmetar import CMSSMetarFetcher
+    from metar_archive import MetarArchive
+    from metar_validation import RejectList
+    from submission_ledger import SubmissionLedger
+
+    if trace:
+        tracing.enable(jsonl_path="trace.jsonl")
+    url = "https://bmkgsatu.bmkg.go.id/meteorologi/metarspeci"
+    manager = BrowserManager(user_data_dir="./user_data", headless=None if fast else False, fast=fast,
+                             cdp_url=cdp_url, remote_debugging=True)
+    manager.start_browser(url, ready_selector="#vs2__combobox")
+    api_client = None
+    if api_config:
+        from metar_api import MetarApiClient, load_api_config
+        api_client = MetarApiClient.from_browser(manager, pool_size=max(4, pages), **load_api_config(api_config))
+    ledger = SubmissionLedger(ledger_path) if ledger_path else None
+    pool = PagePool(manager, url, pages)
+    pool.start(lambda page, job, page_state: scheduled_submit(page, job, page_state, ledger), discard=discard_job)
+
+    scheduler = MetarScheduler(CMSSMetarFetcher(cmss_url), stations, make_submit(pool, api_client, ledger),
+                               workers=pages, ledger=ledger, rejects=RejectList(rejects_path),
+                               archive=MetarArchive(archive_path) if archive_path else None, **scheduler_options)
+    start = time.perf_counter()
+    try:
+        asyncio.run(scheduler.run())
+    except KeyboardInterrupt:
+        logging.info("Scheduler stopped.")
+    finally:
+        logging.info(f"Page pool finished after {time.perf_counter() - start:.0f} s: {pool.join()}")
+        if api_client is not None:
+            api_client.close()
+        if ledger is not None:
+            ledger.close()
+        manager.stop_browser()
+        if trace:
+            tracing.log_summary()
+            tracing.write_prometheus("metar_trace.prom")
+            tracing.disable()
@@ -0,0 +1,216 @@
+import json
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+
+# Isian yang wajib ada agar fill_form/FormPlan bisa mengisi seluruh form
+REQUIRED_FIELDS = ('day', 'hour', 'minute', 'wind_direction', 'wind_speed', 'visibility', 'temperature',
+                   'dew_point', 'pressure', 'clouds', 'trend')
+
+# Opsi yang tersedia di form (#input-type dan baris tabel awan)
+FORM_TRENDS = {'NOSIG', 'TEMPO', 'BECMG'}
+FORM_CLOUD_AMOUNTS = {'FEW', 'SCT', 'BKN', 'OVC'}  # Kunci metar.CLOUD_OKTAS
+FORM_CLOUD_SUBTYPES = {None, 'CB', 'TCU'}
+
+# Batas nilai yang masuk akal (inklusif); di luar ini hampir pasti salah ketik atau salah parse
+LIMITS = {
+    'wind_speed': (0, 150),  # knot
+    'visibility': (0, 10000),  # meter
+    'temperature': (-60, 60),  # °C
+    'dew_point': (-80, 60),  # °C
+    'pressure': (850, 1090),  # hPa
+    'cloud_height': (0, 50000),  # feet
+}
+
+# Laporan boleh sedikit di depan jam server (jam lokal yang tidak sinkron)
+MAX_AHEAD = timedelta(minutes=15)
+
+
+class ValidationError(ValueError):
+    """A parsed report the form cannot take; `problems` lists every check that failed."""
+
+    def __init__(self, problems):
+        super().__init__('; '.join(problems))
+        self.problems = problems
+
+
+def _number(parsed, field, problems):
+    value = parsed.get(field)
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        problems.append(f"{field} {value!r} is not a number")
+        return None
+    low, high = LIMITS[field]
+    if not low <= number <= high:
+        problems.append(f"{field} {number} outside {low}..{high}")
+    return number
+
+
+def resolve_observation(day, hour=0, minute=0, now=None):
+    """
+    Return the UTC datetime of an observation that only carries its day of month.
+
+    A day up to today lies in the current month (UTC). Just before midnight UTC the
+    next day's 00Z report may already be there, up to MAX_AHEAD early. Any other day
+    belongs to the previous month, e.g. CMSS reports of the 31st read on the 1st.
+
+    Args:
+        day (int): Day of month of the report.
+        hour (int): Observation hour.
+        minute (int): Observation minute.
+        now (datetime): Current time (default: now); naive values are taken as UTC.
+
+    Returns:
+        datetime: Timezone-aware UTC observation time.
+
+    Raises:
+        ValueError: If the day does not exist in the month it resolves to.
+    """
+    now = now or datetime.now(timezone.utc)
+    now = now.replace(tzinfo=timezone.utc) if now.tzinfo is None else now.astimezone(timezone.utc)
+    latest = now + MAX_AHEAD
+    if day == latest.day and latest.date() != now.date():
+        base = latest  # Laporan 00Z hari berikutnya yang dibaca menjelang tengah malam UTC
+    elif day <= now.day:
+        base = now
+    else:
+        base = now.replace(day=1) - timedelta(days=1)  # Hari terakhir bulan lalu
+    return base.replace(day=day, hour=hour, minute=minute, second=0, microsecond=0)
+
+
+def observation_datetime(parsed, now):
+    """Return the observation time of a parsed report as a UTC datetime (see `resolve_observation`)."""
+    return resolve_observation(int(parsed['day']), int(parsed['hour']), int(parsed['minute']), now)
+
+
+def check_time(parsed, now, max_age=None, problems=None):
+    """
+    Check the observation time of a parsed report against `now` (UTC).
+
+    The day is resolved with `resolve_observation`, so reports of the previous month
+    pass; a time later today than `now` + MAX_AHEAD is in the future.
+
+    Returns:
+        list: The problems found (appended to `problems` if given).
+    """
+    problems = [] if problems is None else problems
+    try:
+        observed = observation_datetime(parsed, now)
+    except (KeyError, TypeError, ValueError) as e:
+        problems.append(f"invalid observation time: {e}")
+        return problems
+    if observed > now + MAX_AHEAD:
+        problems.append(f"observation time {observed:%d%H%M}Z is in the future")
+    elif max_age is not None and now - observed > max_age:
+        problems.append(f"observation time {observed:%d%H%M}Z is older than {max_age}")
+    return problems
+
+
+def validate(parsed, now=None, max_age=None):
+    """
+    Check one parsed report (the nosig_reader dict view) before it reaches the browser.
+
+    Checks that every field the form needs is present, that values are in range and
+    offered by the form, that the dew point does not exceed the temperature and that
+    the observation time can be entered.
+
+    Args:
+        parsed (dict): Parsed report from nosig_reader.
+        now (datetime): Current UTC time (default: now).
+        max_age (timedelta): Optional limit on how old the observation may be.
+
+    Returns:
+        list: Human-readable problems; empty when the report is valid.
+    """
+    missing = [field for field in REQUIRED_FIELDS if parsed.get(field) is None]
+    problems = [f"missing {', '.join(missing)}"] if missing else []
+
+    if parsed.get('wind_direction') not in (None, 'VRB'):
+        direction = parsed['wind_direction']
+        if not direction.isdigit() or int(direction) > 360 or int(direction) % 10:
+            problems.append(f"wind_direction {direction!r} is not 000-360 in steps of 10")
+    for field in ('wind_speed', 'visibility', 'pressure'):
+        if parsed.get(field) is not None:
+            _number(parsed, field, problems)
+    temperature = _number(parsed, 'temperature', problems) if parsed.get('temperature') is not None else None
+    dew_point = _number(parsed, 'dew_point', problems) if parsed.get('dew_point') is not None else None
+    if temperature is not None and dew_point is not None and dew_point > temperature:
+        problems.append(f"dew point {dew_point} above temperature {temperature}")
+
+    if parsed.get('trend') is not None and parsed['trend'] not in FORM_TRENDS:
+        problems.append(f"trend {parsed['trend']!r} not offered by the form")
+    if parsed.get('clouds'):  # Daftar kosong (NSC/NCD/CAVOK) memakai pilihan tanpa awan di form
+        cloud = parsed['clouds'][0]  # Hanya lapisan pertama yang diisi ke form
+        if cloud['cloud_type'] not in FORM_CLOUD_AMOUNTS:
+            problems.append(f"cloud amount {cloud['cloud_type']!r} not offered by the form")
+        if cloud['cloud_subtype'] not in FORM_CLOUD_SUBTYPES:
+            problems.append(f"cloud type {cloud['cloud_subtype']!r} not offered by the form")
+        _number(cloud, 'cloud_height', problems)
+
+    if not {'day', 'hour', 'minute'} & set(missing):
+        check_time(parsed, now or datetime.now(timezone.utc), max_age, problems)
+    return problems
+
+
+class RejectList:
+    """
+    Reports rejected before submission, kept in memory and optionally appended to a
+    JSON lines file so they can be corrected and resubmitted. Safe to use from the
+    parser thread while the main thread reads it.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.entries = []
+        self.lock = threading.Lock()
+
+    def add(self, result, problems):
+        entry = {'index': result.index, 'report': result.raw.strip(), 'problems': problems}
+        with self.lock:
+            self.entries.append(entry)
+            if self.path:
+                with open(self.path, 'a') as f:
+                    f.write(json.dumps(entry) + '\n')
+
+    def __len__(self):
+        with self.lock:
+            return len(self.entries)
+
+
+def validate_results(results, rejects=None, now=None, max_age=None):
+    """
+    Validation stage over a stream of ParseResults.
+
+    Valid results pass through unchanged. Results that failed to parse or fail
+    `validate` are added to `rejects` and passed on with the error set (a
+    ValidationError for failed checks), so the submission stages skip them before
+    any browser or network work.
+
+    Args:
+        results (iterable): ParseResults, e.g. from nosig_reader.parse_many.
+        rejects (RejectList): Optional list collecting the rejected reports.
+        now (datetime): Fixed UTC time to check against (default: the time of each check).
+        max_age (timedelta): Optional limit on how old an observation may be.
+
+    Yields:
+        ParseResult: One result per input result.
+    """
+    for result in results:
+        if result.error is not None:
+            problems = [f"parse error: {result.error}"]  # Dicatat oleh tahap submit
+        else:
+            problems = validate(result.parsed, now, max_age)
+            if problems:
+                logging.warning(f"Rejected METAR code '{result.raw.strip()}': {'; '.join(problems)}")
+                result = result._replace(error=ValidationError(problems))
+        if problems and rejects is not None:
+            rejects.add(result, problems)
+        yield result
+
+
+def validating_parser(parse_many, rejects=None, max_age=None):
+    """Wrap a batch parser (e.g. nosig_reader.parse_many) so its results go through `validate_results`."""
+    def parse_and_validate(reports):
+        return validate_results(parse_many(reports), rejects, max_age=max_age)
+    return parse_and_validate
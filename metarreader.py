@@ -1,19 +1,54 @@
-import re
+from metar_engine import parse_stream, scan
+from metar_records import format_time, format_two_digits
+
+
+WEATHER_CONDITIONS = {
+    "-": "light", "+": "heavy", "VC": "nearby", "MI": "shallow", "PR": "partial",
+    "BC": "patches", "DR": "low drifting", "BL": "blowing", "SH": "showers",
+    "TS": "thunderstorm", "FZ": "freezing", "DZ": "drizzle", "RA": "rain",
+    "SN": "snow", "SG": "snow grains", "IC": "ice crystals", "PE": "ice pellets",
+    "GR": "hail", "GS": "small hail", "BR": "mist", "FG": "fog", "FU": "smoke",
+    "VA": "volcanic ash", "DU": "dust", "SA": "sand", "HZ": "haze", "PO": "dust whirls",
+    "SQ": "squalls", "FC": "funnel cloud", "SS": "sandstorm", "DS": "dust storm"
+}
+
+CLOUD_COVERAGE = {
+    'FEW': 'few', 'SCT': 'scattered', 'BKN': 'broken', 'OVC': 'overcast', 'NSC': 'no significant clouds',
+    'VV': 'vertical visibility'
+}
 
 
 class MetarReader:
-    def __init__(self, metar_code):
+    def __init__(self, metar_code=''):
         self.metar_code = metar_code
         self.parsed_metar = {}
+        self.record = None
+
+    def reset(self, metar_code):
+        """Mengganti laporan yang dibaca agar satu instance bisa dipakai untuk banyak laporan"""
+        self.metar_code = metar_code
+        self.parsed_metar = {}
+        self.record = None
+        return self
 
     def read(self):
+        self.read_record()  # Satu kali tokenisasi untuk semua field
+        return self.view()
+
+    def read_record(self):
+        """Membaca laporan menjadi record ParsedMetar tanpa membuat dict"""
+        self.record = scan(self.metar_code)
+        return self.record
+
+    def view(self):
+        """Membuat dict berisi teks terformat dari record hasil parsing"""
         self.read_type()  # Mendeteksi METAR atau SPECI
         self.read_icao()
         self.read_time()
-        self.read_wind()
-        self.read_visibility()
+        self.parsed_metar['wind'] = self.read_wind()
+        self.parsed_metar['visibility'] = self.read_visibility()
         self.read_rvr()
-        self.read_weather()
+        self.parsed_metar['weather'] = self.read_weather()
         self.read_clouds()
         self.read_temperature_dew_point()
         self.read_pressure()
@@ -22,138 +57,94 @@ class MetarReader:
 
     def read_type(self):
         """Mendeteksi apakah laporan adalah METAR atau SPECI"""
-        if self.metar_code.startswith("METAR"):
-            self.parsed_metar['type'] = "METAR"
-        elif self.metar_code.startswith("SPECI"):
-            self.parsed_metar['type'] = "SPECI"
-        else:
-            self.parsed_metar['type'] = "UNKNOWN"
+        self.parsed_metar['type'] = self.record.report_type or "UNKNOWN"
 
     def read_icao(self):
-        self.parsed_metar['icao'] = self.metar_code.split()[1]
+        self.parsed_metar['icao'] = self.record.icao
 
     def read_time(self):
-        time_regex = r'(\d{2})(\d{2})(\d{2})Z'
-        time_match = re.search(time_regex, self.metar_code)
-        if time_match:
-            day, hour, minute = time_match.groups()
+        if self.record.day is not None:
             self.parsed_metar['time'] = {
-                'day': day,
-                'hour': hour,
-                'minute': minute
+                'day': f"{self.record.day:02d}",
+                'hour': f"{self.record.hour:02d}",
+                'minute': f"{self.record.minute:02d}"
             }
 
-    def read_wind(self, segment=None):
-        if segment is None:
-            segment = self.metar_code
-        wind_regex = r'(\d{3}|VRB)(\d{2,3})(G\d{2,3})?KT'
-        wind_match = re.search(wind_regex, segment)
-        if wind_match:
-            wind_dir, wind_speed, gust = wind_match.groups()
+    def read_wind(self, section=None):
+        if section is None:
+            section = self.record
+        wind = section.wind
+        if wind:
             return {
-                'direction': wind_dir,
-                'speed': wind_speed + ' KT',
-                'gust': gust[1:] + ' KT' if gust else None
+                'direction': wind.direction_text(),
+                'speed': wind.speed_text(),
+                'gust': wind.speed_text(wind.gust) if wind.gust else None
             }
         return None
 
-    def read_visibility(self, segment=None):
-        if segment is None:
-            segment = self.metar_code
-        vis_regex = r'(\d{4})'
-        vis_match = re.search(vis_regex, segment)
-        if vis_match:
-            return vis_match.group(1) + ' meters'
+    def read_visibility(self, section=None):
+        if section is None:
+            section = self.record
+        if section.visibility is not None:
+            return f"{section.visibility:04d} meters"
         return None
 
     def read_rvr(self):
-        rvr_regex = r'R(\d{2})([LRC]?)/(\d{4})([U|D|N]?)'
-        rvr_matches = re.findall(rvr_regex, self.metar_code)
-        if rvr_matches:
-            self.parsed_metar['rvr'] = [{'runway': rwy + (rwy_side if rwy_side else ''),
-                                         'range': range_ + ' meters',
-                                         'trend': trend if trend else None}
-                                        for rwy, rwy_side, range_, trend in rvr_matches]
-
-    def read_weather(self, segment=None):
-        if segment is None:
-            segment = self.metar_code
-        weather_conditions = {
-            "-": "light", "+": "heavy", "VC": "nearby", "MI": "shallow", "PR": "partial",
-            "BC": "patches", "DR": "low drifting", "BL": "blowing", "SH": "showers",
-            "TS": "thunderstorm", "FZ": "freezing", "DZ": "drizzle", "RA": "rain",
-            "SN": "snow", "SG": "snow grains", "IC": "ice crystals", "PE": "ice pellets",
-            "GR": "hail", "GS": "small hail", "BR": "mist", "FG": "fog", "FU": "smoke",
-            "VA": "volcanic ash", "DU": "dust", "SA": "sand", "HZ": "haze", "PO": "dust whirls",
-            "SQ": "squalls", "FC": "funnel cloud", "SS": "sandstorm", "DS": "dust storm"
-        }
-        wx_regex = r'(-|\+|VC)?(MI|PR|BC|DR|BL|SH|TS|FZ)?(DZ|RA|SN|SG|IC|PE|GR|GS|BR|FG|FU|VA|DU|SA|HZ|PO|SQ|FC|SS|DS)'
-        wx_matches = re.findall(wx_regex, segment)
-        if wx_matches:
-            return [' '.join([weather_conditions[part] for part in match if part])
-                    for match in wx_matches]
+        if self.record.rvr:
+            self.parsed_metar['rvr'] = [{'runway': rvr.runway,
+                                         'range': f"{rvr.range:04d} meters",
+                                         'trend': rvr.trend}
+                                        for rvr in self.record.rvr]
+
+    def read_weather(self, section=None):
+        if section is None:
+            section = self.record
+        if section.weather:
+            return [' '.join(WEATHER_CONDITIONS[part] for part in (intensity, descriptor, *phenomena) if part)
+                    for intensity, descriptor, phenomena in section.weather]
         return None
 
     def read_clouds(self):
-        cloud_coverage = {
-            'FEW': 'few', 'SCT': 'scattered', 'BKN': 'broken', 'OVC': 'overcast', 'NSC': 'no significant clouds',
-            'VV': 'vertical visibility'
-        }
-        cloud_regex = r'(FEW|SCT|BKN|OVC|NSC|VV)(\d{3})(CB|TCU)?'
-        cloud_matches = re.findall(cloud_regex, self.metar_code)
-        if cloud_matches:
-            self.parsed_metar['clouds'] = [{'coverage': cloud_coverage[coverage],
-                                            'height': int(height) * 100,
-                                            'type': cloud_type if cloud_type else None}
-                                           for coverage, height, cloud_type in cloud_matches]
+        if self.record.clouds:
+            self.parsed_metar['clouds'] = [{'coverage': CLOUD_COVERAGE[cloud.cover],
+                                            'height': cloud.height,
+                                            'type': cloud.cloud_type}
+                                           for cloud in self.record.clouds]
 
     def read_temperature_dew_point(self):
-        temp_dew_regex = r'M?(\d{2})/M?(\d{2})'
-        temp_dew_match = re.search(temp_dew_regex, self.metar_code)
-        if temp_dew_match:
-            temp, dew_point = temp_dew_match.groups()
-            self.parsed_metar['temperature'] = f"{'-' if 'M' in temp_dew_match.group(0) else ''}{temp}°C"
-            self.parsed_metar['dew_point'] = f"{'-' if 'M' in temp_dew_match.group(0) else ''}{dew_point}°C"
+        if self.record.temperature is not None:
+            self.parsed_metar['temperature'] = f"{format_two_digits(self.record.temperature)}°C"
+            if self.record.dew_point is not None:
+                self.parsed_metar['dew_point'] = f"{format_two_digits(self.record.dew_point)}°C"
 
     def read_pressure(self):
-        pressure_regex = r'Q(\d{4})'
-        pressure_match = re.search(pressure_regex, self.metar_code)
-        if pressure_match:
-            self.parsed_metar['pressure'] = pressure_match.group(1) + ' hPa'
+        if self.record.pressure is not None:
+            self.parsed_metar['pressure'] = f"{self.record.pressure:04d} hPa"
 
     def read_trends(self):
-        trend_regex = r'(TEMPO|BECMG|NOSIG|FM|TL)\s+([\dA-Z\s/]+)'
-        trend_matches = re.findall(trend_regex, self.metar_code)
-        if trend_matches:
+        if self.record.trends:
             trends = []
-            for trend, details in trend_matches:
-                trend_data = {'trend_type': trend}
+            for section in self.record.trends:
+                trend_data = {'trend_type': section.trend_type}
 
                 # Parse FM and TL times
-                fm_regex = r'FM(\d{2})(\d{2})'
-                tl_regex = r'TL(\d{2})(\d{2})'
-                fm_match = re.search(fm_regex, details)
-                tl_match = re.search(tl_regex, details)
-
-                if fm_match:
-                    fm_hour, fm_minute = fm_match.groups()
-                    trend_data['from'] = f"{fm_hour}:{fm_minute} UTC"
-                if tl_match:
-                    tl_hour, tl_minute = tl_match.groups()
-                    trend_data['till'] = f"{tl_hour}:{tl_minute} UTC"
+                if section.from_time:
+                    trend_data['from'] = format_time(*section.from_time)
+                if section.till_time:
+                    trend_data['till'] = format_time(*section.till_time)
 
                 # Parse visibility using the existing function
-                trend_visibility = self.read_visibility(details)
+                trend_visibility = self.read_visibility(section)
                 if trend_visibility:
                     trend_data['visibility'] = trend_visibility
 
                 # Parse wind using the existing function
-                trend_wind = self.read_wind(details)
+                trend_wind = self.read_wind(section)
                 if trend_wind:
                     trend_data['wind'] = trend_wind
 
                 # Parse weather using the existing function
-                trend_weather = self.read_weather(details)
+                trend_weather = self.read_weather(section)
                 if trend_weather:
                     trend_data['weather'] = trend_weather
 
@@ -162,11 +153,46 @@ class MetarReader:
             self.parsed_metar['trends'] = trends
 
 
-# Contoh penggunaan class
-metar_code = input("masukan input : ")
-parser = MetarReader(metar_code)
-parsed_metar = parser.read()
+def as_dict(record):
+    """Return the formatted dict view of an existing ParsedMetar record."""
+    reader = MetarReader()
+    reader.record = record
+    return reader.view()
+
+
+def parse_many(reports, records=False, cache=None):
+    """
+    Parse a batch of METAR/SPECI reports lazily with a single reader.
+
+    Args:
+        reports (iterable): Raw reports, one per item.
+        records (bool): Yield ParsedMetar records instead of dict views.
+        cache (ParseCache): Optional cache; reports seen before are not decoded again.
+
+    Yields:
+        ParseResult: One result per non-blank report; failures carry the exception in
+            `error` instead of raising.
+    """
+    reader = MetarReader()
+
+    def parse(metar_code):
+        if cache is None:
+            record = reader.reset(metar_code).read_record()
+        else:
+            reader.reset(metar_code).record = record = cache.parse(metar_code)
+        if record.day is None:
+            raise ValueError("No observation time group (ddhhmmZ) found")
+        return record if records else reader.view()
+
+    return parse_stream(reports, parse)
+
+
+if __name__ == "__main__":
+    # Contoh penggunaan class
+    metar_code = input("masukan input : ")
+    parser = MetarReader(metar_code)
+    parsed_metar = parser.read()
 
-# Cetak hasil parsing
-for key, value in parsed_metar.items():
-    print(f"{key}: {value}")
+    # Cetak hasil parsing
+    for key, value in parsed_metar.items():
+        print(f"{key}: {value}")
@@ -1,12 +1,32 @@
-import re
+from metar_engine import parse_stream, scan
+from metar_records import format_two_digits
+
 
 class MetarReader:
     """Parser for METAR data"""
-    def __init__(self, metar_code):
+    def __init__(self, metar_code=''):
         self.metar_code = metar_code
         self.parsed_metar = {}
+        self.record = None
+
+    def reset(self, metar_code):
+        """Point the reader at a new report so one instance can parse a whole batch."""
+        self.metar_code = metar_code
+        self.parsed_metar = {}
+        self.record = None
+        return self
 
     def parse(self):
+        self.parse_record()
+        return self.view()
+
+    def parse_record(self):
+        """Decode the report into a ParsedMetar record without building the dict view."""
+        self.record = scan(self.metar_code)
+        return self.record
+
+    def view(self):
+        """Build the string dict used by the form filler from the parsed record."""
         self.read_time()
         self.read_wind()
         self.read_visibility()
@@ -17,75 +37,90 @@ class MetarReader:
         return self.parsed_metar
 
     def read_time(self):
-        time_regex = r'(\d{2})(\d{2})(\d{2})Z'
-        time_match = re.search(time_regex, self.metar_code)
-        if time_match:
-            day, hour, minute = time_match.groups()
-            self.parsed_metar['day'] = day
-            self.parsed_metar['hour'] = hour
-            self.parsed_metar['minute'] = minute
+        if self.record.day is not None:
+            self.parsed_metar['day'] = f"{self.record.day:02d}"
+            self.parsed_metar['hour'] = f"{self.record.hour:02d}"
+            self.parsed_metar['minute'] = f"{self.record.minute:02d}"
 
     def read_wind(self):
-        wind_regex = r'(\d{3}|VRB)(\d{2,3})KT'
-        wind_match = re.search(wind_regex, self.metar_code)
-        if wind_match:
-            self.parsed_metar['wind_direction'] = wind_match.group(1)
-            self.parsed_metar['wind_speed'] = wind_match.group(2)
+        wind = self.record.wind
+        if wind:
+            self.parsed_metar['wind_direction'] = wind.direction_text()
+            self.parsed_metar['wind_speed'] = f"{wind.speed:02d}"
 
     def read_visibility(self):
-        # Regex pattern for visibility
-        visibility_regex = r'(\d{4})\s'
-
-        # Search for visibility value in METAR code
-        visibility_match = re.search(visibility_regex, self.metar_code)
-
-        if visibility_match:
-            # Extract the visibility value
-            visibility_value = visibility_match.group(1)
-
-            # Check if the visibility value is '9999' (representing 10000 meters)
-            if visibility_value == '9999':
-                visibility_value = '10000'
+        visibility_value = self.record.visibility
+        if visibility_value is not None:
+            # Check if the visibility value is 9999 (representing 10000 meters)
+            if visibility_value == 9999:
+                visibility_value = 10000
 
             # Store the parsed visibility value
-            self.parsed_metar['visibility'] = visibility_value
+            self.parsed_metar['visibility'] = f"{visibility_value:04d}"
 
     def read_temperature(self):
-        temp_regex = r'(\d{2})/(\d{2})'
-        temp_match = re.search(temp_regex, self.metar_code)
-        if temp_match:
-            self.parsed_metar['temperature'] = temp_match.group(1)
-            self.parsed_metar['dew_point'] = temp_match.group(2)
+        if self.record.temperature is not None:
+            self.parsed_metar['temperature'] = format_two_digits(self.record.temperature)
+            self.parsed_metar['dew_point'] = (format_two_digits(self.record.dew_point)
+                                              if self.record.dew_point is not None else None)
 
     def read_pressure(self):
-        pressure_regex = r'Q(\d{4})'
-        pressure_match = re.search(pressure_regex, self.metar_code)
-        if pressure_match:
-            self.parsed_metar['pressure'] = pressure_match.group(1)
+        if self.record.pressure is not None:
+            self.parsed_metar['pressure'] = f"{self.record.pressure:04d}"
 
     def read_trend(self):
-        trend_regex = r'(NOSIG|BECMG|TEMPO)'
-        trend_match = re.search(trend_regex, self.metar_code)
-        if trend_match:
-            self.parsed_metar['trend'] = trend_match.group(1)
+        if self.record.trends:
+            self.parsed_metar['trend'] = self.record.trends[0].trend_type
 
     def read_clouds(self):
-        # Extracting cloud type and cloud subtype, converting height into thousands of feet
-        cloud_regex = r'(FEW|SCT|BKN|OVC)(\d{3})(CB|TCU)?'
-        cloud_matches = re.findall(cloud_regex, self.metar_code)
-        if cloud_matches:
-            clouds = []
-            for cloud_type, cloud_height, cloud_subtype in cloud_matches:
-                # Convert cloud height to thousands of feet (e.g., 018 -> 1800 feet)
-                height_in_feet = int(cloud_height) * 100
-                clouds.append({
-                    'cloud_type': cloud_type,
-                    'cloud_height': height_in_feet,
-                    'cloud_subtype': cloud_subtype if cloud_subtype else None
-                })
+        # Cloud heights are already converted to feet by the engine (e.g., 018 -> 1800 feet)
+        clouds = [{
+            'cloud_type': cloud.cover,
+            'cloud_height': cloud.height,
+            'cloud_subtype': cloud.cloud_type
+        } for cloud in self.record.clouds if cloud.cover != 'VV' and cloud.height is not None]
+        if clouds:
             self.parsed_metar['clouds'] = clouds
+        elif self.record.cavok or self.record.sky_condition:
+            self.parsed_metar['clouds'] = []  # NSC/NCD/CAVOK: dilaporkan tanpa lapisan awan
+
+
+# Fungsi tambahan untuk memanggil MetarReader dari luar modul
+def read_metar_code(metar_code):
+    reader = MetarReader(metar_code)
+    return reader.parse()
+
+
+def as_dict(record):
+    """Return the form-filler dict view of an existing ParsedMetar record."""
+    reader = MetarReader()
+    reader.record = record
+    return reader.view()
+
+
+def parse_many(reports, records=False, cache=None):
+    """
+    Parse a batch of METAR codes lazily with a single reader.
+
+    Args:
+        reports (iterable): Raw METAR lines, e.g. from `metar.handle_user_input` or
+            `CMSSMetarFetcher.find_all_metar_today`.
+        records (bool): Yield ParsedMetar records instead of dict views.
+        cache (ParseCache): Optional cache; reports seen before are not decoded again.
+
+    Yields:
+        ParseResult: One result per non-blank report; failures carry the exception in
+            `error` instead of raising.
+    """
+    reader = MetarReader()
+
+    def parse(metar_code):
+        if cache is None:
+            record = reader.reset(metar_code).parse_record()
+        else:
+            reader.reset(metar_code).record = record = cache.parse(metar_code)
+        if record.day is None:
+            raise ValueError("No observation time group (ddhhmmZ) found")
+        return record if records else reader.view()
 
-    # Fungsi tambahan untuk memanggil MetarReader dari luar modul
-    def read_metar_code(metar_code):
-        reader = MetarReader(metar_code)
-        return reader.parse()
\ No newline at end of file
+    return parse_stream(reports, parse)
@@ -0,0 +1,139 @@
+import logging
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import nosig_reader
+
+DEFAULT_CHUNK_SIZE = 4 * 1024 * 1024  # bytes per chunk when splitting archive files
+DEFAULT_CHUNK_REPORTS = 2000  # reports per chunk when splitting in-memory text
+
+
+def find_chunks(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Split a report archive or CMSS dump into byte ranges that end on a report boundary.
+
+    Each range ends just after a '=' terminator, so no report is cut in half. Only a
+    small window around each cut point is read, not the whole file.
+
+    Args:
+        path (str): Path to the archive file.
+        chunk_size (int): Approximate size of each chunk in bytes.
+
+    Returns:
+        list: (start, end) byte offsets covering the whole file.
+    """
+    file_size = os.path.getsize(path)
+    chunks = []
+    start = 0
+    with open(path, 'rb') as f:
+        while start < file_size:
+            end = start + chunk_size
+            if end >= file_size:
+                chunks.append((start, file_size))
+                break
+            f.seek(end)
+            # Maju sampai terminator '=' berikutnya
+            while True:
+                block = f.read(64 * 1024)
+                if not block:
+                    end = file_size
+                    break
+                position = block.find(b'=')
+                if position >= 0:
+                    end += position + 1
+                    break
+                end += len(block)
+            chunks.append((start, end))
+            start = end
+    return chunks
+
+
+def split_reports(text):
+    """Split raw text into reports on the '=' terminator, dropping blank pieces."""
+    return [report.strip() + '=' for report in text.split('=') if report.strip()]
+
+
+def _decode_reports(parse_many, reports):
+    results = list(parse_many(reports))
+    return len(reports), results
+
+
+def _decode_file_chunk(parse_many, path, start, end):
+    with open(path, 'rb') as f:
+        f.seek(start)
+        text = f.read(end - start).decode('utf-8', errors='replace')
+    return _decode_reports(parse_many, split_reports(text))
+
+
+def _ordered(executor, func, jobs, window):
+    """Run jobs on the executor with at most `window` in flight, yielding results in job order."""
+    pending = deque()
+    for job in jobs:
+        pending.append(executor.submit(func, *job))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def _merge(chunk_results, on_error):
+    offset = 0
+    for count, results in chunk_results:
+        for result in results:
+            result = result._replace(index=result.index + offset)
+            if result.error is None:
+                yield result.parsed
+            elif on_error is not None:
+                on_error(result)
+            else:
+                logging.error(f"Failed to decode report #{result.index} '{result.raw}': {result.error}")
+        offset += count
+
+
+def decode_file(path, parse_many=nosig_reader.parse_many, workers=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                on_error=None):
+    """
+    Decode a large archive file or CMSS dump on a process pool.
+
+    Chunks are read by the workers themselves, so only byte offsets cross process
+    boundaries on the way in. Results come back in file order.
+
+    Args:
+        path (str): Path to the archive file.
+        parse_many (callable): Batch parser, e.g. `nosig_reader.parse_many` or
+            `metarreader.parse_many`. Must be a module-level function.
+        workers (int): Number of worker processes (default: os.cpu_count()).
+        chunk_size (int): Approximate chunk size in bytes.
+        on_error (callable): Side channel for failed reports; receives the ParseResult
+            with `index` counted from the start of the file. Failures are logged if None.
+
+    Yields:
+        dict: Parsed reports in file order.
+    """
+    workers = workers or os.cpu_count()
+    jobs = ((parse_many, path, start, end) for start, end in find_chunks(path, chunk_size))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from _merge(_ordered(executor, _decode_file_chunk, jobs, workers * 2), on_error)
+
+
+def decode_text(text, parse_many=nosig_reader.parse_many, workers=None, chunk_reports=DEFAULT_CHUNK_REPORTS,
+                on_error=None):
+    """
+    Decode an in-memory CMSS dump (e.g. `CMSSMetarFetcher.data`) on a process pool.
+
+    Args:
+        text (str): Raw dump text.
+        parse_many (callable): Batch parser, as in `decode_file`.
+        workers (int): Number of worker processes (default: os.cpu_count()).
+        chunk_reports (int): Reports per chunk.
+        on_error (callable): Side channel for failed reports, as in `decode_file`.
+
+    Yields:
+        dict: Parsed reports in text order.
+    """
+    workers = workers or os.cpu_count()
+    reports = split_reports(text)
+    jobs = ((parse_many, reports[i:i + chunk_reports]) for i in range(0, len(reports), chunk_reports))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from _merge(_ordered(executor, _decode_reports, jobs, workers * 2), on_error)
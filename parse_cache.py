@@ -0,0 +1,144 @@
+import logging
+import os
+import pickle
+import threading
+from collections import OrderedDict
+
+from metar_engine import scan
+
+# Perkiraan ukuran satu record ParsedMetar di memori (lihat benchmarks/bench_engine.py)
+ENTRY_OVERHEAD = 800
+
+
+def normalize_report(metar_code):
+    """
+    Normalize report text into a cache key.
+
+    Whitespace is collapsed, the '=' terminator dropped and any CMSS bulletin header in
+    front of the METAR/SPECI keyword removed, so re-sent and re-polled copies of the
+    same report share one key.
+    """
+    groups = metar_code.replace('=', ' ').split()
+    for i, group in enumerate(groups):
+        if group == 'METAR' or group == 'SPECI':
+            groups = groups[i:]
+            break
+    return ' '.join(groups)
+
+
+class ParseCache:
+    """
+    Bounded LRU cache of decoded reports keyed on normalized report text.
+
+    Cached ParsedMetar records are shared between callers and must be treated as
+    read-only; use the readers' `as_dict()` to get a fresh, mutable dict view.
+    """
+
+    def __init__(self, parse=scan, max_entries=10000, max_bytes=None, path=None):
+        """
+        Args:
+            parse (callable): Decoder for a normalized report (default: `metar_engine.scan`).
+            max_entries (int): Maximum number of cached reports, or None for no limit.
+            max_bytes (int): Maximum estimated memory use in bytes, or None for no limit.
+            path (str): Optional pickle file; loaded now if it exists and written by `save()`.
+        """
+        self.parse_func = parse
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.path = path
+        self.entries = OrderedDict()
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+        if path and os.path.exists(path):
+            self.load()
+
+    def __len__(self):
+        return len(self.entries)
+
+    @staticmethod
+    def _entry_size(key):
+        return len(key) + ENTRY_OVERHEAD
+
+    def _evict(self):
+        while self.entries and (
+                (self.max_entries is not None and len(self.entries) > self.max_entries)
+                or (self.max_bytes is not None and self.size_bytes > self.max_bytes)):
+            key, _ = self.entries.popitem(last=False)
+            self.size_bytes -= self._entry_size(key)
+            self.evictions += 1
+
+    def parse(self, metar_code):
+        """Return the decoded record for a report, decoding it only on a cache miss."""
+        key = normalize_report(metar_code)
+        with self.lock:
+            record = self.entries.get(key)
+            if record is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return record
+            self.misses += 1
+
+        record = self.parse_func(key)
+        with self.lock:
+            if key not in self.entries:
+                self.entries[key] = record
+                self.size_bytes += self._entry_size(key)
+                self._evict()
+        return record
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size_bytes = 0
+
+    def stats(self):
+        """Return hit/miss/eviction counters and the current size."""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self.entries),
+            'bytes': self.size_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+    def save(self, path=None):
+        """Write the cache to disk (atomically) so a restarted process starts warm."""
+        path = path or self.path
+        if not path:
+            raise ValueError("No cache file path configured")
+        with self.lock:
+            items = list(self.entries.items())
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'wb') as f:
+            pickle.dump(items, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, path)
+        logging.info(f"Parse cache saved: {len(items)} entries to {path}")
+
+    def load(self, path=None):
+        """Load entries saved by `save()`, most recently used last, respecting the limits."""
+        path = path or self.path
+        try:
+            with open(path, 'rb') as f:
+                items = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError) as e:
+            logging.error(f"Failed to load parse cache from {path}: {e}")
+            return
+        # Record dari versi lama tanpa field baru (mis. sky_condition) dibuang, diparse ulang saat dipakai
+        stale = [key for key, record in items if not all(hasattr(record, name) for name in record._fields)]
+        if stale:
+            stale = set(stale)
+            items = [(key, record) for key, record in items if key not in stale]
+            logging.info(f"Parse cache: dropped {len(stale)} entries of an older record layout")
+        with self.lock:
+            for key, record in items:
+                if key not in self.entries:
+                    self.size_bytes += self._entry_size(key)
+                self.entries[key] = record
+                self.entries.move_to_end(key)
+            self._evict()
+        logging.info(f"Parse cache loaded: {len(self.entries)} entries from {path}")
@@ -0,0 +1,134 @@
+import hashlib
+import logging
+import sqlite3
+import threading
+from collections import namedtuple
+from datetime import datetime, timezone
+
+from metar_engine import scan
+from metar_validation import resolve_observation
+from parse_cache import normalize_report
+
+# Kunci satu laporan di ledger; laporan koreksi punya teks (dan hash) berbeda. Bulan
+# pengamatan (YYYY-MM) ikut dalam kunci: teks yang sama pada ddhhmm yang sama bulan
+# depan adalah laporan lain
+LedgerKey = namedtuple('LedgerKey', ['station', 'month', 'metar_time', 'report_type', 'content_hash'])
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS submissions (
+    station TEXT NOT NULL,
+    month TEXT NOT NULL,
+    metar_time TEXT NOT NULL,
+    report_type TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    report TEXT NOT NULL,
+    backend TEXT NOT NULL,
+    submitted_at TEXT NOT NULL,
+    PRIMARY KEY (station, month, metar_time, report_type, content_hash)
+) WITHOUT ROWID
+"""
+
+
+def report_key(metar_code, now=None):
+    """
+    Build the ledger key of a raw report.
+
+    The hash is taken over the normalized text (see parse_cache.normalize_report), so
+    re-pasted copies with other whitespace or a CMSS header still match. The month is
+    the observation's, resolved against `now` (UTC, default: now) with
+    metar_validation.resolve_observation.
+    """
+    normalized = normalize_report(metar_code)
+    record = scan(normalized)
+    if record.day is None:
+        raise ValueError("No observation time group (ddhhmmZ) found")
+    observed = resolve_observation(record.day, record.hour, record.minute, now)
+    metar_time = f"{record.day:02d}{record.hour:02d}{record.minute:02d}"
+    content_hash = hashlib.sha1(normalized.encode()).hexdigest()
+    return LedgerKey(record.icao or '', f"{observed:%Y-%m}", metar_time, record.report_type or 'METAR',
+                     content_hash)
+
+
+def _migrate(conn):
+    """
+    Move a ledger written before the month was part of the key to the current schema.
+
+    The month of an old entry is resolved against its `submitted_at`, the same way
+    report_key resolves it at submission time.
+    """
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(submissions)")]
+    if not columns or 'month' in columns:
+        return
+    rows = conn.execute("SELECT station, metar_time, report_type, content_hash, report, backend, submitted_at "
+                        "FROM submissions").fetchall()
+    migrated = []
+    for station, metar_time, report_type, content_hash, report, backend, submitted_at in rows:
+        try:
+            observed = resolve_observation(int(metar_time[:2]), int(metar_time[2:4]), int(metar_time[4:]),
+                                           datetime.fromisoformat(submitted_at))
+        except ValueError:
+            continue  # Tanggal tidak valid: tidak bisa dicocokkan lagi
+        migrated.append((station, f"{observed:%Y-%m}", metar_time, report_type, content_hash, report, backend,
+                         submitted_at))
+    conn.execute("DROP TABLE submissions")
+    conn.execute(SCHEMA)
+    conn.executemany("INSERT OR IGNORE INTO submissions VALUES (?, ?, ?, ?, ?, ?, ?, ?)", migrated)
+    logging.info(f"Submission ledger: added the observation month to {len(migrated)} of {len(rows)} entries")
+
+
+class SubmissionLedger:
+    """
+    SQLite record of the reports that were submitted successfully.
+
+    The submission path checks `contains()` before any browser or HTTP work, so
+    re-pasted reports and re-runs after a crash skip everything already entered.
+    """
+
+    def __init__(self, path="submissions.db"):
+        """
+        Args:
+            path (str): SQLite database file (created if missing).
+        """
+        self.path = path
+        self.lock = threading.Lock()  # Dipakai juga dari thread PagePool
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        with self.conn:
+            _migrate(self.conn)
+            self.conn.execute(SCHEMA)
+        self.stats = {'hits': 0, 'recorded': 0}
+
+    def __len__(self):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM submissions").fetchone()[0]
+
+    def contains(self, key):
+        """True if the report with this key was already submitted (one primary-key lookup)."""
+        with self.lock:
+            found = self.conn.execute(
+                "SELECT 1 FROM submissions WHERE station = ? AND month = ? AND metar_time = ? "
+                "AND report_type = ? AND content_hash = ?", key).fetchone() is not None
+        if found:
+            self.stats['hits'] += 1
+        return found
+
+    def record(self, key, report, backend):
+        """Mark a report as submitted; committed before returning."""
+        submitted_at = datetime.now(timezone.utc).isoformat(timespec='seconds')
+        with self.lock, self.conn:
+            self.conn.execute("INSERT OR IGNORE INTO submissions VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                              (*key, report.strip(), backend, submitted_at))
+        self.stats['recorded'] += 1
+
+    def submitted_for(self, station, month, day):
+        """Return the ddhhmm times already submitted for a station on day `day` ('dd') of `month` ('YYYY-MM')."""
+        with self.lock:
+            rows = self.conn.execute("SELECT DISTINCT metar_time FROM submissions WHERE station = ? AND month = ? "
+                                     "AND metar_time LIKE ? ORDER BY metar_time", (station, month, f"{day}%"))
+            return [row[0] for row in rows]
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+        logging.info(f"Submission ledger closed: {self.stats}")
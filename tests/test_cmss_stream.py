@@ -0,0 +1,23 @@
+from cmss_stream import bulletin_header, iter_report_views, iter_reports, open_archive
+
+DUMP = b"SAID35 WADS 160000\nMETAR WADS 160000Z 09005KT 9999 FEW020 30/24 Q1010 NOSIG=\n\n  METAR WADS 160030Z=\n"
+
+
+def test_views_kept_past_the_context(tmp_path):
+    path = tmp_path / "dump.txt"
+    path.write_bytes(DUMP)
+    with open_archive(str(path)) as buffer:
+        views = list(iter_report_views(buffer))  # Tidak lagi BufferError saat konteks ditutup
+    assert [bytes(view) for view in views] == [DUMP[:DUMP.index(b'=') + 1], b"METAR WADS 160030Z="]
+    assert bulletin_header(views[0]) == ('SAID35', 'WADS', '160000')
+    views[0].release()
+    views[1].release()
+
+
+def test_iter_reports_and_empty_file(tmp_path):
+    path = tmp_path / "dump.txt"
+    path.write_bytes(DUMP)
+    assert list(iter_reports(str(path)))[1] == "METAR WADS 160030Z="
+    empty = tmp_path / "empty.txt"
+    empty.write_bytes(b"")
+    assert list(iter_reports(str(empty))) == []
@@ -0,0 +1,37 @@
+import numpy as np
+
+from metar_columns import decode_columns
+from metar_engine import scan
+
+REPORTS = [
+    "METAR WADS 160000Z 09005KT 9999 FEW020 30/24 Q1010 NOSIG=",
+    # Grup berulang: kolom harus memakai grup yang sama dengan scan (yang pertama)
+    "METAR WADS 160030Z 09005KT 18010G20KT 9999 3000 SCT018CB 31/25 29/23 Q1009 Q1011 TEMPO TSRA=",
+    "SPECI WADS 160045Z VRB03MPS CAVOK M01/M03 Q1012=",
+]
+
+
+def test_columns_agree_with_scan():
+    columns = decode_columns(REPORTS)
+    assert not columns.errors
+    for row, report in enumerate(REPORTS):
+        record = scan(report)
+        assert columns.station[row] == record.icao
+        assert columns.report_type[row] == record.report_type
+        assert (columns.day[row], columns.hour[row], columns.minute[row]) == (record.day, record.hour, record.minute)
+        assert columns.temperature[row] == record.temperature
+        assert columns.dew_point[row] == record.dew_point
+        assert columns.pressure[row] == record.pressure
+        assert columns.visibility[row] == record.visibility
+        assert columns.cavok[row] == record.cavok
+        assert columns.wind_variable[row] == record.wind.is_variable
+        covers, heights, _ = columns.clouds(row)
+        assert list(covers) == [cloud.cover for cloud in record.clouds]
+        assert list(heights) == [cloud.height for cloud in record.clouds]
+    assert columns.wind_direction[1] == 90 and np.isnan(columns.wind_gust[1])
+    assert columns.trend[1] == 'TEMPO'
+
+
+def test_report_without_time_is_an_error():
+    columns = decode_columns(["METAR WADS 09005KT 9999 FEW020 30/24 Q1010="])
+    assert len(columns) == 0 and len(columns.errors) == 1
@@ -0,0 +1,65 @@
+import pytest
+
+import metar
+from nosig_reader import parse_many
+
+
+class FakePage:
+    """Stands in for a Playwright page: every locator call succeeds; reloads are counted."""
+
+    def __init__(self):
+        self.reloads = 0
+
+    def reload(self):
+        self.reloads += 1
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self
+
+
+@pytest.fixture
+def plan(monkeypatch):
+    calls = []
+    monkeypatch.setattr(metar, 'select_station_and_observer', lambda page, *header: calls.append(('header',)))
+    monkeypatch.setattr(metar, 'select_date', lambda page, day: calls.append(('date', day)))
+    monkeypatch.setattr(metar, 'select_clouds', lambda page, clouds: calls.append(('clouds', metar.cloud_key(clouds))))
+    monkeypatch.setattr(metar, 'submit_form', lambda page: True)
+    monkeypatch.setattr(metar.FormPlan, '_resolve', lambda self: setattr(self, 'ids', {}))
+    monkeypatch.setattr(metar.FormPlan, '_apply', lambda self, fields, user_input: [])
+    form_plan = metar.FormPlan(FakePage())
+    form_plan.calls = calls
+    return form_plan
+
+
+def fill(plan, report):
+    plan.calls.clear()
+    assert plan.fill(next(parse_many([report])).parsed)
+    return plan.calls
+
+
+def test_unchanged_pickers_are_not_touched(plan):
+    first = fill(plan, "METAR WADS 160000Z 09005KT 9999 FEW020 30/24 Q1010 NOSIG=")
+    assert first == [('header',), ('date', '16'), ('clouds', ('FEW', 2000, None))]
+    assert fill(plan, "METAR WADS 160030Z 10006KT 9999 FEW020 31/24 Q1009 NOSIG=") == []
+    assert plan.page.reloads == 0
+
+
+def test_other_cloud_layer_reloads_the_page(plan):
+    fill(plan, "METAR WADS 160000Z 09005KT 9999 FEW020 30/24 Q1010 NOSIG=")
+    # Baris awan lama tidak bisa dihapus: halaman dimuat ulang sebelum lapisan baru dipilih
+    calls = fill(plan, "METAR WADS 160030Z 09005KT 9999 SCT018 30/24 Q1010 NOSIG=")
+    assert plan.page.reloads == 1
+    assert calls == [('header',), ('date', '16'), ('clouds', ('SCT', 1800, None))]
+
+
+def test_no_cloud_after_cloud_reloads_but_cloud_after_no_cloud_does_not(plan):
+    fill(plan, "METAR WADS 160000Z 09005KT 9999 FEW020 30/24 Q1010 NOSIG=")
+    assert fill(plan, "METAR WADS 160030Z 09005KT 9999 NSC 30/24 Q1010 NOSIG=")[-1] == ('clouds', '')
+    assert plan.page.reloads == 1
+    assert fill(plan, "METAR WADS 160100Z 09005KT 9999 FEW020 30/24 Q1010 NOSIG=") == [('clouds', ('FEW', 2000, None))]
+    assert plan.page.reloads == 1
+
+
+def test_new_day_selects_date_again(plan):
+    fill(plan, "METAR WADS 152330Z 09005KT 9999 FEW020 30/24 Q1010 NOSIG=")
+    assert fill(plan, "METAR WADS 160000Z 09005KT 9999 FEW020 30/24 Q1010 NOSIG=") == [('date', '16')]
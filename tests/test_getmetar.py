@@ -0,0 +1,97 @@
+import contextlib
+import io
+import random
+import threading
+from datetime import datetime, timezone
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+from benchmarks.bench_fetch import DumpState, make_handler
+from benchmarks.corpus import STATIONS, generate_report
+import getmetar
+from getmetar import CMSSMetarFetcher
+
+
+def dump_of_day(day, seed):
+    rng = random.Random(seed)
+    return '\n\n'.join(f"{header} {icao} {day:02d}{slot // 2:02d}{slot % 2 * 30:02d}\n"
+                       + generate_report(rng, icao, day, slot // 2, slot % 2 * 30)
+                       for slot in range(48) for icao, header in STATIONS)
+
+
+@contextlib.contextmanager
+def stand_in(state):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), make_handler(state))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        yield f"http://127.0.0.1:{server.server_port}/cgi-bin/extract_cmss.pl"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def keys(fetcher):
+    return [bulletin[:3] for bulletin in fetcher.bulletins]
+
+
+def expected_keys(text):
+    fetcher = CMSSMetarFetcher(None)
+    fetcher.data = text.strip()
+    fetcher.build_index()
+    return keys(fetcher)
+
+
+@pytest.mark.parametrize('support_if_range', [True, False])
+def test_incremental_fetch_after_content_rollover(support_if_range):
+    # Isi baru minimal sepanjang isi lama, jadi Range pada offset lama tetap dijawab 206
+    day15, day16 = dump_of_day(15, seed=1), dump_of_day(16, seed=2) + '\n\n' + dump_of_day(17, seed=3)
+    assert len(day16) >= len(day15)
+    state = DumpState(day15, [], support_if_range=support_if_range)
+    with stand_in(state) as url, contextlib.redirect_stdout(io.StringIO()):
+        fetcher = CMSSMetarFetcher(url)
+        fetcher.fetch_data()
+        state.replace(day16)  # CGI membuat ulang isinya untuk hari berikutnya
+        fetcher.fetch_incremental()
+
+    assert keys(fetcher) == expected_keys(day16)
+    assert ('SAID35', 'WADS', '160000') in fetcher.index
+    assert ('SAID35', 'WADS', '150000') not in fetcher.index
+
+
+@pytest.mark.parametrize('support_if_range', [True, False])
+def test_incremental_fetch_appends_growth(support_if_range):
+    bulletins = dump_of_day(15, seed=1).split('\n\n')
+    state = DumpState('\n\n'.join(bulletins[:-10]), bulletins[-10:], support_if_range=support_if_range)
+    with stand_in(state) as url, contextlib.redirect_stdout(io.StringIO()):
+        fetcher = CMSSMetarFetcher(url)
+        fetcher.fetch_data()
+        state.grow(10)
+        assert fetcher.fetch_incremental() == 10
+        assert fetcher.fetch_incremental() == 0
+
+    assert keys(fetcher) == expected_keys(state.body.decode())
+    if not support_if_range:
+        assert fetcher.fetch_stats['partial'] == 1
+
+
+class FixedClock(datetime):
+    @classmethod
+    def now(cls, tz=None):
+        return datetime(2026, 11, 1, 1, 0, tzinfo=timezone.utc)
+
+
+def test_month_end_dump_is_ordered_by_observation(monkeypatch):
+    monkeypatch.setattr(getmetar, 'datetime', FixedClock)
+    rng = random.Random(4)
+    times = [(30, 23, 30), (31, 0, 0), (31, 23, 30), (1, 0, 0), (1, 0, 30)]
+    fetcher = CMSSMetarFetcher(None)
+    fetcher.data = '\n\n'.join(f"SAID35 WADS {day:02d}{hour:02d}{minute:02d}\n"
+                               + generate_report(rng, 'WADS', day, hour, minute) for day, hour, minute in times)
+    with contextlib.redirect_stdout(io.StringIO()):
+        latest = fetcher.find_latest(2)
+        station = fetcher.find_station()
+        around_midnight = fetcher.find_metar_range('312300', '010000')
+    assert [text.split('\n')[0][-6:] for text in latest] == ['010030', '010000']
+    assert [text.split('\n')[0][-6:] for text in station] == ['302330', '310000', '312330', '010000', '010030']
+    assert [text.split('\n')[0][-6:] for text in around_midnight] == ['312330', '010000']
@@ -0,0 +1,89 @@
+import json
+import threading
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from metar_api import MetarApiClient, SubmissionUnknown, build_payload, observation_date
+from nosig_reader import parse_many
+
+FIELD_MAP = {'hour': 'hour', 'minute': 'minute', 'air_temperature': 'temperature'}
+
+
+def utc(*args):
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+@pytest.mark.parametrize('now, day, expected', [
+    (utc(2026, 8, 31, 23, 50), '31', '2026-08-31'),
+    (utc(2026, 8, 31, 23, 50), '16', '2026-08-16'),
+    (utc(2026, 8, 31, 23, 50), '01', '2026-09-01'),  # 00Z besok, dalam MAX_AHEAD
+    (utc(2026, 10, 31, 23, 50), '31', '2026-10-31'),
+    (utc(2026, 11, 1, 0, 5), '31', '2026-10-31'),  # Laporan bulan lalu
+    (utc(2026, 3, 1, 6, 0), '28', '2026-02-28'),
+])
+def test_observation_date(now, day, expected):
+    assert observation_date(day, now) == expected
+
+
+def test_observation_date_rejects_day_missing_from_previous_month():
+    with pytest.raises(ValueError):
+        observation_date('31', utc(2026, 10, 1, 6, 0))
+
+
+def stand_in(status, body):
+    class Handler(BaseHTTPRequestHandler):
+        posts = []
+
+        def do_POST(self):
+            Handler.posts.append(json.loads(self.rfile.read(int(self.headers['Content-Length']))))
+            data = body.encode()
+            self.send_response(status)
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, Handler.posts
+
+
+def submit_with_reply(status, body):
+    server, posts = stand_in(status, body)
+    client = MetarApiClient(f"http://127.0.0.1:{server.server_port}/metarspeci", FIELD_MAP, station_id='97260',
+                            observer='Pengamat', record_id='data.id', retries=0)
+    parsed = next(parse_many(["METAR WADS 160000Z 09005KT 9999 FEW020 30/24 Q1010 NOSIG="])).parsed
+    try:
+        return client, client.submit(parsed), posts
+    finally:
+        client.close()
+        server.shutdown()
+        server.server_close()
+
+
+def test_submit_confirmed_by_record_id():
+    client, ok, posts = submit_with_reply(201, '{"data": {"id": 7}}')
+    assert ok and client.last_record == 7 and len(posts) == 1
+    assert posts[0]['air_temperature'] == '30'
+
+
+@pytest.mark.parametrize('body', ['{"status": "ok"}', 'OK'])
+def test_accepted_reply_without_record_id_is_unknown(body):
+    # Jangan jatuh ke form browser: server mungkin sudah menyimpan laporan
+    with pytest.raises(SubmissionUnknown):
+        submit_with_reply(200, body)
+
+
+def test_error_reply_allows_fallback():
+    _, ok, _ = submit_with_reply(500, '{"message": "error"}')
+    assert ok is False
+
+
+def test_payload_without_clouds():
+    parsed = next(parse_many(["METAR WADS 160000Z 09005KT CAVOK 30/24 Q1010 NOSIG="])).parsed
+    payload = build_payload(parsed, '97260', 'Pengamat', FIELD_MAP, utc(2026, 10, 16, 1, 0))
+    assert payload['observation_date'] == '2026-10-16' and payload['clouds'] == []
@@ -0,0 +1,59 @@
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from metar_archive import MetarArchive
+
+NOW = datetime(2026, 10, 16, 12, 0, tzinfo=timezone.utc)
+
+
+def report(day, hour, minute=0, gust=''):
+    wind = '09015G25KT' if gust else '09005KT'
+    return f"METAR WADS {day:02d}{hour:02d}{minute:02d}Z {wind} 9999 FEW020 30/24 Q1010 NOSIG="
+
+
+def observed(result):
+    return [str(value) for value in result['observed']]
+
+
+def test_query_is_sorted_across_blocks(tmp_path):
+    archive = MetarArchive(str(tmp_path))
+    archive.append([report(15, 0), report(16, 0)], now=NOW)
+    archive.flush()
+    archive.append([report(14, 0), report(1, 0), report(16, 6)], now=NOW)  # Laporan susulan di blok kedua
+    archive.flush()
+    result = archive.query('WADS', datetime(2026, 10, 1), datetime(2026, 11, 1))
+    assert observed(result) == ['2026-10-01T00:00', '2026-10-14T00:00', '2026-10-15T00:00', '2026-10-16T00:00',
+                                '2026-10-16T06:00']
+
+
+def test_duplicates_are_dropped(tmp_path):
+    archive = MetarArchive(str(tmp_path))
+    assert archive.append([report(16, 0), report(16, 0).replace(' ', '  ')], now=NOW) == 1
+    archive.flush()
+    assert archive.append(["SAID35 WADS 160000\n" + report(16, 0), report(16, 1)], now=NOW) == 1
+    archive.close()
+    assert archive.stats['duplicates'] == 2
+    assert len(MetarArchive(str(tmp_path)).query('WADS', NOW - timedelta(days=1), NOW)) == 2
+
+
+def test_reports_of_last_month_and_filters(tmp_path):
+    archive = MetarArchive(str(tmp_path))
+    archive.append([report(30, 23), report(16, 0, gust=True), report(16, 1)], now=NOW)
+    archive.close()
+    september = archive.query('WADS', datetime(2026, 9, 1), datetime(2026, 10, 1))
+    assert observed(september) == ['2026-09-30T23:00']
+    gusts = archive.query('WADS', datetime(2026, 9, 1), datetime(2026, 11, 1), where={'wind_gust': (0, None)},
+                          raw=True)
+    assert observed(gusts) == ['2026-10-16T00:00'] and gusts['raw'][0].startswith('METAR WADS 160000Z')
+
+
+def test_query_converts_offsets_to_utc(tmp_path):
+    archive = MetarArchive(str(tmp_path))
+    archive.append([report(16, 0), report(16, 8)], now=NOW)
+    archive.close()
+    wita = timezone(timedelta(hours=8))
+    # 08:00-09:00 WITA adalah 00:00-01:00 UTC
+    result = archive.query('WADS', datetime(2026, 10, 16, 8, 0, tzinfo=wita), datetime(2026, 10, 16, 9, 0, tzinfo=wita))
+    assert observed(result) == ['2026-10-16T00:00']
+    assert result['temperature'].dtype == np.float32
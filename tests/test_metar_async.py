@@ -0,0 +1,94 @@
+import asyncio
+
+import metar_async
+from nosig_reader import parse_many
+
+REPORT = "METAR WADS 160000Z 09005KT 9999 FEW020 30/24 Q1010 NOSIG="
+
+
+class BrokenPage:
+    """Page whose form cannot be filled and whose reload and close fail."""
+
+    def __init__(self):
+        self.closed = False
+
+    async def reload(self):
+        raise RuntimeError("page crashed")
+
+    async def close(self):
+        self.closed = True
+        raise RuntimeError("target closed")
+
+
+class FlakyManager:
+    def __init__(self, failures):
+        self.failures = failures
+        self.pages = []
+        self.calls = 0
+
+    async def new_page(self, url):
+        self.calls += 1
+        if self.calls > 1 and self.failures:
+            self.failures -= 1
+            raise RuntimeError("browser busy")
+        page = BrokenPage()
+        self.pages.append(page)
+        return page
+
+
+def test_page_worker_survives_failed_recovery(monkeypatch):
+    monkeypatch.setattr(metar_async, 'RETRY_DELAY', 0.01)
+    manager = FlakyManager(failures=2)
+    result = next(parse_many([REPORT]))
+
+    async def run():
+        jobs = asyncio.Queue()
+        stats = {'done': 0, 'failed': 0, 'recycled': 0}
+        worker = asyncio.create_task(metar_async.page_worker(manager, "http://form", jobs, stats))
+        for _ in range(2):
+            await jobs.put((result, None))
+        await asyncio.wait_for(jobs.join(), 5)
+        alive = not worker.done()
+        worker.cancel()
+        await asyncio.gather(worker, return_exceptions=True)
+        return stats, alive
+
+    stats, alive = asyncio.run(run())
+    assert alive
+    assert stats == {'done': 0, 'failed': 2, 'recycled': 2}
+    # Dua kali gagal membuka halaman, lalu dicoba lagi sampai berhasil
+    assert manager.calls == 5 and len(manager.pages) == 3
+    assert all(page.closed for page in manager.pages)
+
+
+def test_submit_on_page_reloads_for_another_cloud_layer(monkeypatch):
+    events = []
+
+    async def fake_fill(page, user_input, header_ready=False, clouds_ready=False):
+        events.append(('fill', header_ready, clouds_ready))
+        return True
+
+    async def fake_reload(page):
+        events.append(('reload',))
+
+    async def fake_reset(page):
+        pass
+
+    monkeypatch.setattr(metar_async, 'fill_form', fake_fill)
+    monkeypatch.setattr(metar_async, 'reload_form', fake_reload)
+    monkeypatch.setattr(metar_async, 'reset_form', fake_reset)
+    reports = ["METAR WADS 160000Z 09005KT 9999 FEW020 30/24 Q1010 NOSIG=",
+               "METAR WADS 160030Z 09005KT 9999 FEW020 31/24 Q1010 NOSIG=",
+               "METAR WADS 160100Z 09005KT 9999 SCT018 30/24 Q1010 NOSIG=",
+               "METAR WADS 160130Z 09005KT CAVOK 30/24 Q1010 NOSIG="]
+
+    async def run():
+        page_state = {}
+        for result in parse_many(reports):
+            await metar_async.submit_on_page(None, result, page_state)
+
+    asyncio.run(run())
+    assert events == [('fill', False, False),
+                      ('fill', True, True),  # Lapisan sama: baris awan yang ada dipakai lagi
+                      ('reload',), ('fill', False, False),
+                      ('reload',), ('fill', False, False)]
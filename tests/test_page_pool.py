@@ -0,0 +1,81 @@
+import threading
+from types import SimpleNamespace
+
+import playwright.sync_api
+
+from browsermanager import PagePool, block_non_essential
+
+
+class FakePage:
+    def __init__(self):
+        self.routes = []
+        self.closed = False
+
+    def route(self, pattern, handler):
+        self.routes.append((pattern, handler))
+
+    def goto(self, url):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+class FakeContext:
+    def __init__(self, pages_left):
+        self.pages_left = pages_left
+        self.pages = []
+
+    def new_page(self):
+        if not self.pages_left:
+            raise RuntimeError("browser gone")
+        self.pages_left -= 1
+        page = FakePage()
+        self.pages.append(page)
+        return page
+
+
+def fake_playwright(context):
+    browser = SimpleNamespace(contexts=[context])
+    session = SimpleNamespace(chromium=SimpleNamespace(connect_over_cdp=lambda endpoint: browser),
+                              stop=lambda: None)
+    return lambda: SimpleNamespace(start=lambda: session)
+
+
+def make_pool(monkeypatch, context, fast=False):
+    monkeypatch.setattr(playwright.sync_api, 'sync_playwright', fake_playwright(context))
+    manager = SimpleNamespace(cdp_endpoint="http://127.0.0.1:9222", fast=fast)
+    return PagePool(manager, "http://form", size=1)
+
+
+def test_failed_job_is_counted_when_the_page_cannot_be_replaced(monkeypatch):
+    context = FakeContext(pages_left=1)
+    pool = make_pool(monkeypatch, context)
+    discarded = []
+
+    def handle(page, job, page_state):
+        raise RuntimeError("page crashed")
+
+    pool.start(handle, discard=lambda job, error: discarded.append(job))
+    pool.submit('first')
+    pool.threads[0].join(5)
+    assert not pool.threads[0].is_alive()
+    assert pool.stats == {'done': 0, 'failed': 1, 'recycled': 1}
+    assert pool.alive == 0 and context.pages[0].closed
+    assert discarded == []  # Job yang sedang berjalan sudah diserahkan ke handler, bukan dibuang
+
+
+def test_fast_mode_routes_each_pool_page(monkeypatch):
+    context = FakeContext(pages_left=2)
+    pool = make_pool(monkeypatch, context, fast=True)
+    seen = threading.Event()
+
+    def handle(page, job, page_state):
+        seen.set()
+        return True
+
+    pool.start(handle)
+    pool.submit('job')
+    assert seen.wait(5)
+    assert pool.join() == {'done': 1, 'failed': 0, 'recycled': 0}
+    assert context.pages[0].routes == [("**/*", block_non_essential)]
@@ -0,0 +1,41 @@
+import time
+
+from metar_pipeline import MetarPipeline, lines_source
+from metar_priority import classify_priority
+
+REPORTS = [f"METAR WADS 16{hour:02d}00Z 09005KT 9999 FEW020 30/24 Q1010 NOSIG=" for hour in range(8)]
+
+
+def slow_submit(submitted, seconds=0.15):
+    def submit(result):
+        time.sleep(seconds)  # Lebih lama dari timeout put di pipeline, seperti form browser
+        submitted.append(result.raw)
+        return True
+    return submit
+
+
+def test_slow_consumer_submits_every_report():
+    submitted = []
+    metrics = MetarPipeline(lines_source(REPORTS), slow_submit(submitted), queue_size=2).run()
+    assert submitted == REPORTS
+    assert metrics['submit']['items'] == len(REPORTS)
+
+
+def test_slow_consumer_submits_every_report_prioritized():
+    submitted = []
+    MetarPipeline(lines_source(REPORTS), slow_submit(submitted), queue_size=2, prioritize=classify_priority,
+                  backlog=2).run()
+    assert sorted(submitted) == REPORTS
+
+
+def test_stopped_pipeline_still_finishes():
+    submitted = []
+    pipeline = MetarPipeline(lines_source(REPORTS * 4), None, queue_size=2)
+
+    def submit(result):
+        submitted.append(result.raw)
+        pipeline.stop()
+        return True
+    pipeline.submit = submit
+    pipeline.run()
+    assert len(submitted) == 1
@@ -0,0 +1,72 @@
+import queue
+from datetime import datetime, timezone
+
+import pytest
+
+from metar_priority import (BACKFILL, CURRENT, SPECI, PriorityBuckets, PriorityReportQueue,
+                            classify_priority)
+from nosig_reader import parse_many
+
+NOW = datetime(2026, 10, 16, 12, 10, tzinfo=timezone.utc)
+
+
+def result(report):
+    return next(parse_many([report]))
+
+
+@pytest.mark.parametrize('report, expected', [
+    ("SPECI WADS 161205Z 09015G25KT 3000 TSRA SCT018CB 30/24 Q1008 NOSIG=", SPECI),
+    ("METAR WADS 161200Z 09005KT 9999 FEW020 30/24 Q1010 NOSIG=", CURRENT),
+    ("METAR WADS 160900Z 09005KT 9999 FEW020 30/24 Q1010 NOSIG=", BACKFILL),
+    ("SPECI WADS 150905Z 09015G25KT 3000 TSRA SCT018CB 30/24 Q1008 NOSIG=", BACKFILL),  # SPECI lama
+    ("METAR WADS 302330Z 09005KT 9999 FEW020 30/24 Q1010 NOSIG=", BACKFILL),  # Bulan lalu
+    ("METAR WADS 161300Z 09005KT 9999 FEW020 30/24 Q1010 NOSIG=", BACKFILL),  # Di depan jam
+])
+def test_classify_priority(report, expected):
+    assert classify_priority(result(report), NOW) == expected
+
+
+def test_parse_error_is_current():
+    assert classify_priority(result("METAR WADS 09005KT="), NOW) == CURRENT
+
+
+def test_buckets_serve_higher_class_first_without_starving_lower():
+    buckets = PriorityBuckets(starvation_limit=2)
+    for i in range(3):
+        buckets.push(BACKFILL, f"b{i}")
+    for i in range(5):
+        buckets.push(SPECI, f"s{i}")
+    order = [buckets.pop()[2] for _ in range(len(buckets))]
+    assert order == ['s0', 's1', 'b0', 's2', 's3', 'b1', 's4', 'b2']
+    with pytest.raises(IndexError):
+        buckets.pop()
+
+
+def test_buckets_round_robin_per_key():
+    buckets = PriorityBuckets()
+    for item in ('a1', 'a2', 'a3'):
+        buckets.push(CURRENT, item, key='WADS')
+    buckets.push(CURRENT, 'b1', key='WAAA')
+    assert [buckets.pop()[2] for _ in range(4)] == ['a1', 'b1', 'a2', 'a3']
+    assert buckets.key_depths() == {}
+
+
+def test_queue_hands_out_final_last_and_records_latency():
+    final = object()
+    reports = PriorityReportQueue(lambda item: item[0], final=final, maxsize=2)
+    reports.put((BACKFILL, 'old'))
+    reports.put(final)  # Penanda akhir tidak memakai tempat dan keluar paling akhir
+    reports.put((SPECI, 'speci'), timeout=0)
+    with pytest.raises(queue.Full):
+        reports.put((CURRENT, 'full'), timeout=0)
+    assert reports.get() == (SPECI, 'speci')
+    reports.task_done()
+    assert reports.get() == (BACKFILL, 'old')
+    reports.task_done()
+    assert reports.get() is final and reports.get_nowait() is final
+    assert set(reports.latency.summary()) == {'speci', 'backfill'}
+
+
+def test_get_nowait_on_empty_queue():
+    with pytest.raises(queue.Empty):
+        PriorityReportQueue(lambda item: CURRENT).get_nowait()
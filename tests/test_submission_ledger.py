@@ -0,0 +1,79 @@
+import asyncio
+import sqlite3
+from datetime import datetime, timezone
+
+from submission_ledger import SubmissionLedger, report_key
+
+REPORT = "METAR WADS 160000Z 09005KT 9999 FEW020 30/24 Q1010 NOSIG="
+
+
+def utc(*args):
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+def test_key_ignores_whitespace_and_header():
+    now = utc(2026, 10, 16, 1, 0)
+    assert report_key("SAID35 WADS 160000\n  " + REPORT.replace(' ', '  '), now) == report_key(REPORT, now)
+
+
+def test_same_text_next_month_is_not_already_submitted(tmp_path):
+    # Laporan tropis sering identik; bulan pengamatan membedakannya
+    ledger = SubmissionLedger(str(tmp_path / "ledger.db"))
+    october = report_key(REPORT, utc(2026, 10, 16, 1, 0))
+    november = report_key(REPORT, utc(2026, 11, 16, 1, 0))
+    assert (october.month, november.month) == ('2026-10', '2026-11')
+    ledger.record(october, REPORT, 'browser')
+    assert ledger.contains(october)
+    assert not ledger.contains(november)
+    assert ledger.submitted_for('WADS', '2026-10', '16') == ['160000']
+    assert ledger.submitted_for('WADS', '2026-11', '16') == []
+    ledger.close()
+
+
+def test_report_of_previous_month_keeps_its_month():
+    assert report_key("METAR WADS 312330Z 09005KT 9999 FEW020 30/24 Q1010=", utc(2026, 11, 1, 0, 10)).month == '2026-10'
+
+
+def test_old_ledger_is_migrated(tmp_path):
+    path = str(tmp_path / "ledger.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE submissions (station TEXT NOT NULL, metar_time TEXT NOT NULL, "
+                 "report_type TEXT NOT NULL, content_hash TEXT NOT NULL, report TEXT NOT NULL, "
+                 "backend TEXT NOT NULL, submitted_at TEXT NOT NULL, "
+                 "PRIMARY KEY (station, metar_time, report_type, content_hash)) WITHOUT ROWID")
+    old = report_key(REPORT, utc(2026, 9, 16, 1, 0))
+    conn.execute("INSERT INTO submissions VALUES (?, ?, ?, ?, ?, ?, ?)",
+                 (old.station, old.metar_time, old.report_type, old.content_hash, REPORT, 'browser',
+                  '2026-09-16T00:05:00+00:00'))
+    conn.commit()
+    conn.close()
+
+    ledger = SubmissionLedger(path)
+    assert len(ledger) == 1
+    assert ledger.contains(old)
+    assert not ledger.contains(report_key(REPORT, utc(2026, 10, 16, 1, 0)))
+    ledger.close()
+
+
+def test_async_path_skips_recorded_reports(tmp_path):
+    from metar_async import parse_reports
+    from metar_daemon import NewReport
+
+    ledger = SubmissionLedger(str(tmp_path / "ledger.db"))
+    ledger.record(report_key(REPORT), REPORT, 'browser')
+    other = REPORT.replace('160000Z', '160030Z')
+
+    async def run():
+        reports, jobs = asyncio.Queue(), asyncio.Queue()
+        stats = {'skipped': 0}
+        for text in (REPORT, other):
+            await reports.put(NewReport('SAID35', 'WADS', text[6:12], text))
+        task = asyncio.create_task(parse_reports(reports, jobs, ledger, stats))
+        result, key = await asyncio.wait_for(jobs.get(), 5)
+        task.cancel()
+        return stats, result, key
+
+    stats, result, key = asyncio.run(run())
+    assert stats['skipped'] == 1
+    assert result.raw == other and key == report_key(other)
+    ledger.close()
@@ -0,0 +1,53 @@
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+from metar_validation import resolve_observation, validate
+from nosig_reader import parse_many
+
+NOW = datetime(2026, 10, 16, 1, 0, tzinfo=timezone.utc)
+
+
+def parse(report):
+    return next(parse_many([report])).parsed
+
+
+def test_reports_without_cloud_layer_are_accepted():
+    for report in ("METAR WADS 160000Z 09005KT CAVOK 30/24 Q1010 NOSIG=",
+                   "METAR WADS 160000Z 09005KT 9999 NSC 30/24 Q1010 NOSIG=",
+                   "METAR WADS 160000Z 09005KT 9999 NCD 30/24 Q1010 NOSIG="):
+        parsed = parse(report)
+        assert parsed['clouds'] == []
+        assert validate(parsed, NOW) == []
+
+
+def test_missing_cloud_group_is_still_rejected():
+    parsed = parse("METAR WADS 160000Z 09005KT 9999 30/24 Q1010 NOSIG=")
+    assert parsed.get('clouds') is None
+    assert validate(parsed, NOW)
+
+
+def test_days_resolve_in_utc_around_month_end():
+    # 31 Agustus 23:50Z: hari ini, laporan 00Z besok dan hari lain bulan ini
+    now = datetime(2026, 8, 31, 23, 50, tzinfo=timezone.utc)
+    assert resolve_observation(31, 23, 30, now) == datetime(2026, 8, 31, 23, 30, tzinfo=timezone.utc)
+    assert resolve_observation(1, 0, 0, now) == datetime(2026, 9, 1, 0, 0, tzinfo=timezone.utc)
+    assert resolve_observation(16, now=now).date() == date(2026, 8, 16)
+    # 1 Oktober: laporan tanggal 30 dan 31 dari dump CMSS
+    now = datetime(2026, 10, 1, 0, 10, tzinfo=timezone.utc)
+    assert resolve_observation(30, 23, 30, now) == datetime(2026, 9, 30, 23, 30, tzinfo=timezone.utc)
+    with pytest.raises(ValueError):
+        resolve_observation(31, now=now)  # September tidak punya tanggal 31
+
+
+def test_offset_now_is_converted_to_utc():
+    wita = timezone(timedelta(hours=8))
+    now = datetime(2026, 11, 1, 4, 0, tzinfo=wita)  # 31 Oktober 20:00Z
+    assert resolve_observation(31, 19, 30, now) == datetime(2026, 10, 31, 19, 30, tzinfo=timezone.utc)
+
+
+def test_previous_month_report_passes_and_future_time_fails():
+    now = datetime(2026, 11, 1, 0, 20, tzinfo=timezone.utc)
+    assert validate(parse("METAR WADS 312330Z 09005KT 9999 FEW020 30/24 Q1010 NOSIG="), now) == []
+    problems = validate(parse("METAR WADS 011200Z 09005KT 9999 FEW020 30/24 Q1010 NOSIG="), now)
+    assert any("future" in problem for problem in problems)
@@ -0,0 +1,155 @@
+import json
+import logging
+import os
+import random
+import threading
+import time
+from bisect import bisect_left
+from contextlib import nullcontext
+
+# Sampel per span yang disimpan untuk persentil; setelah itu reservoir sampling
+MAX_SAMPLES = 10000
+
+# Batas bucket histogram Prometheus (detik)
+PROMETHEUS_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+_NULL_SPAN = nullcontext()
+_enabled = False
+_lock = threading.Lock()
+_histograms = {}
+_jsonl = None
+
+
+class Histogram:
+    """Duration samples of one span name: count, sum, max and a bounded reservoir."""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples = []
+        self.buckets = [0] * (len(PROMETHEUS_BUCKETS) + 1)  # Slot terakhir: +Inf
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        if len(self.samples) < MAX_SAMPLES:
+            self.samples.append(seconds)
+        else:
+            slot = random.randrange(self.count)
+            if slot < MAX_SAMPLES:
+                self.samples[slot] = seconds
+        self.buckets[bisect_left(PROMETHEUS_BUCKETS, seconds)] += 1
+
+    def percentile(self, fraction):
+        ordered = sorted(self.samples)
+        if not ordered:
+            return 0.0
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'total': self.total,
+            'p50': self.percentile(0.50),
+            'p95': self.percentile(0.95),
+            'p99': self.percentile(0.99),
+            'max': self.max,
+        }
+
+
+class _Span:
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        record(self.name, time.perf_counter() - self.start, error=exc_type is not None)
+        return False
+
+
+def enable(jsonl_path=None):
+    """
+    Turn tracing on. While tracing is off, `span()` returns one shared no-op context
+    manager, so instrumented code pays a single function call per span.
+
+    Args:
+        jsonl_path (str): Optional file to append every finished span to as a JSON line.
+    """
+    global _enabled, _jsonl
+    with _lock:
+        if jsonl_path and _jsonl is None:
+            _jsonl = open(jsonl_path, 'a', buffering=1)
+        _enabled = True
+
+
+def disable():
+    """Turn tracing off and close the JSON lines file; collected histograms are kept."""
+    global _enabled, _jsonl
+    with _lock:
+        _enabled = False
+        if _jsonl is not None:
+            _jsonl.close()
+            _jsonl = None
+
+
+def is_enabled():
+    return _enabled
+
+
+def reset():
+    """Drop all collected histograms."""
+    with _lock:
+        _histograms.clear()
+
+
+def span(name):
+    """Context manager timing the block as span `name` (a no-op while tracing is off)."""
+    return _Span(name) if _enabled else _NULL_SPAN
+
+
+def record(name, seconds, error=False):
+    """Add one duration to the histogram of `name` (and the JSON lines file, if any)."""
+    with _lock:
+        histogram = _histograms.get(name)
+        if histogram is None:
+            histogram = _histograms[name] = Histogram()
+        histogram.add(seconds)
+        if _jsonl is not None:
+            _jsonl.write(json.dumps({'span': name, 'ts': time.time(), 'seconds': seconds, 'error': error}) + '\n')
+
+
+def summary():
+    """Return {span name: {'count', 'total', 'p50', 'p95', 'p99', 'max'}} in seconds."""
+    with _lock:
+        return {name: histogram.summary() for name, histogram in sorted(_histograms.items())}
+
+
+def log_summary():
+    for name, stats in summary().items():
+        logging.info(f"{name}: n={stats['count']} p50={stats['p50'] * 1e3:.1f}ms p95={stats['p95'] * 1e3:.1f}ms "
+                     f"p99={stats['p99'] * 1e3:.1f}ms max={stats['max'] * 1e3:.1f}ms")
+
+
+def write_prometheus(path, metric="metar_span_seconds"):
+    """Write all histograms in the Prometheus text format (e.g. for the node_exporter textfile collector)."""
+    lines = [f"# HELP {metric} Duration of traced spans.", f"# TYPE {metric} histogram"]
+    with _lock:
+        for name, histogram in sorted(_histograms.items()):
+            cumulative = 0
+            for bound, count in zip(PROMETHEUS_BUCKETS, histogram.buckets):
+                cumulative += count
+                lines.append(f'{metric}_bucket{{span="{name}",le="{bound}"}} {cumulative}')
+            lines.append(f'{metric}_bucket{{span="{name}",le="+Inf"}} {histogram.count}')
+            lines.append(f'{metric}_sum{{span="{name}"}} {histogram.total}')
+            lines.append(f'{metric}_count{{span="{name}"}} {histogram.count}')
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w') as f:
+        f.write('\n'.join(lines) + '\n')
+    os.replace(temp_path, path)